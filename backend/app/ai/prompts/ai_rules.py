@@ -2,7 +2,10 @@
 Prompts for AI rules generation.
 """
 
+from functools import lru_cache
 
+
+@lru_cache(maxsize=32)
 def create_ai_rules_system_prompt(additional_user_instruction: str) -> str:
     """
     System prompt for creating AI rules.
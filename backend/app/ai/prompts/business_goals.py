@@ -1,3 +1,7 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=32)
 def business_goals_system_prompt_enhance(additional_user_instruction=None):
     base_prompt = (
         "You are a business analyst helping to refine project goals. Review the project description "
@@ -29,6 +33,7 @@ def business_goals_system_prompt_enhance(additional_user_instruction=None):
     return base_prompt
 
 
+@lru_cache(maxsize=32)
 def business_goals_system_prompt_create(additional_user_instruction=None):
     base_prompt = (
         "You are a business analyst helping to create project goals. Review the project description "
@@ -5,8 +5,9 @@ This module provides functions to load and use implementation prompt meta prompt
 """
 
 import os
+import re
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 # Dictionary to map category to meta prompt filename
 CATEGORY_TO_METAPROMPT = {
@@ -21,6 +22,27 @@ CATEGORY_TO_METAPROMPT = {
     "09_integration_implementation": "09_integration_implementation_gen_prompt.txt",
 }
 
+# Variables that are filled into the meta prompt templates
+TEMPLATE_VARIABLES = (
+    "project_description",
+    "tech_stack",
+    "data_models",
+    "api_endpoints",
+    "features",
+    "pages",
+    "ui_design",
+    "test_cases",
+    "fr_spec",
+    "nfr_spec",
+    "additional_user_instruction",
+)
+
+# Placeholder of a template variable; other braces in the templates are kept as they are
+_PLACEHOLDER_RE = re.compile(r"\{(" + "|".join(TEMPLATE_VARIABLES) + r")\}")
+
+# Templates of the categories used so far, split at their placeholders
+_TEMPLATE_PARTS: Dict[str, List[str]] = {}
+
 
 def get_implementation_prompt_template(category: str) -> Optional[str]:
     """
@@ -80,9 +102,14 @@ def prepare_implementation_prompt(
     Returns:
         The prepared implementation prompt, or None if the template couldn't be loaded
     """
-    template = get_implementation_prompt_template(category)
-    if not template:
-        return None
+    # The template is read and split at its placeholders once per category, so preparing
+    # a prompt only joins the parts
+    parts = _TEMPLATE_PARTS.get(category)
+    if parts is None:
+        template = get_implementation_prompt_template(category)
+        if not template:
+            return None
+        parts = _TEMPLATE_PARTS[category] = _PLACEHOLDER_RE.split(template)
 
     # Create a dict of variables to replace in the template
     variables = {
@@ -99,16 +126,29 @@ def prepare_implementation_prompt(
         "additional_user_instruction": additional_user_instruction,
     }
 
-    # Replace variables in the template
-    prompt = template
-    for var_name, var_value in variables.items():
-        placeholder = f"{{{var_name}}}"
-        if placeholder in prompt:
-            prompt = prompt.replace(placeholder, var_value)
+    # Replace variables in the template; split() puts the variable names at odd indexes
+    prompt = "".join(
+        variables[part] or "" if index % 2 else part for index, part in enumerate(parts)
+    )
 
     # Add the additional user instruction if provided
     if additional_user_instruction:
-        prompt += f"\n\nAdditional instructions from user:\n{additional_user_instruction}\n\n"
-        prompt += "Note: While considering these additional instructions, still follow the core implementation requirements outlined above. Do not deviate from the primary objective of the implementation."
+        prompt += "\n\n" + get_additional_instruction_prompt(additional_user_instruction)
 
     return prompt
+
+
+def get_additional_instruction_prompt(additional_user_instruction: str) -> str:
+    """
+    Get the part of an implementation prompt that carries the user's own instructions.
+
+    Args:
+        additional_user_instruction: Custom instructions from the user
+
+    Returns:
+        The instructions, with a note to keep to the core implementation requirements
+    """
+    return (
+        f"Additional instructions from user:\n{additional_user_instruction}\n\n"
+        "Note: While considering these additional instructions, still follow the core implementation requirements outlined above. Do not deviate from the primary objective of the implementation."
+    )
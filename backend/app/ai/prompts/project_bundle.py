@@ -0,0 +1,67 @@
+from functools import lru_cache
+
+from app.ai.prompts.project_description import project_description_system_prompt
+from app.ai.prompts.business_goals import (
+    business_goals_system_prompt_create,
+    business_goals_system_prompt_enhance,
+)
+from app.ai.prompts.target_users import (
+    target_users_system_prompt_create,
+    target_users_system_prompt_enhance,
+)
+from app.ai.prompts.requirements import requirements_system_prompt_enhance
+
+
+@lru_cache(maxsize=32)
+def project_bundle_system_prompt(
+    has_goals=False, has_target_users=False, additional_user_instruction=None
+):
+    base_prompt = (
+        "You are helping to shape the foundation of a software project specification. "
+        "In a single pass you will improve the project description, business goals, "
+        "target users, and requirements. Each section below describes its own task; "
+        "later sections should build on your output for the earlier ones."
+    )
+
+    # Add additional user instruction once for the whole bundle, with guardrails
+    if additional_user_instruction:
+        base_prompt += (
+            f"\n\nAdditional instructions from user:\n{additional_user_instruction}\n\n"
+            "Note: While considering these additional instructions, you must still follow the core task "
+            "of each section as described below. Do not deviate from the primary task format or objective."
+        )
+
+    # Reuse the single-purpose prompts so the bundle stays in sync with the individual endpoints
+    goals_prompt = (
+        business_goals_system_prompt_enhance()
+        if has_goals
+        else business_goals_system_prompt_create()
+    )
+    target_users_prompt = (
+        target_users_system_prompt_enhance()
+        if has_target_users
+        else target_users_system_prompt_create()
+    )
+
+    base_prompt += (
+        f"\n\n## Section 1: Project description\n{project_description_system_prompt()}"
+        f"\n\n## Section 2: Business goals\n{goals_prompt}"
+        f"\n\n## Section 3: Target users\n{target_users_prompt}"
+        f"\n\n## Section 4: Requirements\n{requirements_system_prompt_enhance()}"
+        "\n\nUse the print_project_bundle function to output all four sections. "
+        "Business goals and requirements must be returned as one item per list entry, "
+        "without bullet characters."
+    )
+
+    return base_prompt
+
+
+def get_project_bundle_user_prompt(
+    project_description, formatted_goals, target_users, formatted_requirements
+):
+    return (
+        f"Original description: {project_description}\n"
+        f"Original business goals:\n{formatted_goals}\n"
+        f"Original target users: {target_users}\n"
+        f"Original requirements:\n{formatted_requirements}"
+    )
@@ -1,3 +1,7 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=32)
 def project_description_system_prompt(additional_user_instruction=None):
     base_prompt = (
         "You are a technical writing assistant helping to improve project descriptions. "
@@ -2,7 +2,10 @@
 Prompts for AI-enhanced README generation.
 """
 
+from functools import lru_cache
 
+
+@lru_cache(maxsize=32)
 def readme_system_prompt(additional_user_instruction=None) -> str:
     """
     System prompt for enhancing README content.
@@ -1,3 +1,7 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=32)
 def requirements_system_prompt_enhance(additional_user_instruction=None):
     base_prompt = (
         "You are a requirements analyst refining project requirements. "
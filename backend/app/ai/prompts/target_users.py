@@ -1,3 +1,7 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=32)
 def target_users_system_prompt_enhance(additional_user_instruction=None):
     base_prompt = (
         "You are a UX researcher helping to refine target user personas for a project. "
@@ -28,6 +32,7 @@ def target_users_system_prompt_enhance(additional_user_instruction=None):
     return base_prompt
 
 
+@lru_cache(maxsize=32)
 def target_users_system_prompt_create(additional_user_instruction=None):
     base_prompt = (
         "You are a UX researcher helping to create target user personas for a project. "
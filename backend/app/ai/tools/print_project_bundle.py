@@ -0,0 +1,42 @@
+def print_project_bundle_input_schema():
+    return {
+        "name": "print_project_bundle",
+        "description": "Formats and displays the enhanced project description, business goals, target users and requirements",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "data": {
+                    "type": "object",
+                    "description": "The enhanced foundation of the project specification",
+                    "properties": {
+                        "enhanced_description": {
+                            "type": "string",
+                            "description": "The improved project description",
+                        },
+                        "enhanced_goals": {
+                            "type": "array",
+                            "description": "List of 3-5 SMART business goals, one goal per item",
+                            "items": {"type": "string"},
+                        },
+                        "enhanced_target_users": {
+                            "type": "string",
+                            "description": "A concise paragraph describing the target users",
+                        },
+                        "enhanced_requirements": {
+                            "type": "array",
+                            "description": "List of requirements, each prefixed with [Functional] or [Non-Functional]",
+                            "items": {"type": "string"},
+                        },
+                    },
+                    "required": [
+                        "enhanced_description",
+                        "enhanced_goals",
+                        "enhanced_target_users",
+                        "enhanced_requirements",
+                    ],
+                }
+            },
+            "required": ["data"],
+        },
+        "cache_control": {"type": "ephemeral"},
+    }
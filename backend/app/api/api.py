@@ -100,6 +100,38 @@ try:
     except Exception as e:
         print_error("Failed to load AI Text Requirements router", e)
 
+    try:
+        from .routes.ai_text_project_bundle import router as ai_text_project_bundle_router
+
+        api_router.include_router(ai_text_project_bundle_router)
+        logger.info("AI Text Project Bundle router loaded successfully")
+    except Exception as e:
+        print_error("Failed to load AI Text Project Bundle router", e)
+
+    try:
+        from .routes.ai_text_spec_bundle import router as ai_text_spec_bundle_router
+
+        api_router.include_router(ai_text_spec_bundle_router)
+        logger.info("AI Text Spec Bundle router loaded successfully")
+    except Exception as e:
+        print_error("Failed to load AI Text Spec Bundle router", e)
+
+    try:
+        from .routes.ai_text_design_bundle import router as ai_text_design_bundle_router
+
+        api_router.include_router(ai_text_design_bundle_router)
+        logger.info("AI Text Design Bundle router loaded successfully")
+    except Exception as e:
+        print_error("Failed to load AI Text Design Bundle router", e)
+
+    try:
+        from .routes.ai_text_batch import router as ai_text_batch_router
+
+        api_router.include_router(ai_text_batch_router)
+        logger.info("AI Text Batch router loaded successfully")
+    except Exception as e:
+        print_error("Failed to load AI Text Batch router", e)
+
     try:
         from .routes.ai_text_features import router as ai_text_features_router
 
@@ -3,9 +3,8 @@ API routes for API endpoints enhancement using AI.
 """
 
 import logging
-import json
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any
+from fastapi import APIRouter, Depends
+from typing import Dict, Any, List, Tuple
 
 from app.ai.tools.print_api_endpoints import print_api_endpoints_input_schema
 from app.ai.prompts.api_endpoints import get_api_endpoints_user_prompt
@@ -14,20 +13,100 @@ from app.schemas.ai_text import (
     ApiEndpointsEnhanceResponse,
     ApiData,
 )
-from app.services.ai_service import AIService, INTELLIGENT_MODEL
-from app.services.db_usage_tracker import DatabaseUsageTracker
+from app.services.ai_service import AIService, get_ai_service, FAST_MODEL, INTELLIGENT_MODEL
 from app.core.firebase_auth import get_current_user
-from app.api.routes.ai_text_utils import extract_data_from_response
-from app.utils.llm_logging import DefaultLLMLogger
-from app.db.base import db
+from app.api.routes.ai_text_utils import (
+    build_log_metadata,
+    cache_enhance_response,
+    format_bullet_list,
+    format_json,
+    format_prompt_sections,
+    get_tool_use_data,
+    model_json_response,
+    streaming_tool_use_response,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/ai-text", tags=["AI Text"])
 
+# Tool definitions are static, so they are built once at import time
+_API_ENDPOINTS_TOOLS = [print_api_endpoints_input_schema()]
+
+# System messages do not depend on the request
+_API_ENDPOINTS_SYSTEM_MESSAGE = (
+    "You are an API designer creating RESTful endpoints for a software project. "
+    "Design a comprehensive API based on the project specifications."
+)
+
+
+async def _api_endpoints_messages(
+    request: ApiEndpointsEnhanceRequest, current_user: Dict[str, Any]
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Build the user messages and logging metadata for an API endpoints request."""
+    # Format the features, data models, and requirements concurrently
+    formatted_features, formatted_data_models, formatted_requirements = (
+        await format_prompt_sections(
+            lambda: format_json(request.features) if request.features else "None provided",
+            lambda: (format_json(request.data_models) if request.data_models else "None provided"),
+            lambda: format_bullet_list(request.requirements),
+        )
+    )
+
+    # Create the user message
+    user_prompt = get_api_endpoints_user_prompt(
+        request.project_description,
+        formatted_features,
+        formatted_data_models,
+        formatted_requirements,
+        request.additional_user_instruction,
+    )
+
+    # Metadata for logging and usage tracking
+    log_metadata = build_log_metadata(
+        request,
+        current_user,
+        project_description=request.project_description,
+        features=request.features,
+        data_models=request.data_models,
+        requirements=request.requirements,
+        additional_user_instruction=request.additional_user_instruction,
+    )
+
+    return [{"role": "user", "content": user_prompt}], log_metadata
+
+
+async def create_api_endpoints(
+    request: ApiEndpointsEnhanceRequest, current_user: Dict[str, Any], client: AIService
+) -> ApiData:
+    """
+    Generate validated API endpoints for a request.
+
+    Drafts with the fast model and only falls back to the intelligent model if the draft
+    does not validate.
+    """
+    messages, log_metadata = await _api_endpoints_messages(request, current_user)
+    return await get_tool_use_data(
+        client,
+        _API_ENDPOINTS_SYSTEM_MESSAGE,
+        _API_ENDPOINTS_TOOLS,
+        messages,
+        ApiData,
+        logger,
+        models=(FAST_MODEL, INTELLIGENT_MODEL),
+        log_metadata=log_metadata,
+        response_type="enhance_api_endpoints",
+        check_credits=True,
+        use_token_api_for_estimation=True,
+    )
+
 
 @router.post("/enhance-api-endpoints", response_model=ApiEndpointsEnhanceResponse)
+@cache_enhance_response
 async def enhance_api_endpoints(
-    request: ApiEndpointsEnhanceRequest, current_user: Dict[str, Any] = Depends(get_current_user)
+    request: ApiEndpointsEnhanceRequest,
+    stream: bool = False,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    client: AIService = Depends(get_ai_service),
 ):
     """
     Enhance API endpoints using AI with function calling.
@@ -35,84 +114,31 @@ async def enhance_api_endpoints(
     This endpoint takes a project description, features, data models, requirements, and optionally
     existing API endpoints, and returns an improved, structured API endpoints specification.
     It uses Anthropic's tool use feature to ensure a structured response.
-    """
-    try:
-        # Create the service objects
-        llm_logger = DefaultLLMLogger()
-        usage_tracker = DatabaseUsageTracker(db.get_db())
-
-        # Initialize the AI client with the logger and usage tracker
-        client = AIService(llm_logger, usage_tracker)
-
-        # Create the system message
-        system_message = (
-            "You are an API designer creating RESTful endpoints for a software project. "
-            "Design a comprehensive API based on the project specifications."
-        )
-
-        # Format the features, data models, and requirements as strings
-        formatted_features = "None provided"
-        if request.features and len(request.features) > 0:
-            formatted_features = json.dumps(request.features, indent=2)
 
-        formatted_data_models = "None provided"
-        if request.data_models and len(request.data_models) > 0:
-            formatted_data_models = json.dumps(request.data_models, indent=2)
-
-        formatted_requirements = "\n".join([f"- {req}" for req in request.requirements])
-
-        # Create the user message
-        user_prompt = get_api_endpoints_user_prompt(
-            request.project_description,
-            formatted_features,
-            formatted_data_models,
-            formatted_requirements,
-            request.additional_user_instruction,
+    With ``stream=true`` the response is newline-delimited JSON: completed endpoints are
+    sent as they are generated, followed by the validated result.
+    """
+    if stream:
+        messages, log_metadata = await _api_endpoints_messages(request, current_user)
+
+        # Send each endpoint as soon as it is complete instead of waiting for all of them
+        return await streaming_tool_use_response(
+            client.stream_tool_use_response(
+                _API_ENDPOINTS_SYSTEM_MESSAGE,
+                _API_ENDPOINTS_TOOLS,
+                messages,
+                model=INTELLIGENT_MODEL,
+                log_metadata=log_metadata,
+                response_type="enhance_api_endpoints",
+                check_credits=True,
+                use_token_api_for_estimation=True,
+            ),
+            ApiData,
+            ["endpoints"],
+            logger,
         )
 
-        # Generate the tool use response
-        messages = [{"role": "user", "content": user_prompt}]
-        tools = [print_api_endpoints_input_schema()]
-        response = await client.get_tool_use_response(
-            system_message,
-            tools,
-            messages,
-            model=INTELLIGENT_MODEL,
-            log_metadata={
-                "project_id": request.project_id if hasattr(request, "project_id") else "unknown",
-                "user_id": current_user.get("firebase_uid") if current_user else None,
-                "project_description": request.project_description,
-                "features": request.features,
-                "data_models": request.data_models,
-                "requirements": request.requirements,
-                "additional_user_instruction": request.additional_user_instruction,
-            },
-            response_type="enhance_api_endpoints",
-            check_credits=True,
-            use_token_api_for_estimation=True,
-        )
+    api_endpoints_data = await create_api_endpoints(request, current_user, client)
 
-        # Handle potential credit errors - check the response content if it's a dict
-        if (
-            isinstance(response, dict)
-            and isinstance(response.get("content"), str)
-            and response["content"].startswith("Insufficient credits")
-        ):
-            raise HTTPException(status_code=402, detail=response["content"])
-        elif isinstance(response, str) and response.startswith("Insufficient credits"):
-            raise HTTPException(status_code=402, detail=response)
-
-        if "error" in response:
-            logger.error(f"Error in AI tool use: {response['error']}")
-            raise HTTPException(
-                status_code=500, detail=f"Failed to generate API endpoints: {response['error']}"
-            )
-
-        # Extract API endpoints data with fallback mechanisms
-        api_endpoints_data = extract_data_from_response(response, ApiData, logger)
-
-        # Return the enhanced API endpoints
-        return ApiEndpointsEnhanceResponse(data=api_endpoints_data)
-    except Exception as e:
-        logger.error(f"Error enhancing API endpoints: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to enhance API endpoints: {str(e)}")
+    # Return the enhanced API endpoints
+    return model_json_response(ApiEndpointsEnhanceResponse(data=api_endpoints_data))
@@ -0,0 +1,129 @@
+"""
+API routes for enhancing the descriptions, READMEs and features of many projects in a single
+request.
+"""
+
+import logging
+from fastapi import APIRouter, HTTPException, Depends
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from app.ai.tools.print_features import print_features_input_schema
+from app.schemas.ai_text import (
+    BatchEnhanceItemResult,
+    BatchEnhanceRequest,
+    BatchEnhanceResponse,
+    DescriptionEnhanceResponse,
+    EnhanceReadmeResponse,
+    FeaturesData,
+    FeaturesEnhanceResponse,
+)
+from app.services.ai_service import AIService, FAST_MODEL, INTELLIGENT_MODEL, get_ai_service
+from app.core.firebase_auth import get_current_user
+from app.api.routes.ai_text_description import build_description_prompt
+from app.api.routes.ai_text_docs import build_readme_prompt
+from app.api.routes.ai_text_features import build_features_prompt
+from app.api.routes.ai_text_utils import extract_data_from_response
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/ai-text", tags=["AI Text"])
+
+
+class _BatchEndpoint(NamedTuple):
+    """How an item type is prompted like its enhance endpoint and turned into its response."""
+
+    build_prompt: Callable[[Any, Dict[str, Any]], Tuple[str, List[Dict[str, Any]], Dict[str, Any]]]
+    model: str
+    tools: Optional[List[Dict[str, Any]]]
+    response_type: str
+    build_response: Callable[[Any], Any]
+
+
+_BATCH_ENDPOINTS = {
+    "description": _BatchEndpoint(
+        build_description_prompt,
+        INTELLIGENT_MODEL,
+        None,
+        "enhance_description",
+        lambda text: DescriptionEnhanceResponse(enhanced_description=text),
+    ),
+    "readme": _BatchEndpoint(
+        build_readme_prompt,
+        FAST_MODEL,
+        None,
+        "enhance_readme",
+        lambda text: EnhanceReadmeResponse(enhanced_readme=text.strip()),
+    ),
+    "features": _BatchEndpoint(
+        build_features_prompt,
+        INTELLIGENT_MODEL,
+        # Tool definitions are static, so they are built once at import time
+        [print_features_input_schema()],
+        "enhance_features",
+        lambda data: FeaturesEnhanceResponse(
+            data=extract_data_from_response(data, FeaturesData, logger)
+        ),
+    ),
+}
+
+
+@router.post("/batch", response_model=BatchEnhanceResponse)
+async def enhance_batch(
+    request: BatchEnhanceRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    client: AIService = Depends(get_ai_service),
+):
+    """
+    Enhance the descriptions, READMEs and features of many projects at once.
+
+    Each item is prompted exactly like its enhance endpoint, but all items are sent to
+    the AI provider as one message batch, which costs half as much as individual calls
+    in exchange for a longer wait. Bulk imports should use this endpoint; interactive
+    edits are better served by the individual endpoints.
+
+    An item that fails, also one rejected before the AI call like its enhance endpoint
+    would reject it, is reported under its ``error`` without failing the other items.
+    """
+    batch_requests = []
+    # Items rejected while building their prompt are not sent, so they are not billed
+    responses: Dict[str, Any] = {}
+    for index, item in enumerate(request.items):
+        endpoint = _BATCH_ENDPOINTS[item.type]
+        try:
+            system, messages, log_metadata = endpoint.build_prompt(item.request, current_user)
+        except HTTPException as e:
+            responses[str(index)] = e
+            continue
+        batch_requests.append(
+            {
+                "custom_id": str(index),
+                "system": system,
+                "messages": messages,
+                "tools": endpoint.tools,
+                "model": endpoint.model,
+                "log_metadata": log_metadata,
+                "response_type": endpoint.response_type,
+            }
+        )
+
+    if batch_requests:
+        responses.update(
+            await client.generate_batch_responses(
+                batch_requests, check_credits=True, use_token_api_for_estimation=True
+            )
+        )
+
+    results = []
+    for index, item in enumerate(request.items):
+        response = responses[str(index)]
+        try:
+            if isinstance(response, Exception):
+                raise response
+            result = _BATCH_ENDPOINTS[item.type].build_response(response)
+        except Exception as e:
+            logger.error(f"Failed to enhance batch item {index} ({item.type}): {e}")
+            error = e.detail if isinstance(e, HTTPException) else str(e)
+            results.append(BatchEnhanceItemResult(type=item.type, error=error))
+            continue
+        results.append(BatchEnhanceItemResult(type=item.type, result=result))
+
+    return BatchEnhanceResponse(results=results)
@@ -4,26 +4,59 @@ API routes for project description enhancement.
 
 import logging
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 
 from app.ai.prompts.project_description import project_description_system_prompt
 from app.schemas.ai_text import (
     DescriptionEnhanceRequest,
     DescriptionEnhanceResponse,
 )
-from app.services.ai_service import INTELLIGENT_MODEL, AIService
+from app.services.ai_service import AIService, INTELLIGENT_MODEL, get_ai_service
 from app.core.firebase_auth import get_current_user
-from app.utils.llm_logging import DefaultLLMLogger
-from app.db.base import db
-from app.services.db_usage_tracker import DatabaseUsageTracker
+from app.api.routes.ai_text_utils import (
+    build_log_metadata,
+    cache_enhance_response,
+    streaming_text_response,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/ai-text", tags=["AI Text"])
 
+# Descriptions shorter than this (ignoring surrounding whitespace) are not sent to the AI
+MIN_DESCRIPTION_LENGTH = 10
+
+
+def build_description_prompt(
+    request: DescriptionEnhanceRequest, current_user: Dict[str, Any]
+) -> Tuple[str, List[Dict[str, Any]], Dict[str, Any]]:
+    """Build the system prompt, user messages and logging metadata for a description request."""
+    # Too little text to enhance; don't spend an AI call and the user's credits on it
+    if len(request.user_description.strip()) < MIN_DESCRIPTION_LENGTH:
+        raise HTTPException(status_code=400, detail="Description too short to enhance")
+
+    # Create the system message and user message
+    system_prompt = project_description_system_prompt(request.additional_user_instruction)
+
+    # Create the user message with the project description
+    user_message = f"Original description: {request.user_description}"
+
+    log_metadata = build_log_metadata(
+        request,
+        current_user,
+        original_description=request.user_description,
+        additional_user_instruction=request.additional_user_instruction,
+    )
 
-@router.post("/enhance-description", response_model=DescriptionEnhanceResponse)
+    return system_prompt, [{"role": "user", "content": user_message}], log_metadata
+
+
+@router.post("/enhance-description", response_model=DescriptionEnhanceResponse, deprecated=True)
+@cache_enhance_response(normalized_fields=["user_description", "additional_user_instruction"])
 async def enhance_project_description(
-    request: DescriptionEnhanceRequest, current_user: Dict[str, Any] = Depends(get_current_user)
+    request: DescriptionEnhanceRequest,
+    stream: bool = False,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    client: AIService = Depends(get_ai_service),
 ):
     """
     Enhance a project description using AI.
@@ -31,52 +64,38 @@ async def enhance_project_description(
     This endpoint takes a rough, informal, or incomplete project description
     and returns an improved version with better clarity, grammar, and
     technical precision.
+
+    With ``stream=true`` the response is a server-sent event stream of text chunks,
+    followed by a final event with the enhanced description.
     """
-    try:
-        # Create the service objects
-        llm_logger = DefaultLLMLogger()
-        usage_tracker = DatabaseUsageTracker(db.get_db())
-
-        # Initialize the AI client with the logger and usage tracker
-        client = AIService(llm_logger, usage_tracker)
-
-        # Create the system message and user message
-        system_prompt = project_description_system_prompt(request.additional_user_instruction)
-
-        # Create the user message with the project description
-        user_message = f"Original description: {request.user_description}"
-
-        # Generate the response
-        messages = [{"role": "user", "content": user_message}]
-        response = await client.generate_response(
-            messages,
-            system_prompt,
-            INTELLIGENT_MODEL,
-            log_metadata={
-                "user_id": current_user.get("firebase_uid") if current_user else None,
-                "project_id": request.project_id if hasattr(request, "project_id") else "unknown",
-                "original_description": request.user_description,
-                "additional_user_instruction": request.additional_user_instruction,
-            },
-            response_type="enhance_description",
-            check_credits=True,
-            use_token_api_for_estimation=True,
-        )
+    system_prompt, messages, log_metadata = build_description_prompt(request, current_user)
 
-        # Handle potential credit errors - check the response content if it's a dict
-        if (
-            isinstance(response, dict)
-            and isinstance(response.get("content"), str)
-            and response["content"].startswith("Insufficient credits")
-        ):
-            raise HTTPException(status_code=402, detail=response["content"])
-        elif isinstance(response, str) and response.startswith("Insufficient credits"):
-            raise HTTPException(status_code=402, detail=response)
-
-        # Return the enhanced description
-        return DescriptionEnhanceResponse(enhanced_description=response)
-    except Exception as e:
-        logger.error(f"Error enhancing project description: {str(e)}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to enhance project description: {str(e)}"
+    # Generate the response
+    if stream:
+        # Send the text as it is generated instead of waiting for the full response
+        return await streaming_text_response(
+            client.stream_response(
+                messages,
+                system_prompt,
+                INTELLIGENT_MODEL,
+                log_metadata=log_metadata,
+                response_type="enhance_description",
+                check_credits=True,
+                use_token_api_for_estimation=True,
+            ),
+            lambda text: {"enhanced_description": text},
+            logger,
         )
+
+    response = await client.generate_response(
+        messages,
+        system_prompt,
+        INTELLIGENT_MODEL,
+        log_metadata=log_metadata,
+        response_type="enhance_description",
+        check_credits=True,
+        use_token_api_for_estimation=True,
+    )
+
+    # Return the enhanced description
+    return DescriptionEnhanceResponse(enhanced_description=response)
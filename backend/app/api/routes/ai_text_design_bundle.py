@@ -0,0 +1,93 @@
+"""
+API routes for generating the tech stack and UI design of a project in a single request.
+"""
+
+import asyncio
+import logging
+from fastapi import APIRouter, HTTPException, Depends
+from typing import Dict, Any
+
+from app.schemas.ai_text import (
+    DesignBundleEnhanceRequest,
+    DesignBundleEnhanceResponse,
+    TechStackEnhanceRequest,
+    UIDesignEnhanceRequest,
+)
+from app.services.ai_service import AIService, InsufficientCreditsError, get_ai_service
+from app.core.firebase_auth import get_current_user
+from app.api.routes.ai_text_tech import create_tech_stack
+from app.api.routes.ai_text_ui_design import create_ui_design
+from app.api.routes.ai_text_utils import cache_enhance_response
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/ai-text", tags=["AI Text"])
+
+
+@router.post("/enhance-design-bundle", response_model=DesignBundleEnhanceResponse)
+@cache_enhance_response(
+    normalized_fields=["project_description", "requirements", "additional_user_instruction"],
+    cacheable=lambda response: not response.errors,
+)
+async def enhance_design_bundle(
+    request: DesignBundleEnhanceRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    client: AIService = Depends(get_ai_service),
+):
+    """
+    Generate the tech stack and UI design of a project at once.
+
+    The frontend usually requests both sections back-to-back for the same project. Neither
+    needs the output of the other, so the AI calls run concurrently and the request takes
+    as long as the slower call instead of the sum of both.
+
+    A section that fails, also for lack of credits, is left empty and its error is
+    reported under ``errors``, so a section that was already generated and billed is
+    not thrown away. The request fails as a whole only if both sections failed, with a
+    402 if either of them ran out of credits. Responses with errors are not cached, so a
+    retry generates the failed section again.
+    """
+    sections = {
+        "tech_stack": create_tech_stack(
+            TechStackEnhanceRequest(
+                project_id=request.project_id,
+                project_description=request.project_description,
+                project_requirements=request.requirements,
+                user_preferences=request.user_preferences,
+                additional_user_instruction=request.additional_user_instruction,
+            ),
+            current_user,
+            client,
+        ),
+        "ui_design": create_ui_design(
+            UIDesignEnhanceRequest(
+                project_id=request.project_id,
+                project_description=request.project_description,
+                features=request.features,
+                requirements=request.requirements,
+                existing_ui_design=request.existing_ui_design,
+                additional_user_instruction=request.additional_user_instruction,
+            ),
+            current_user,
+            client,
+        ),
+    }
+    results = dict(zip(sections, await asyncio.gather(*sections.values(), return_exceptions=True)))
+
+    errors = {name: result for name, result in results.items() if isinstance(result, Exception)}
+    if len(errors) == len(results):
+        # Running out of credits is what the user needs to act on, so it is reported first
+        raise next(
+            (error for error in errors.values() if isinstance(error, InsufficientCreditsError)),
+            next(iter(errors.values())),
+        )
+
+    for name, error in errors.items():
+        logger.error(f"Failed to generate {name} in design bundle: {error}")
+
+    return DesignBundleEnhanceResponse(
+        **{name: result for name, result in results.items() if name not in errors},
+        errors={
+            name: error.detail if isinstance(error, HTTPException) else str(error)
+            for name, error in errors.items()
+        },
+    )
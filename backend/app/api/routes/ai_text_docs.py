@@ -3,8 +3,8 @@ API routes for documentation generation using AI.
 """
 
 import logging
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any
+from fastapi import APIRouter, Depends
+from typing import Dict, Any, List, Tuple
 
 from app.ai.prompts.readme import readme_system_prompt, get_readme_user_prompt
 from app.ai.prompts.ai_rules import create_ai_rules_system_prompt, get_create_ai_rules_user_prompt
@@ -14,149 +14,144 @@ from app.schemas.ai_text import (
     EnhanceReadmeRequest,
     EnhanceReadmeResponse,
 )
-from app.services.ai_service import FAST_MODEL, AIService
+from app.services.ai_service import AIService, FAST_MODEL, get_ai_service
 from app.core.firebase_auth import get_current_user
-from app.utils.llm_logging import DefaultLLMLogger
-from app.db.base import db
-from app.services.db_usage_tracker import DatabaseUsageTracker
+from app.api.routes.ai_text_utils import (
+    build_log_metadata,
+    cache_enhance_response,
+    streaming_text_response,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/ai-text", tags=["AI Text"])
 
 
+def build_readme_prompt(
+    request: EnhanceReadmeRequest, current_user: Dict[str, Any]
+) -> Tuple[str, List[Dict[str, Any]], Dict[str, Any]]:
+    """Build the system prompt, user messages and logging metadata for a README request."""
+    # Create the system message
+    system_message = readme_system_prompt(request.additional_user_instruction)
+
+    # Create the user message
+    user_message = get_readme_user_prompt(
+        request.project_name,
+        request.project_description,
+        request.business_goals,
+        request.requirements,
+        request.features,
+        request.tech_stack,
+        request.additional_user_instruction,
+    )
+
+    log_metadata = build_log_metadata(
+        request,
+        current_user,
+        project_name=request.project_name,
+        project_description=request.project_description,
+        business_goals=request.business_goals,
+        requirements=request.requirements,
+        features=request.features,
+        tech_stack=request.tech_stack,
+        additional_user_instruction=request.additional_user_instruction,
+    )
+
+    return system_message, [{"role": "user", "content": user_message}], log_metadata
+
+
 @router.post("/enhance-readme", response_model=EnhanceReadmeResponse)
+@cache_enhance_response
 async def enhance_readme(
-    request: EnhanceReadmeRequest, current_user: Dict[str, Any] = Depends(get_current_user)
+    request: EnhanceReadmeRequest,
+    stream: bool = False,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    client: AIService = Depends(get_ai_service),
 ):
     """
     Enhance project README using AI.
 
     This endpoint takes project information including name, description, business goals,
     requirements, features, and tech stack, and generates a comprehensive README markdown file.
-    """
-    try:
-        # Create the service objects
-        llm_logger = DefaultLLMLogger()
-        usage_tracker = DatabaseUsageTracker(db.get_db())
-
-        # Initialize the AI client with the logger and usage tracker
-        client = AIService(llm_logger, usage_tracker)
-
-        # Create the system message
-        system_message = readme_system_prompt(request.additional_user_instruction)
-
-        # Create the user message
-        user_message = get_readme_user_prompt(
-            request.project_name,
-            request.project_description,
-            request.business_goals,
-            request.requirements,
-            request.features,
-            request.tech_stack,
-            request.additional_user_instruction,
-        )
 
-        # Generate the response
-        messages = [{"role": "user", "content": user_message}]
-        response = await client.generate_response(
-            messages,
-            system_message,
-            FAST_MODEL,
-            log_metadata={
-                "user_id": current_user.get("firebase_uid") if current_user else None,
-                "project_id": request.project_id if hasattr(request, "project_id") else "unknown",
-                "project_name": request.project_name,
-                "project_description": request.project_description,
-                "business_goals": request.business_goals,
-                "requirements": request.requirements,
-                "features": request.features,
-                "tech_stack": request.tech_stack,
-                "additional_user_instruction": request.additional_user_instruction,
-            },
-            response_type="enhance_readme",
-            check_credits=True,
-            use_token_api_for_estimation=True,
+    With ``stream=true`` the response is a server-sent event stream of markdown chunks,
+    followed by a final event with the enhanced README.
+    """
+    system_message, messages, log_metadata = build_readme_prompt(request, current_user)
+
+    # Generate the response
+    if stream:
+        # Send the markdown as it is generated instead of waiting for the full README
+        return await streaming_text_response(
+            client.stream_response(
+                messages,
+                system_message,
+                FAST_MODEL,
+                log_metadata=log_metadata,
+                response_type="enhance_readme",
+                check_credits=True,
+                use_token_api_for_estimation=True,
+            ),
+            lambda text: {"enhanced_readme": text.strip()},
+            logger,
         )
 
-        # Handle potential credit errors - check the response content if it's a dict
-        if (
-            isinstance(response, dict)
-            and isinstance(response.get("content"), str)
-            and response["content"].startswith("Insufficient credits")
-        ):
-            raise HTTPException(status_code=402, detail=response["content"])
-        elif isinstance(response, str) and response.startswith("Insufficient credits"):
-            raise HTTPException(status_code=402, detail=response)
+    response = await client.generate_response(
+        messages,
+        system_message,
+        FAST_MODEL,
+        log_metadata=log_metadata,
+        response_type="enhance_readme",
+        check_credits=True,
+        use_token_api_for_estimation=True,
+    )
 
-        # Return the enhanced README
-        return EnhanceReadmeResponse(enhanced_readme=response.strip())
-    except Exception as e:
-        logger.error(f"Error generating README: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to generate README: {str(e)}")
+    # Return the enhanced README
+    return EnhanceReadmeResponse(enhanced_readme=response.strip())
 
 
 @router.post("/create-ai-rules", response_model=CreateAIRulesResponse)
 async def create_ai_rules(
-    request: CreateAIRulesRequest, current_user: Dict[str, Any] = Depends(get_current_user)
+    request: CreateAIRulesRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    client: AIService = Depends(get_ai_service),
 ):
     """
     Create AI rules using AI."""
-    try:
-        # Create the service objects
-        llm_logger = DefaultLLMLogger()
-        usage_tracker = DatabaseUsageTracker(db.get_db())
-
-        # Initialize the AI client with the logger and usage tracker
-        client = AIService(llm_logger, usage_tracker)
-
-        # Create the system message
-        system_message = create_ai_rules_system_prompt(request.additional_user_instruction)
-
-        # Create the user message
-        user_message = get_create_ai_rules_user_prompt(
-            request.project_name,
-            request.project_description,
-            request.business_goals,
-            request.requirements,
-            request.features,
-            request.tech_stack,
-            request.additional_user_instruction,
-        )
-
-        # Generate the response
-        messages = [{"role": "user", "content": user_message}]
-        response = await client.generate_response(
-            messages,
-            system_message,
-            FAST_MODEL,
-            log_metadata={
-                "user_id": current_user.get("firebase_uid") if current_user else None,
-                "project_id": request.project_id if hasattr(request, "project_id") else "unknown",
-                "project_name": request.project_name,
-                "project_description": request.project_description,
-                "business_goals": request.business_goals,
-                "requirements": request.requirements,
-                "features": request.features,
-                "tech_stack": request.tech_stack,
-                "additional_user_instruction": request.additional_user_instruction,
-            },
-            response_type="create_ai_rules",
-            check_credits=True,
-            use_token_api_for_estimation=True,
-        )
-
-        # Handle potential credit errors - check the response content if it's a dict
-        if (
-            isinstance(response, dict)
-            and isinstance(response.get("content"), str)
-            and response["content"].startswith("Insufficient credits")
-        ):
-            raise HTTPException(status_code=402, detail=response["content"])
-        elif isinstance(response, str) and response.startswith("Insufficient credits"):
-            raise HTTPException(status_code=402, detail=response)
-
-        # Return the created AI rules
-        return CreateAIRulesResponse(ai_rules=response.strip())
-    except Exception as e:
-        logger.error(f"Error creating AI rules: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to create AI rules: {str(e)}")
+    # Create the system message
+    system_message = create_ai_rules_system_prompt(request.additional_user_instruction)
+
+    # Create the user message
+    user_message = get_create_ai_rules_user_prompt(
+        request.project_name,
+        request.project_description,
+        request.business_goals,
+        request.requirements,
+        request.features,
+        request.tech_stack,
+        request.additional_user_instruction,
+    )
+
+    # Generate the response
+    messages = [{"role": "user", "content": user_message}]
+    response = await client.generate_response(
+        messages,
+        system_message,
+        FAST_MODEL,
+        log_metadata=build_log_metadata(
+            request,
+            current_user,
+            project_name=request.project_name,
+            project_description=request.project_description,
+            business_goals=request.business_goals,
+            requirements=request.requirements,
+            features=request.features,
+            tech_stack=request.tech_stack,
+            additional_user_instruction=request.additional_user_instruction,
+        ),
+        response_type="create_ai_rules",
+        check_credits=True,
+        use_token_api_for_estimation=True,
+    )
+
+    # Return the created AI rules
+    return CreateAIRulesResponse(ai_rules=response.strip())
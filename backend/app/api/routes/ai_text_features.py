@@ -3,9 +3,8 @@ API routes for feature enhancement using AI.
 """
 
 import logging
-import json
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 
 from app.ai.tools.print_features import print_features_input_schema
 from app.ai.prompts.features import get_features_user_prompt
@@ -14,20 +13,77 @@ from app.schemas.ai_text import (
     FeaturesEnhanceResponse,
     FeaturesData,
 )
-from app.services.ai_service import AIService, INTELLIGENT_MODEL
+from app.services.ai_service import AIService, get_ai_service, INTELLIGENT_MODEL
 from app.core.firebase_auth import get_current_user
-from app.api.routes.ai_text_utils import extract_data_from_response
-from app.utils.llm_logging import DefaultLLMLogger
-from app.db.base import db
-from app.services.db_usage_tracker import DatabaseUsageTracker
+from app.api.routes.ai_text_utils import (
+    build_log_metadata,
+    cache_enhance_response,
+    extract_data_from_response,
+    format_bullet_list,
+    format_json,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/ai-text", tags=["AI Text"])
 
+# Tool definitions are static, so they are built once at import time
+_FEATURES_TOOLS = [print_features_input_schema()]
+
+
+def build_features_prompt(
+    request: FeaturesEnhanceRequest, current_user: Dict[str, Any]
+) -> Tuple[str, List[Dict[str, Any]], Dict[str, Any]]:
+    """Build the system prompt, user messages and logging metadata for a features request."""
+    # Without any project information there is nothing to base the features on
+    if not (request.project_description.strip() or request.business_goals or request.requirements):
+        raise HTTPException(
+            status_code=400,
+            detail="A project description, business goals or requirements are needed to enhance features",
+        )
+
+    # Create the system message
+    system_message = (
+        "You are a product manager refining or generating features for a software project. "
+        "Based on the project description, business goals, and requirements, create a comprehensive feature list."
+    )
+
+    # Format the business goals and requirements as strings
+    formatted_goals = format_bullet_list(request.business_goals)
+    formatted_requirements = format_bullet_list(request.requirements)
+
+    # Format the original features if provided
+    formatted_features = "None provided"
+    if request.user_features and len(request.user_features) > 0:
+        formatted_features = format_json(request.user_features)
+
+    user_prompt = get_features_user_prompt(
+        request.project_description,
+        formatted_goals,
+        formatted_requirements,
+        formatted_features,
+        request.additional_user_instruction,
+    )
+
+    # Metadata for logging and usage tracking
+    log_metadata = build_log_metadata(
+        request,
+        current_user,
+        project_description=request.project_description,
+        business_goals=request.business_goals,
+        requirements=request.requirements,
+        user_features=request.user_features,
+        additional_user_instruction=request.additional_user_instruction,
+    )
+
+    return system_message, [{"role": "user", "content": user_prompt}], log_metadata
+
 
 @router.post("/enhance-features", response_model=FeaturesEnhanceResponse)
+@cache_enhance_response(normalized_fields=["project_description", "business_goals", "requirements"])
 async def enhance_features(
-    request: FeaturesEnhanceRequest, current_user: Dict[str, Any] = Depends(get_current_user)
+    request: FeaturesEnhanceRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    client: AIService = Depends(get_ai_service),
 ):
     """
     Enhance project features using AI with function calling.
@@ -36,80 +92,28 @@ async def enhance_features(
     existing features, and returns an improved, structured feature set with core and optional modules.
     It uses Anthropic's tool use feature to ensure a structured response.
     """
-    try:
-        # Create the service objects
-        llm_logger = DefaultLLMLogger()
-        usage_tracker = DatabaseUsageTracker(db.get_db())
-
-        # Initialize the AI client with the logger and usage tracker
-        client = AIService(llm_logger, usage_tracker)
-
-        # Create the system message
-        system_message = (
-            "You are a product manager refining or generating features for a software project. "
-            "Based on the project description, business goals, and requirements, create a comprehensive feature list."
-        )
-
-        # Format the business goals and requirements as strings
-        formatted_goals = "\n".join([f"- {goal}" for goal in request.business_goals])
-        formatted_requirements = "\n".join([f"- {req}" for req in request.requirements])
-
-        # Format the original features if provided
-        formatted_features = "None provided"
-        if request.user_features and len(request.user_features) > 0:
-            formatted_features = json.dumps(request.user_features, indent=2)
-
-        user_prompt = get_features_user_prompt(
-            request.project_description,
-            formatted_goals,
-            formatted_requirements,
-            formatted_features,
-            request.additional_user_instruction,
+    system_message, messages, log_metadata = build_features_prompt(request, current_user)
+
+    # Generate the tool use response
+    response = await client.get_tool_use_response(
+        system_message,
+        _FEATURES_TOOLS,
+        messages,
+        model=INTELLIGENT_MODEL,
+        log_metadata=log_metadata,
+        response_type="enhance_features",
+        check_credits=True,
+        use_token_api_for_estimation=True,
+    )
+
+    if "error" in response:
+        logger.error(f"Error in AI tool use: {response['error']}")
+        raise HTTPException(
+            status_code=500, detail=f"Failed to generate features: {response['error']}"
         )
 
-        # Generate the tool use response
-        messages = [{"role": "user", "content": user_prompt}]
-        tools = [print_features_input_schema()]
-        response = await client.get_tool_use_response(
-            system_message,
-            tools,
-            messages,
-            model=INTELLIGENT_MODEL,
-            log_metadata={
-                "user_id": current_user.get("firebase_uid") if current_user else None,
-                "project_id": request.project_id if hasattr(request, "project_id") else "unknown",
-                "project_description": request.project_description,
-                "business_goals": request.business_goals,
-                "requirements": request.requirements,
-                "user_features": request.user_features,
-                "additional_user_instruction": request.additional_user_instruction,
-            },
-            response_type="enhance_features",
-            check_credits=True,
-            use_token_api_for_estimation=True,
-        )
+    # Extract features data with fallback mechanisms
+    features_data = extract_data_from_response(response, FeaturesData, logger)
 
-        # Handle potential credit errors - check the response content if it's a dict
-        if (
-            isinstance(response, dict)
-            and isinstance(response.get("content"), str)
-            and response["content"].startswith("Insufficient credits")
-        ):
-            raise HTTPException(status_code=402, detail=response["content"])
-        elif isinstance(response, str) and response.startswith("Insufficient credits"):
-            raise HTTPException(status_code=402, detail=response)
-
-        if "error" in response:
-            logger.error(f"Error in AI tool use: {response['error']}")
-            raise HTTPException(
-                status_code=500, detail=f"Failed to generate features: {response['error']}"
-            )
-
-        # Extract features data with fallback mechanisms
-        features_data = extract_data_from_response(response, FeaturesData, logger)
-
-        # Return the enhanced features
-        return FeaturesEnhanceResponse(data=features_data)
-    except Exception as e:
-        logger.error(f"Error enhancing features: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to enhance features: {str(e)}")
+    # Return the enhanced features
+    return FeaturesEnhanceResponse(data=features_data)
@@ -2,46 +2,97 @@
 API routes for implementation prompts generation.
 """
 
+import asyncio
 import logging
-import json
 import re
+import textwrap
+import orjson
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import Dict, Any, List, Optional
 
-from app.ai.prompts.implementation_prompts import prepare_implementation_prompt
+from app.ai.prompts.implementation_prompts import (
+    get_additional_instruction_prompt,
+    prepare_implementation_prompt,
+)
 from app.schemas.ai_text import (
     ImplementationPromptGenerateRequest,
     ImplementationPromptResponse,
     ImplementationPromptsGenerateResponse,
 )
+from app.schemas.project_specs import ProjectSpec
 from app.schemas.shared_schemas import ImplementationPromptType
-from app.services.ai_service import INTELLIGENT_MODEL, AIService
+from app.services.ai_service import AIService, INTELLIGENT_MODEL, get_ai_service
 from app.services.project_specs_service import ProjectSpecsService
 from app.core.firebase_auth import get_current_user
 from app.db.base import db
-from app.utils.llm_logging import DefaultLLMLogger
-from app.utils.llm_logging import CustomEncoder
-from app.services.db_usage_tracker import DatabaseUsageTracker
+from app.api.routes.ai_text_utils import build_log_metadata, streaming_text_response
+from app.utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/ai-text", tags=["AI Text"])
 
+# System message that instructs the model about the expected format. It is the same for
+# every request, so it is built (and dedented, to keep indentation out of the prompt) once
+_SYSTEM_MESSAGE = textwrap.dedent(
+    """
+    You are an expert AI systems architect and developer that specializes in generating implementation prompts.
+
+    A user will provide you with specifications and you need to generate implementation prompts that will guide an AI assistant to implement the code.
+
+    Generate three implementation prompts:
+    1. A main prompt covering the core implementation steps
+    2. A first follow-up prompt assuming the main prompt was partially implemented
+    3. A second follow-up prompt for finishing the implementation
+
+    Place the main prompt within the <MAIN></MAIN> tag.
+    Place the first follow-up prompt within the <FOLLOWUP1></FOLLOWUP1> tag.
+    Place the second follow-up prompt within the <FOLLOWUP2></FOLLOWUP2> tag.
+
+    The implementation prompts should be clear, specific, and actionable.
+    """
+).strip()
+
+# Context window of the model, in tokens, less room for the generated prompts. Larger
+# prompts are rejected before the AI call, since the API would reject them anyway
+_MAX_PROMPT_TOKENS = 200_000 - 8_000
+
+# Tags the model is asked to wrap each generated prompt in, matched in a single pass
+_PROMPT_TAG_RE = re.compile(r"<(MAIN|FOLLOWUP1|FOLLOWUP2)>(.*?)</\1>", re.DOTALL)
+_PROMPT_TAG_KEYS = {"MAIN": "main", "FOLLOWUP1": "followup_1", "FOLLOWUP2": "followup_2"}
+
+# Spec data serialized for prompts, keyed by spec id and revision
+_SERIALIZED_SPEC_CACHE = TTLCache(maxsize=512, ttl=3600)
+
 
-def convert_to_serializable(obj):
-    """Convert objects to serializable format."""
-    if isinstance(obj, dict):
-        return {k: convert_to_serializable(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_to_serializable(item) for item in obj]
-    elif hasattr(obj, "model_dump"):
-        # For Pydantic models
-        return obj.model_dump()
-    elif hasattr(obj, "__dict__"):
-        # For regular Python classes
-        return obj.__dict__
-    else:
-        # Return as is for basic types
-        return obj
+def _serialize_spec_data(spec: Optional[ProjectSpec]) -> str:
+    """
+    Serialize the data of a project spec as JSON for an implementation prompt.
+
+    Prompts are usually generated for several categories of the same project in a row,
+    so the serialized data is cached per spec revision. Updating a spec bumps its version
+    and ``updated_at``, so a stale serialization is never used.
+
+    Args:
+        spec: The project spec, if the project has one
+
+    Returns:
+        The spec data as JSON, or an empty string if there is no data
+    """
+    if not spec or not spec.data:
+        return ""
+
+    key = (spec.id, spec.version, spec.updated_at)
+    serialized = _SERIALIZED_SPEC_CACHE.get(key)
+    if serialized is None:
+        # Spec data is a Pydantic model except for the dict-based specs; both are dumped
+        # to JSON natively instead of walking the tree in Python first
+        if hasattr(spec.data, "model_dump_json"):
+            serialized = spec.data.model_dump_json()
+        else:
+            serialized = orjson.dumps(spec.data).decode()
+        _SERIALIZED_SPEC_CACHE.set(key, serialized)
+    return serialized
 
 
 def extract_project_specs(project_id: str, db):
@@ -61,20 +112,9 @@ def extract_prompts_from_response(response_text: str) -> Dict[str, str]:
     """
     prompts = {}
 
-    # Extract main prompt
-    main_match = re.search(r"<MAIN>(.*?)</MAIN>", response_text, re.DOTALL)
-    if main_match:
-        prompts["main"] = main_match.group(1).strip()
-
-    # Extract followup prompt 1
-    followup1_match = re.search(r"<FOLLOWUP1>(.*?)</FOLLOWUP1>", response_text, re.DOTALL)
-    if followup1_match:
-        prompts["followup_1"] = followup1_match.group(1).strip()
-
-    # Extract followup prompt 2
-    followup2_match = re.search(r"<FOLLOWUP2>(.*?)</FOLLOWUP2>", response_text, re.DOTALL)
-    if followup2_match:
-        prompts["followup_2"] = followup2_match.group(1).strip()
+    # Extract the tagged prompts; the first occurrence of a tag wins
+    for match in _PROMPT_TAG_RE.finditer(response_text):
+        prompts.setdefault(_PROMPT_TAG_KEYS[match.group(1)], match.group(2).strip())
 
     # If no tags found but there's content, assume it's a main prompt
     if not prompts and response_text.strip():
@@ -83,244 +123,302 @@ def extract_prompts_from_response(response_text: str) -> Dict[str, str]:
     return prompts
 
 
+def _build_prompts_response(
+    response: str, prompt_type: Optional[ImplementationPromptType] = None
+) -> ImplementationPromptsGenerateResponse:
+    """
+    Build the implementation prompts response from the LLM response.
+
+    Args:
+        response: The raw LLM response text
+        prompt_type: Only return prompts of this type, if given
+
+    Returns:
+        The generated prompts
+    """
+    # Parse the response to extract the different prompt types
+    parsed_prompts = extract_prompts_from_response(response)
+
+    # Convert the parsed prompts to the expected response format
+    generated_prompts = []
+
+    # Add the main prompt if it exists
+    if "main" in parsed_prompts:
+        generated_prompts.append(
+            ImplementationPromptResponse(
+                type=ImplementationPromptType.MAIN, content=parsed_prompts["main"]
+            )
+        )
+
+    # Add the follow-up 1 prompt if it exists
+    if "followup_1" in parsed_prompts:
+        generated_prompts.append(
+            ImplementationPromptResponse(
+                type=ImplementationPromptType.FOLLOWUP_1, content=parsed_prompts["followup_1"]
+            )
+        )
+
+    # Add the follow-up 2 prompt if it exists
+    if "followup_2" in parsed_prompts:
+        generated_prompts.append(
+            ImplementationPromptResponse(
+                type=ImplementationPromptType.FOLLOWUP_2, content=parsed_prompts["followup_2"]
+            )
+        )
+
+    # If no prompts were extracted but there was a response, use the whole response as a main prompt
+    if not generated_prompts and response.strip():
+        generated_prompts.append(
+            ImplementationPromptResponse(
+                type=ImplementationPromptType.MAIN, content=response.strip()
+            )
+        )
+
+    # Check if we need to filter results based on requested prompt type
+    if prompt_type:
+        generated_prompts = [p for p in generated_prompts if p.type == prompt_type]
+
+    # Return the generated prompts
+    return ImplementationPromptsGenerateResponse(prompts=generated_prompts)
+
+
+class _StreamedPromptScanner:
+    """
+    Find the tagged prompts of a streamed LLM response as soon as each one is complete.
+
+    Called with every chunk of the response, it returns a ``{"prompt": ...}`` event for
+    each prompt whose closing tag has arrived.
+    """
+
+    def __init__(self, prompt_type: Optional[ImplementationPromptType] = None) -> None:
+        self.prompt_type = prompt_type
+        self.text = ""
+        # Where scanning resumes: the end of the last complete prompt
+        self.position = 0
+        self.found = set()
+
+    def __call__(self, chunk: str) -> List[Dict[str, Any]]:
+        self.text += chunk
+        events = []
+        for match in _PROMPT_TAG_RE.finditer(self.text, self.position):
+            self.position = match.end()
+            prompt_type = ImplementationPromptType(_PROMPT_TAG_KEYS[match.group(1)])
+            # The first occurrence of a tag wins, like in extract_prompts_from_response
+            if prompt_type in self.found:
+                continue
+            self.found.add(prompt_type)
+            if self.prompt_type and prompt_type != self.prompt_type:
+                continue
+            prompt = ImplementationPromptResponse(type=prompt_type, content=match.group(2).strip())
+            events.append({"prompt": prompt.model_dump(mode="json")})
+        return events
+
+
+async def _load_project_and_specs(
+    project_id: str, database: AsyncIOMotorDatabase
+) -> Dict[str, Any]:
+    """
+    Load the project description and each spec of an implementation prompt separately.
+
+    The lookups are independent, so they are sent to the database concurrently. A spec
+    that cannot be loaded is left out of the prompt instead of failing the request.
+    """
+    lookups = {
+        "project": database.projects.find_one(
+            {"id": project_id}, projection={"description": 1, "_id": 0}
+        ),
+        "tech_stack": ProjectSpecsService.get_tech_stack_spec(project_id, database),
+        "requirements": ProjectSpecsService.get_requirements_spec(project_id, database),
+        "features": ProjectSpecsService.get_features_spec(project_id, database),
+        "ui_design": ProjectSpecsService.get_ui_design_spec(project_id, database),
+        "pages": ProjectSpecsService.get_pages_spec(project_id, database),
+        "data_model": ProjectSpecsService.get_data_model_spec(project_id, database),
+        "api": ProjectSpecsService.get_api_spec(project_id, database),
+        "test_cases": ProjectSpecsService.get_test_cases_spec(project_id, database),
+    }
+    results = dict(zip(lookups, await asyncio.gather(*lookups.values(), return_exceptions=True)))
+
+    for name, result in results.items():
+        if isinstance(result, Exception):
+            logger.warning(f"Failed to load {name} for project {project_id}: {result}")
+            results[name] = None
+    return results
+
+
 @router.post(
     "/generate-implementation-prompt", response_model=ImplementationPromptsGenerateResponse
 )
 async def generate_implementation_prompt(
     request: ImplementationPromptGenerateRequest,
+    stream: bool = False,
     current_user: Dict[str, Any] = Depends(get_current_user),
+    client: AIService = Depends(get_ai_service),
 ):
     """
     Generate implementation prompts for a specific category.
 
     This endpoint generates implementation prompts for a specific category of a project.
     It uses AI to generate prompts based on the project specifications.
-    """
-    try:
-        # Create the service objects
-        llm_logger = DefaultLLMLogger()
-        usage_tracker = DatabaseUsageTracker(db.get_db())
-
-        # Initialize the AI client with the logger and usage tracker
-        client = AIService(llm_logger, usage_tracker)
-
-        # Get the database
-        database = db.get_db()
-        if database is None:
-            raise HTTPException(status_code=500, detail="Database connection not available")
-
-        # Get project specifications
-        project = await database.projects.find_one({"id": request.project_id})
-        tech_stack_spec = await ProjectSpecsService.get_tech_stack_spec(
-            request.project_id, database
-        )
-        requirements_spec = await ProjectSpecsService.get_requirements_spec(
-            request.project_id, database
-        )
-        features_spec = await ProjectSpecsService.get_features_spec(request.project_id, database)
-        ui_design_spec = await ProjectSpecsService.get_ui_design_spec(request.project_id, database)
-        pages_spec = await ProjectSpecsService.get_pages_spec(request.project_id, database)
-        data_model_spec = await ProjectSpecsService.get_data_model_spec(
-            request.project_id, database
-        )
-        api_spec = await ProjectSpecsService.get_api_spec(request.project_id, database)
-        test_cases_spec = await ProjectSpecsService.get_test_cases_spec(
-            request.project_id, database
-        )
 
-        # Extract relevant data from project specs
-        project_description = project.get("description", "") if project else ""
+    With ``stream=true`` the response is a server-sent event stream of text chunks, with a
+    ``{"prompt": ...}`` event as soon as each prompt is complete, followed by a final
+    event with all the prompts.
+    """
+    # Get the database
+    database = db.get_db()
+    if database is None:
+        raise HTTPException(status_code=500, detail="Database connection not available")
 
-        # Convert complex objects to serializable format
-        serializable_tech_stack = (
-            convert_to_serializable(tech_stack_spec.data)
-            if tech_stack_spec and tech_stack_spec.data
-            else {}
-        )
-        serializable_features = (
-            convert_to_serializable(features_spec.data)
-            if features_spec and features_spec.data
-            else {}
-        )
-        serializable_ui_design = (
-            convert_to_serializable(ui_design_spec.data)
-            if ui_design_spec and ui_design_spec.data
-            else {}
-        )
-        serializable_pages = (
-            convert_to_serializable(pages_spec.data) if pages_spec and pages_spec.data else {}
-        )
-        serializable_data_models = (
-            convert_to_serializable(data_model_spec.data)
-            if data_model_spec and data_model_spec.data
-            else {}
-        )
-        serializable_api = (
-            convert_to_serializable(api_spec.data) if api_spec and api_spec.data else {}
+    # Get the project and its specifications in one round trip, falling back to loading
+    # them one by one if the aggregation fails
+    try:
+        results = await ProjectSpecsService.get_project_with_specs(request.project_id, database)
+    except Exception as e:
+        logger.warning(f"Failed to load project {request.project_id} with its specs: {e}")
+        results = await _load_project_and_specs(request.project_id, database)
+
+    # Don't spend an AI call (and the user's credits) on a project that does not exist
+    if results is None or results["project"] is None:
+        raise HTTPException(status_code=404, detail=f"Project {request.project_id} not found")
+
+    project = results["project"]
+    tech_stack_spec = results["tech_stack"]
+    requirements_spec = results["requirements"]
+    features_spec = results["features"]
+    ui_design_spec = results["ui_design"]
+    pages_spec = results["pages"]
+    data_model_spec = results["data_model"]
+    api_spec = results["api"]
+    test_cases_spec = results["test_cases"]
+
+    # Extract relevant data from project specs
+    project_description = project.get("description", "")
+
+    # Serialize the spec data for the prompt
+    tech_stack = _serialize_spec_data(tech_stack_spec)
+    features = _serialize_spec_data(features_spec)
+    ui_design = _serialize_spec_data(ui_design_spec)
+    pages = _serialize_spec_data(pages_spec)
+    data_models = _serialize_spec_data(data_model_spec)
+    api_endpoints = _serialize_spec_data(api_spec)
+    test_cases = _serialize_spec_data(test_cases_spec)
+
+    # Extract functional requirements from requirements spec
+    fr_spec = ""
+    if requirements_spec and requirements_spec.functional:
+        fr_spec = "\n".join(requirements_spec.functional)
+
+    # Extract non-functional requirements from requirements spec
+    nfr_spec = ""
+    if requirements_spec and requirements_spec.non_functional:
+        nfr_spec = "\n".join(requirements_spec.non_functional)
+
+    # Without a description or any specs, there is nothing to generate prompts from
+    if not any(
+        (
+            project_description,
+            tech_stack,
+            features,
+            ui_design,
+            pages,
+            data_models,
+            api_endpoints,
+            test_cases,
+            fr_spec,
+            nfr_spec,
         )
-        serializable_test_cases = (
-            convert_to_serializable(test_cases_spec.data)
-            if test_cases_spec and test_cases_spec.data
-            else {}
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="The project has no description or specifications to generate prompts from",
         )
 
-        # Now serialize to JSON
-        tech_stack = (
-            json.dumps(serializable_tech_stack, cls=CustomEncoder)
-            if serializable_tech_stack
-            else ""
-        )
-        features = (
-            json.dumps(serializable_features, cls=CustomEncoder) if serializable_features else ""
-        )
-        ui_design = (
-            json.dumps(serializable_ui_design, cls=CustomEncoder) if serializable_ui_design else ""
-        )
-        pages = json.dumps(serializable_pages, cls=CustomEncoder) if serializable_pages else ""
-        data_models = (
-            json.dumps(serializable_data_models, cls=CustomEncoder)
-            if serializable_data_models
-            else ""
-        )
-        api_endpoints = json.dumps(serializable_api, cls=CustomEncoder) if serializable_api else ""
-        test_cases = (
-            json.dumps(serializable_test_cases, cls=CustomEncoder)
-            if serializable_test_cases
-            else ""
+    # Prepare the implementation prompt. The user's instruction is left out of it, so the
+    # filled-in template stays the same for repeated requests of a category
+    meta_prompt = prepare_implementation_prompt(
+        category=request.category,
+        project_description=project_description,
+        tech_stack=tech_stack,
+        data_models=data_models,
+        api_endpoints=api_endpoints,
+        features=features,
+        ui_design=ui_design,
+        pages=pages,
+        test_cases=test_cases,
+        fr_spec=fr_spec,
+        nfr_spec=nfr_spec,
+    )
+
+    if not meta_prompt:
+        raise HTTPException(status_code=400, detail=f"Invalid category: {request.category}")
+
+    # The specs come first, in their own block marked for prompt caching, so regenerating
+    # the prompts of a category (also with other instructions) reads them from the cache
+    content = [{"type": "text", "text": meta_prompt, "cache_control": {"type": "ephemeral"}}]
+    if request.additional_user_instruction:
+        content.append(
+            {
+                "type": "text",
+                "text": get_additional_instruction_prompt(request.additional_user_instruction),
+            }
         )
 
-        # Extract functional requirements from requirements spec
-        fr_spec = ""
-        if requirements_spec and requirements_spec.functional:
-            fr_spec = "\n".join(requirements_spec.functional)
-
-        # Extract non-functional requirements from requirements spec
-        nfr_spec = ""
-        if requirements_spec and requirements_spec.non_functional:
-            nfr_spec = "\n".join(requirements_spec.non_functional)
-
-        # Prepare the implementation prompt
-        meta_prompt = prepare_implementation_prompt(
-            category=request.category,
-            project_description=project_description,
-            tech_stack=tech_stack,
-            data_models=data_models,
-            api_endpoints=api_endpoints,
-            features=features,
-            ui_design=ui_design,
-            pages=pages,
-            test_cases=test_cases,
-            fr_spec=fr_spec,
-            nfr_spec=nfr_spec,
-            additional_user_instruction=request.additional_user_instruction,
+    # Estimate the prompt size locally at about 4 characters per token, like the credit check
+    estimated_tokens = (len(_SYSTEM_MESSAGE) + sum(len(block["text"]) for block in content)) // 4
+    if estimated_tokens > _MAX_PROMPT_TOKENS:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                f"The project specifications are too large to generate prompts from "
+                f"(about {estimated_tokens} tokens, limit {_MAX_PROMPT_TOKENS})"
+            ),
         )
 
-        if not meta_prompt:
-            raise HTTPException(status_code=400, detail=f"Invalid category: {request.category}")
-
-        # Create a system message that instructs the model about the expected format
-        system_message = """
-        You are an expert AI systems architect and developer that specializes in generating implementation prompts.
-        
-        A user will provide you with specifications and you need to generate implementation prompts that will guide an AI assistant to implement the code.
-        
-        Generate three implementation prompts:
-        1. A main prompt covering the core implementation steps
-        2. A first follow-up prompt assuming the main prompt was partially implemented
-        3. A second follow-up prompt for finishing the implementation
-        
-        Place the main prompt within the <MAIN></MAIN> tag.
-        Place the first follow-up prompt within the <FOLLOWUP1></FOLLOWUP1> tag.
-        Place the second follow-up prompt within the <FOLLOWUP2></FOLLOWUP2> tag.
-        
-        The implementation prompts should be clear, specific, and actionable.
-        """
-
-        # Generate the response with a single API call
-        messages = [{"role": "user", "content": meta_prompt}]
-
-        response = await client.generate_response(
-            messages=messages,
-            system=system_message,
-            model=INTELLIGENT_MODEL,
-            log_metadata={
-                "user_id": current_user.get("firebase_uid") if current_user else None,
-                "project_id": request.project_id if hasattr(request, "project_id") else "unknown",
-                "project_description": project_description,
-                "category": request.category,
-                "tech_stack": tech_stack,
-                "data_models": data_models,
-                "api_endpoints": api_endpoints,
-                "features": features,
-                "ui_design": ui_design,
-                "pages": pages,
-                "test_cases": test_cases,
-                "functional_requirements": fr_spec,
-                "non_functional_requirements": nfr_spec,
-                "additional_user_instruction": request.additional_user_instruction,
-            },
-            response_type="generate_implementation_prompt",
-            check_credits=True,
-            use_token_api_for_estimation=True,
+    # Generate the response with a single API call
+    messages = [{"role": "user", "content": content}]
+    log_metadata = build_log_metadata(
+        request,
+        current_user,
+        project_description=project_description,
+        category=request.category,
+        tech_stack=tech_stack,
+        data_models=data_models,
+        api_endpoints=api_endpoints,
+        features=features,
+        ui_design=ui_design,
+        pages=pages,
+        test_cases=test_cases,
+        functional_requirements=fr_spec,
+        non_functional_requirements=nfr_spec,
+        additional_user_instruction=request.additional_user_instruction,
+    )
+
+    if stream:
+        # Send each prompt as soon as it is complete instead of waiting for all three
+        return await streaming_text_response(
+            client.stream_response(
+                messages,
+                _SYSTEM_MESSAGE,
+                INTELLIGENT_MODEL,
+                log_metadata=log_metadata,
+                response_type="generate_implementation_prompt",
+                check_credits=True,
+                use_token_api_for_estimation=True,
+            ),
+            lambda text: _build_prompts_response(text, request.prompt_type).model_dump(mode="json"),
+            logger,
+            chunk_events=_StreamedPromptScanner(request.prompt_type),
         )
 
-        # Handle potential credit errors - check the response content if it's a dict
-        if (
-            isinstance(response, dict)
-            and isinstance(response.get("content"), str)
-            and response["content"].startswith("Insufficient credits")
-        ):
-            raise HTTPException(status_code=402, detail=response["content"])
-        elif isinstance(response, str) and response.startswith("Insufficient credits"):
-            raise HTTPException(status_code=402, detail=response)
-
-        # Parse the response to extract the different prompt types
-        parsed_prompts = extract_prompts_from_response(response)
-
-        # Convert the parsed prompts to the expected response format
-        generated_prompts = []
-
-        # Add the main prompt if it exists
-        if "main" in parsed_prompts:
-            generated_prompts.append(
-                ImplementationPromptResponse(
-                    type=ImplementationPromptType.MAIN, content=parsed_prompts["main"]
-                )
-            )
-
-        # Add the follow-up 1 prompt if it exists
-        if "followup_1" in parsed_prompts:
-            generated_prompts.append(
-                ImplementationPromptResponse(
-                    type=ImplementationPromptType.FOLLOWUP_1, content=parsed_prompts["followup_1"]
-                )
-            )
-
-        # Add the follow-up 2 prompt if it exists
-        if "followup_2" in parsed_prompts:
-            generated_prompts.append(
-                ImplementationPromptResponse(
-                    type=ImplementationPromptType.FOLLOWUP_2, content=parsed_prompts["followup_2"]
-                )
-            )
-
-        # If no prompts were extracted but there was a response, use the whole response as a main prompt
-        if not generated_prompts and response.strip():
-            generated_prompts.append(
-                ImplementationPromptResponse(
-                    type=ImplementationPromptType.MAIN, content=response.strip()
-                )
-            )
-
-        # Check if we need to filter results based on requested prompt type
-        if request.prompt_type:
-            generated_prompts = [p for p in generated_prompts if p.type == request.prompt_type]
-
-        # Return the generated prompts
-        return ImplementationPromptsGenerateResponse(prompts=generated_prompts)
-
-    except Exception as e:
-        logger.error(f"Error generating implementation prompts: {str(e)}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to generate implementation prompts: {str(e)}"
-        )
+    response = await client.generate_response(
+        messages=messages,
+        system=_SYSTEM_MESSAGE,
+        model=INTELLIGENT_MODEL,
+        log_metadata=log_metadata,
+        response_type="generate_implementation_prompt",
+        check_credits=True,
+        use_token_api_for_estimation=True,
+    )
+
+    # Parse the response into the generated prompts
+    return _build_prompts_response(response, request.prompt_type)
@@ -3,7 +3,6 @@ API routes for UI pages enhancement using AI.
 """
 
 import logging
-import json
 from fastapi import APIRouter, HTTPException, Depends
 from typing import Dict, Any
 
@@ -14,20 +13,29 @@ from app.schemas.ai_text import (
     PagesEnhanceResponse,
     PagesData,
 )
-from app.services.ai_service import AIService, INTELLIGENT_MODEL
+from app.services.ai_service import AIService, get_ai_service, INTELLIGENT_MODEL
 from app.core.firebase_auth import get_current_user
-from app.api.routes.ai_text_utils import extract_data_from_response
-from app.utils.llm_logging import DefaultLLMLogger
-from app.db.base import db
-from app.services.db_usage_tracker import DatabaseUsageTracker
+from app.api.routes.ai_text_utils import (
+    build_log_metadata,
+    cache_enhance_response,
+    extract_data_from_response,
+    format_bullet_list,
+    format_json,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/ai-text", tags=["AI Text"])
 
+# Tool definitions are static, so they are built once at import time
+_PAGES_TOOLS = [print_pages_input_schema()]
+
 
 @router.post("/enhance-pages", response_model=PagesEnhanceResponse)
+@cache_enhance_response
 async def enhance_pages(
-    request: PagesEnhanceRequest, current_user: Dict[str, Any] = Depends(get_current_user)
+    request: PagesEnhanceRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    client: AIService = Depends(get_ai_service),
 ):
     """
     Enhance application pages using AI with function calling.
@@ -36,84 +44,68 @@ async def enhance_pages(
     existing pages, and returns an improved, structured set of pages organized by access level.
     It uses Anthropic's tool use feature to ensure a structured response.
     """
-    try:
-        # Create the service objects
-        llm_logger = DefaultLLMLogger()
-        usage_tracker = DatabaseUsageTracker(db.get_db())
-
-        # Initialize the AI client with the logger and usage tracker
-        client = AIService(llm_logger, usage_tracker)
-
-        # Create the system message
-        system_message = (
-            "You are a UX designer generating screen recommendations for a software project. "
-            "Based on the project description, features, and requirements, recommend key UI screens."
+    # Create the system message
+    system_message = (
+        "You are a UX designer generating screen recommendations for a software project. "
+        "Based on the project description, features, and requirements, recommend key UI screens."
+    )
+
+    # Format features and requirements as strings
+    formatted_features = "None provided"
+    if request.features and len(request.features) > 0:
+        formatted_features = format_json(request.features)
+
+    formatted_requirements = format_bullet_list(request.requirements)
+
+    # Dump the existing pages once for both the prompt and the log metadata
+    existing_pages = (
+        request.existing_pages.model_dump(mode="json") if request.existing_pages else None
+    )
+
+    # Format existing pages if provided
+    formatted_existing_pages = "None provided"
+    if existing_pages:
+        formatted_existing_pages = format_json(existing_pages)
+
+    # Create the user message
+    user_prompt = get_pages_user_prompt(
+        request.project_description,
+        formatted_features,
+        formatted_requirements,
+        formatted_existing_pages,
+        request.additional_user_instruction,
+    )
+
+    # Generate the tool use response
+    messages = [{"role": "user", "content": user_prompt}]
+    tools = _PAGES_TOOLS
+    response = await client.get_tool_use_response(
+        system_message,
+        tools,
+        messages,
+        model=INTELLIGENT_MODEL,
+        log_metadata=build_log_metadata(
+            request,
+            current_user,
+            project_description=request.project_description,
+            features=request.features,
+            requirements=request.requirements,
+            existing_pages=existing_pages,
+            additional_user_instruction=request.additional_user_instruction,
+        ),
+        response_type="enhance_pages",
+        check_credits=True,
+        use_token_api_for_estimation=True,
+    )
+
+    if "error" in response:
+        logger.error(f"Error in AI tool use: {response['error']}")
+        raise HTTPException(
+            status_code=500, detail=f"Failed to generate pages: {response['error']}"
         )
 
-        # Format features and requirements as strings
-        formatted_features = "None provided"
-        if request.features and len(request.features) > 0:
-            formatted_features = json.dumps(request.features, indent=2)
-
-        formatted_requirements = "\n".join([f"- {req}" for req in request.requirements])
-
-        # Format existing pages if provided
-        formatted_existing_pages = "None provided"
-        if request.existing_pages:
-            formatted_existing_pages = json.dumps(request.existing_pages.dict(), indent=2)
-
-        # Create the user message
-        user_prompt = get_pages_user_prompt(
-            request.project_description,
-            formatted_features,
-            formatted_requirements,
-            formatted_existing_pages,
-            request.additional_user_instruction,
-        )
-
-        # Generate the tool use response
-        messages = [{"role": "user", "content": user_prompt}]
-        tools = [print_pages_input_schema()]
-        response = await client.get_tool_use_response(
-            system_message,
-            tools,
-            messages,
-            model=INTELLIGENT_MODEL,
-            log_metadata={
-                "user_id": current_user.get("firebase_uid") if current_user else None,
-                "project_id": request.project_id if hasattr(request, "project_id") else "unknown",
-                "project_description": request.project_description,
-                "features": request.features,
-                "requirements": request.requirements,
-                "existing_pages": request.existing_pages.dict() if request.existing_pages else None,
-                "additional_user_instruction": request.additional_user_instruction,
-            },
-            response_type="enhance_pages",
-            check_credits=True,
-            use_token_api_for_estimation=True,
-        )
+    # Extract pages data with fallback mechanisms
+    pages_data = extract_data_from_response(response, PagesData, logger)
 
-        # Handle potential credit errors - check the response content if it's a dict
-        if (
-            isinstance(response, dict)
-            and isinstance(response.get("content"), str)
-            and response["content"].startswith("Insufficient credits")
-        ):
-            raise HTTPException(status_code=402, detail=response["content"])
-        elif isinstance(response, str) and response.startswith("Insufficient credits"):
-            raise HTTPException(status_code=402, detail=response)
-
-        if "error" in response:
-            logger.error(f"Error in AI tool use: {response['error']}")
-            raise HTTPException(
-                status_code=500, detail=f"Failed to generate pages: {response['error']}"
-            )
-
-        # Extract pages data with fallback mechanisms
-        pages_data = extract_data_from_response(response, PagesData, logger)
-
-        # Return the enhanced pages
-        return PagesEnhanceResponse(data=pages_data)
-    except Exception as e:
-        logger.error(f"Error enhancing pages: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to enhance pages: {str(e)}")
+    # Return the enhanced pages
+    return PagesEnhanceResponse(data=pages_data)
@@ -0,0 +1,101 @@
+"""
+API routes for enhancing the project foundation (description, goals, target users
+and requirements) in a single AI call.
+"""
+
+import logging
+from fastapi import APIRouter, HTTPException, Depends
+from typing import Dict, Any
+
+from app.ai.tools.print_project_bundle import print_project_bundle_input_schema
+from app.ai.prompts.project_bundle import (
+    project_bundle_system_prompt,
+    get_project_bundle_user_prompt,
+)
+from app.schemas.ai_text import (
+    ProjectBundleEnhanceRequest,
+    ProjectBundleEnhanceResponse,
+)
+from app.services.ai_service import AIService, get_ai_service, INTELLIGENT_MODEL
+from app.core.firebase_auth import get_current_user
+from app.api.routes.ai_text_utils import (
+    build_log_metadata,
+    cache_enhance_response,
+    extract_data_from_response,
+    format_bullet_list,
+)
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/ai-text", tags=["AI Text"])
+
+# Tool definitions are static, so they are built once at import time
+_PROJECT_BUNDLE_TOOLS = [print_project_bundle_input_schema()]
+
+
+@router.post("/enhance-project-bundle", response_model=ProjectBundleEnhanceResponse)
+@cache_enhance_response
+async def enhance_project_bundle(
+    request: ProjectBundleEnhanceRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    client: AIService = Depends(get_ai_service),
+):
+    """
+    Enhance the project description, business goals, target users and requirements at once.
+
+    The frontend usually calls the individual enhance endpoints back-to-back for the same
+    project. This endpoint sends a single tool use request covering all four sections, so
+    the prompt overhead and network round trip are paid once instead of four times.
+    """
+    has_goals = bool(request.user_goals)
+    has_target_users = bool(request.target_users and request.target_users.strip())
+
+    # Create the composite system message
+    system_message = project_bundle_system_prompt(
+        has_goals, has_target_users, request.additional_user_instruction
+    )
+
+    # Format the business goals and requirements as strings
+    formatted_goals = format_bullet_list(request.user_goals) if has_goals else "None provided"
+    formatted_requirements = (
+        format_bullet_list(request.user_requirements)
+        if request.user_requirements
+        else "None provided"
+    )
+
+    user_prompt = get_project_bundle_user_prompt(
+        request.project_description,
+        formatted_goals,
+        request.target_users if has_target_users else "None provided",
+        formatted_requirements,
+    )
+
+    # Generate the tool use response
+    messages = [{"role": "user", "content": user_prompt}]
+    tools = _PROJECT_BUNDLE_TOOLS
+    response = await client.get_tool_use_response(
+        system_message,
+        tools,
+        messages,
+        model=INTELLIGENT_MODEL,
+        log_metadata=build_log_metadata(
+            request,
+            current_user,
+            project_description=request.project_description,
+            original_goals=request.user_goals,
+            original_target_users=request.target_users,
+            original_requirements=request.user_requirements,
+            additional_user_instruction=request.additional_user_instruction,
+        ),
+        response_type="enhance_project_bundle",
+        check_credits=True,
+        use_token_api_for_estimation=True,
+    )
+
+    if "error" in response:
+        logger.error(f"Error in AI tool use: {response['error']}")
+        raise HTTPException(
+            status_code=500, detail=f"Failed to generate project bundle: {response['error']}"
+        )
+
+    # Extract all four sections atomically with fallback mechanisms
+    return extract_data_from_response(response, ProjectBundleEnhanceResponse, logger)
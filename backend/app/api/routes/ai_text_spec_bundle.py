@@ -0,0 +1,106 @@
+"""
+API routes for generating the data model, API endpoints and test cases of a project
+in a single request.
+"""
+
+import asyncio
+import logging
+from fastapi import APIRouter, HTTPException, Depends
+from typing import Dict, Any
+
+from app.schemas.ai_text import (
+    ApiEndpointsEnhanceRequest,
+    DataModelEnhanceRequest,
+    SpecBundleEnhanceRequest,
+    SpecBundleEnhanceResponse,
+    TestCasesEnhanceRequest,
+)
+from app.services.ai_service import AIService, InsufficientCreditsError, get_ai_service
+from app.core.firebase_auth import get_current_user
+from app.api.routes.ai_text_api_endpoints import create_api_endpoints
+from app.api.routes.ai_text_data_model import create_data_model
+from app.api.routes.ai_text_testing import create_test_cases
+from app.api.routes.ai_text_utils import cache_enhance_response
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/ai-text", tags=["AI Text"])
+
+
+@router.post("/enhance-spec-bundle", response_model=SpecBundleEnhanceResponse)
+@cache_enhance_response(cacheable=lambda response: not response.errors)
+async def enhance_spec_bundle(
+    request: SpecBundleEnhanceRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    client: AIService = Depends(get_ai_service),
+):
+    """
+    Generate the data model, API endpoints and test cases of a project at once.
+
+    None of the three sections needs the output of another (the API endpoints are designed
+    against the existing data model), so the AI calls run concurrently and the request takes
+    as long as the slowest call instead of the sum of all three.
+
+    A section that fails, also for lack of credits, is left empty and its error is
+    reported under ``errors``, so sections that were already generated and billed are
+    not thrown away. The request fails as a whole only if every section failed, with a
+    402 if any of them ran out of credits. Responses with errors are not cached, so a
+    retry generates the failed sections again.
+    """
+    sections = {
+        "data_model": create_data_model(
+            DataModelEnhanceRequest(
+                project_id=request.project_id,
+                project_description=request.project_description,
+                business_goals=request.business_goals,
+                features=request.features,
+                requirements=request.requirements,
+                existing_data_model=request.existing_data_model,
+                additional_user_instruction=request.additional_user_instruction,
+            ),
+            current_user,
+            client,
+        ),
+        "api_endpoints": create_api_endpoints(
+            ApiEndpointsEnhanceRequest(
+                project_id=request.project_id,
+                project_description=request.project_description,
+                features=request.features,
+                data_models=request.existing_data_model or {},
+                requirements=request.requirements,
+                additional_user_instruction=request.additional_user_instruction,
+            ),
+            current_user,
+            client,
+        ),
+        "test_cases": create_test_cases(
+            TestCasesEnhanceRequest(
+                project_id=request.project_id,
+                project_description=request.project_description,
+                requirements=request.requirements,
+                features=request.features,
+                additional_user_instruction=request.additional_user_instruction,
+            ),
+            current_user,
+            client,
+        ),
+    }
+    results = dict(zip(sections, await asyncio.gather(*sections.values(), return_exceptions=True)))
+
+    errors = {name: result for name, result in results.items() if isinstance(result, Exception)}
+    if len(errors) == len(results):
+        # Running out of credits is what the user needs to act on, so it is reported first
+        raise next(
+            (error for error in errors.values() if isinstance(error, InsufficientCreditsError)),
+            next(iter(errors.values())),
+        )
+
+    for name, error in errors.items():
+        logger.error(f"Failed to generate {name} in spec bundle: {error}")
+
+    return SpecBundleEnhanceResponse(
+        **{name: result for name, result in results.items() if name not in errors},
+        errors={
+            name: error.detail if isinstance(error, HTTPException) else str(error)
+            for name, error in errors.items()
+        },
+    )
@@ -3,9 +3,8 @@ API routes for test cases generation using AI.
 """
 
 import logging
-import json
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any
+from fastapi import APIRouter, Depends
+from typing import Dict, Any, List, Tuple
 
 from app.ai.tools.print_test_cases import print_test_cases_input_schema
 from app.ai.prompts.test_cases import get_test_cases_user_prompt
@@ -14,153 +13,172 @@ from app.schemas.ai_text import (
     TestCasesEnhanceResponse,
     TestCasesData,
 )
-from app.services.ai_service import AIService, INTELLIGENT_MODEL
+from app.services.ai_service import AIService, get_ai_service, INTELLIGENT_MODEL
 from app.core.firebase_auth import get_current_user
-from app.api.routes.ai_text_utils import extract_data_from_response
-from app.utils.llm_logging import DefaultLLMLogger
-from app.db.base import db
-from app.services.db_usage_tracker import DatabaseUsageTracker
+from app.api.routes.ai_text_utils import (
+    build_log_metadata,
+    cache_enhance_response,
+    format_bullet_list,
+    format_json,
+    get_tool_use_data,
+    model_json_response,
+    streaming_tool_use_response,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/ai-text", tags=["AI Text"])
 
+# Tool definitions are static, so they are built once at import time
+_TEST_CASES_TOOLS = [print_test_cases_input_schema()]
+
+# System messages do not depend on the request
+_ENHANCE_TEST_CASES_SYSTEM_MESSAGE = "You are an expert QA engineer specializing in writing Gherkin test cases for software applications."
+_GENERATE_TEST_CASES_SYSTEM_MESSAGE = "You are an expert QA engineer specializing in writing comprehensive Gherkin test cases for software applications. Focus on creating test cases that cover all functional requirements and important edge cases."
+
+
+def _enhance_test_cases_messages(
+    request: TestCasesEnhanceRequest, current_user: Dict[str, Any]
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Build the user messages and logging metadata for a test cases enhance request."""
+    # Format requirements as string
+    formatted_requirements = format_bullet_list(request.requirements)
+
+    # Format features as JSON string
+    formatted_features = format_json(request.features)
+
+    # Format existing test cases if any
+    formatted_test_cases = None
+    if request.existing_test_cases:
+        formatted_test_cases = format_json(request.existing_test_cases)
+
+    # Create the user prompt
+    user_prompt = get_test_cases_user_prompt(
+        formatted_requirements,
+        formatted_features,
+        formatted_test_cases,
+        request.additional_user_instruction,
+    )
+
+    # Metadata for logging and usage tracking
+    log_metadata = build_log_metadata(
+        request,
+        current_user,
+        requirements=request.requirements,
+        features=request.features,
+        existing_test_cases=request.existing_test_cases,
+        additional_user_instruction=request.additional_user_instruction,
+    )
+
+    return [{"role": "user", "content": user_prompt}], log_metadata
+
 
 @router.post("/enhance-test-cases", response_model=TestCasesEnhanceResponse)
+@cache_enhance_response(
+    normalized_fields=["requirements", "additional_user_instruction"],
+    ignored_fields=["project_description"],
+)
 async def enhance_test_cases(
-    request: TestCasesEnhanceRequest, current_user: Dict[str, Any] = Depends(get_current_user)
+    request: TestCasesEnhanceRequest,
+    stream: bool = False,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    client: AIService = Depends(get_ai_service),
 ):
     """
     Enhance or generate test cases in Gherkin format.
-    """
-    try:
-        # Create the service objects
-        llm_logger = DefaultLLMLogger()
-        usage_tracker = DatabaseUsageTracker(db.get_db())
-
-        # Initialize the AI client with the logger and usage tracker
-        client = AIService(llm_logger, usage_tracker)
-
-        # Create system message
-        system_message = "You are an expert QA engineer specializing in writing Gherkin test cases for software applications."
-
-        # Format requirements as string
-        formatted_requirements = "\n".join(f"- {req}" for req in request.requirements)
-
-        # Format features as JSON string
-        formatted_features = json.dumps(request.features, indent=2)
-
-        # Format existing test cases if any
-        formatted_test_cases = None
-        if request.existing_test_cases:
-            formatted_test_cases = json.dumps(request.existing_test_cases, indent=2)
-
-        # Create the user prompt
-        user_prompt = get_test_cases_user_prompt(
-            formatted_requirements,
-            formatted_features,
-            formatted_test_cases,
-            request.additional_user_instruction,
-        )
 
-        # Generate the tool use response
-        messages = [{"role": "user", "content": user_prompt}]
-        tools = [print_test_cases_input_schema()]
-        response = await client.get_tool_use_response(
-            system_message,
-            tools,
-            messages,
-            model=INTELLIGENT_MODEL,
-            log_metadata={
-                "user_id": current_user.get("firebase_uid") if current_user else None,
-                "project_id": request.project_id if hasattr(request, "project_id") else "unknown",
-                "requirements": request.requirements,
-                "features": request.features,
-                "existing_test_cases": request.existing_test_cases,
-                "additional_user_instruction": request.additional_user_instruction,
-            },
-            response_type="enhance_test_cases",
-            check_credits=True,
+    With ``stream=true`` the response is newline-delimited JSON: completed test cases are
+    sent as they are generated, followed by the validated result. If the client
+    disconnects before the result, the AI stream is closed and the output generated so
+    far is billed.
+    """
+    messages, log_metadata = _enhance_test_cases_messages(request, current_user)
+
+    if stream:
+        # Send test cases as they complete instead of waiting for all of them
+        return await streaming_tool_use_response(
+            client.stream_tool_use_response(
+                _ENHANCE_TEST_CASES_SYSTEM_MESSAGE,
+                _TEST_CASES_TOOLS,
+                messages,
+                model=INTELLIGENT_MODEL,
+                log_metadata=log_metadata,
+                response_type="enhance_test_cases",
+                check_credits=True,
+            ),
+            TestCasesData,
+            ["testCases"],
+            logger,
         )
 
-        # Handle potential credit errors
-        if response.startswith("Insufficient credits"):
-            raise HTTPException(status_code=402, detail=response)
-        # Extract the response data
-        test_cases_data = extract_data_from_response(response, TestCasesData, logger)
-
-        return {"data": test_cases_data}
-    except Exception as e:
-        logger.error(f"Error enhancing test cases: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error enhancing test cases: {str(e)}")
+    test_cases_data = await get_tool_use_data(
+        client,
+        _ENHANCE_TEST_CASES_SYSTEM_MESSAGE,
+        _TEST_CASES_TOOLS,
+        messages,
+        TestCasesData,
+        logger,
+        models=(INTELLIGENT_MODEL,),
+        log_metadata=log_metadata,
+        response_type="enhance_test_cases",
+        check_credits=True,
+    )
+
+    return model_json_response(TestCasesEnhanceResponse(data=test_cases_data))
+
+
+async def create_test_cases(
+    request: TestCasesEnhanceRequest, current_user: Dict[str, Any], client: AIService
+) -> TestCasesData:
+    """Generate new test cases for a request, ignoring any existing test cases."""
+    # Format requirements as string
+    formatted_requirements = format_bullet_list(request.requirements)
+
+    # Format features as JSON string
+    formatted_features = format_json(request.features)
+
+    # Create the user prompt - we don't pass existing test cases
+    user_prompt = get_test_cases_user_prompt(
+        formatted_requirements,
+        formatted_features,
+        None,  # No existing test cases for generation from scratch
+        request.additional_user_instruction,
+    )
+
+    return await get_tool_use_data(
+        client,
+        _GENERATE_TEST_CASES_SYSTEM_MESSAGE,
+        _TEST_CASES_TOOLS,
+        [{"role": "user", "content": user_prompt}],
+        TestCasesData,
+        logger,
+        models=(INTELLIGENT_MODEL,),
+        log_metadata=build_log_metadata(
+            request,
+            current_user,
+            requirements=request.requirements,
+            features=request.features,
+            additional_user_instruction=request.additional_user_instruction,
+        ),
+        response_type="generate_test_cases",
+        check_credits=True,
+        use_token_api_for_estimation=True,
+    )
 
 
 @router.post("/generate-test-cases", response_model=TestCasesEnhanceResponse)
+@cache_enhance_response(
+    normalized_fields=["requirements", "additional_user_instruction"],
+    ignored_fields=["project_description", "existing_test_cases"],
+)
 async def generate_test_cases(
-    request: TestCasesEnhanceRequest, current_user: Dict[str, Any] = Depends(get_current_user)
+    request: TestCasesEnhanceRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    client: AIService = Depends(get_ai_service),
 ):
     """
     Generate new test cases in Gherkin format based on project requirements and features.
     This is a dedicated endpoint for creating test cases from scratch.
     """
-    try:
-        # Create the service objects
-        llm_logger = DefaultLLMLogger()
-        usage_tracker = DatabaseUsageTracker(db.get_db())
-
-        # Initialize the AI client with the logger and usage tracker
-        client = AIService(llm_logger, usage_tracker)
-
-        # Create system message
-        system_message = "You are an expert QA engineer specializing in writing comprehensive Gherkin test cases for software applications. Focus on creating test cases that cover all functional requirements and important edge cases."
-
-        # Format requirements as string
-        formatted_requirements = "\n".join(f"- {req}" for req in request.requirements)
-
-        # Format features as JSON string
-        formatted_features = json.dumps(request.features, indent=2)
-
-        # Create the user prompt - we don't pass existing test cases
-        user_prompt = get_test_cases_user_prompt(
-            formatted_requirements,
-            formatted_features,
-            None,  # No existing test cases for generation from scratch
-            request.additional_user_instruction,
-        )
-
-        # Generate the tool use response
-        messages = [{"role": "user", "content": user_prompt}]
-        tools = [print_test_cases_input_schema()]
-        response = await client.get_tool_use_response(
-            system_message,
-            tools,
-            messages,
-            model=INTELLIGENT_MODEL,
-            log_metadata={
-                "user_id": current_user.get("firebase_uid") if current_user else None,
-                "project_id": request.project_id if hasattr(request, "project_id") else "unknown",
-                "requirements": request.requirements,
-                "features": request.features,
-                "additional_user_instruction": request.additional_user_instruction,
-            },
-            response_type="generate_test_cases",
-            check_credits=True,
-            use_token_api_for_estimation=True,
-        )
+    test_cases_data = await create_test_cases(request, current_user, client)
 
-        # Handle potential credit errors - check the response content if it's a dict
-        if (
-            isinstance(response, dict)
-            and isinstance(response.get("content"), str)
-            and response["content"].startswith("Insufficient credits")
-        ):
-            raise HTTPException(status_code=402, detail=response["content"])
-        elif isinstance(response, str) and response.startswith("Insufficient credits"):
-            raise HTTPException(status_code=402, detail=response)
-
-        # Extract the response data
-        test_cases_data = extract_data_from_response(response, TestCasesData, logger)
-
-        return {"data": test_cases_data}
-    except Exception as e:
-        logger.error(f"Error generating test cases: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error generating test cases: {str(e)}")
+    return model_json_response(TestCasesEnhanceResponse(data=test_cases_data))
@@ -2,15 +2,386 @@
 Utility functions for AI text generation endpoints.
 """
 
+import asyncio
+import functools
+import hashlib
 import logging
 import json
 import re
-from typing import Type, TypeVar, Any, Dict
+from typing import (
+    Type,
+    TypeVar,
+    Any,
+    Dict,
+    Optional,
+    AsyncGenerator,
+    Sequence,
+    Callable,
+    Iterable,
+    List,
+)
 
+import orjson
 from fastapi import HTTPException
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+
+from app.schemas.ai_text import AITextRequest, TestCasesData
+from app.services.ai_service import AIService
+from app.utils.cache import TTLCache
 
 # Type variable for generic response types
-T = TypeVar("T")
+T = TypeVar("T", bound=BaseModel)
+
+# Shared decoder so embedded JSON can be scanned without regex backtracking
+_JSON_DECODER = json.JSONDecoder()
+
+# Responses of enhance endpoints keyed by endpoint, user and request body hash
+ENHANCE_RESPONSE_CACHE = TTLCache(maxsize=1024, ttl=3600)
+
+# Enhance requests currently running, so identical concurrent requests share one AI call
+_INFLIGHT_REQUESTS: Dict[tuple, "asyncio.Future[Any]"] = {}
+
+# Leading bullet ("-", "•", "*") or number ("1.") marker of a list item
+_LIST_MARKER_RE = re.compile(r"(?:[-•]|\*(?=\s)|\d+\.(?=\s))\s*")
+
+# A whole list item line, capturing the item text without its marker
+_LIST_ITEM_RE = re.compile(
+    r"^[^\S\n]*(?:[-•]|\*(?=\s)|\d+\.(?=\s))[^\S\n]*(\S.*?)[^\S\n]*$", re.MULTILINE
+)
+
+# A non-empty line, capturing its text without any list marker. The atomic group keeps a
+# line holding only a marker from matching as text
+_PLAIN_LINE_RE = re.compile(
+    r"^[^\S\n]*(?>(?:(?:[-•]|\*(?=[^\S\n]+\S)|\d+\.(?=[^\S\n]+\S))[^\S\n]*)?)(\S.*?)[^\S\n]*$",
+    re.MULTILINE,
+)
+
+
+def parse_list_response(text: str, keep_plain_lines: bool = False) -> List[str]:
+    """
+    Parse a list out of an AI text response.
+
+    Bullet and number markers are stripped from list items. By default only the list
+    items are returned, found with a single regex scan; if the response has none, the
+    lines of its last paragraph are used instead so any introductory text is skipped, and
+    if that yields nothing either, the whole text is returned as a single item.
+    With ``keep_plain_lines``, every non-empty line is returned from a single scan too.
+
+    Args:
+        text: The AI response text
+        keep_plain_lines: Return every non-empty line, with or without a list marker
+
+    Returns:
+        The parsed list items
+    """
+    if keep_plain_lines:
+        return _PLAIN_LINE_RE.findall(text)
+
+    items = _LIST_ITEM_RE.findall(text)
+    if items:
+        return items
+
+    paragraph: List[str] = []
+    paragraph_ended = False
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            paragraph_ended = True
+            continue
+
+        if paragraph_ended:
+            paragraph = []
+            paragraph_ended = False
+
+        marker = _LIST_MARKER_RE.match(line)
+        if marker:
+            line = line[marker.end() :]
+            if not line:
+                continue
+
+        paragraph.append(line)
+
+    # If even the last paragraph has no items (e.g. it only holds markers), use the whole text
+    if not paragraph and text.strip():
+        return [text.strip()]
+
+    return paragraph
+
+
+def build_log_metadata(
+    request: AITextRequest, current_user: Optional[Dict[str, Any]], **fields: Any
+) -> Dict[str, Any]:
+    """
+    Build the metadata logged and used for usage tracking with an AI request.
+
+    Args:
+        request: The request being served, whose project the AI call is attributed to
+        current_user: The authenticated user, whose credits are charged
+        **fields: Details of the request to include in the log
+
+    Returns:
+        The user and project IDs followed by the given fields
+    """
+    return {
+        "user_id": current_user.get("firebase_uid") if current_user else None,
+        "project_id": request.project_id or "unknown",
+        **fields,
+    }
+
+
+def _normalize_cache_text(value: Any) -> Any:
+    """Fold text that differs only in case, spacing or trailing punctuation to one form."""
+    if isinstance(value, str):
+        return " ".join(value.casefold().split()).rstrip(".!?")
+    if isinstance(value, list):
+        return [_normalize_cache_text(item) for item in value]
+    return value
+
+
+def _enhance_cache_key(
+    endpoint: str,
+    request: BaseModel,
+    current_user: Optional[Dict[str, Any]],
+    normalized_fields: Sequence[str] = (),
+    ignored_fields: Sequence[str] = (),
+) -> tuple:
+    """Build the response cache key for an enhance request."""
+    data = request.model_dump(mode="json", exclude=set(ignored_fields))
+    for field in normalized_fields:
+        data[field] = _normalize_cache_text(data.get(field))
+    body = orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    user_id = current_user.get("firebase_uid") if current_user else None
+    return endpoint, user_id, hashlib.blake2b(body).hexdigest()
+
+
+def _forget_inflight_request(key: tuple, task: "asyncio.Future[Any]") -> None:
+    """Remove a finished request from the in-flight map."""
+    if _INFLIGHT_REQUESTS.get(key) is task:
+        del _INFLIGHT_REQUESTS[key]
+
+
+def cache_enhance_response(
+    endpoint: Optional[Callable] = None,
+    *,
+    normalized_fields: Sequence[str] = (),
+    ignored_fields: Sequence[str] = (),
+    cacheable: Optional[Callable[[Any], bool]] = None,
+) -> Callable:
+    """
+    Cache the responses of an enhance endpoint for identical request bodies.
+
+    Users often re-submit the same inputs, and each re-submission would otherwise pay
+    for a full AI round trip. Only successful, non-streaming responses are cached, and
+    entries are scoped per user. Identical requests that arrive while the first one is
+    still running wait for its result instead of starting another AI call.
+
+    Free text the user retypes (such as a project description) rarely comes back exactly
+    the same. For the ``normalized_fields`` of the request, differences in case, spacing
+    and trailing punctuation are ignored, so such near-identical requests share an entry.
+    The ``ignored_fields`` do not reach the prompt and are left out of the key entirely.
+
+    Endpoints that can succeed partially pass ``cacheable`` to keep such responses out of the
+    cache, so a retry generates the missing parts again instead of replaying the failure.
+
+    Can be used as ``@cache_enhance_response`` or
+    ``@cache_enhance_response(normalized_fields=[...])``.
+
+    Args:
+        endpoint: The route handler, taking ``request`` and ``current_user`` keyword arguments
+        normalized_fields: Request fields (strings or lists of strings) compared loosely
+        ignored_fields: Request fields that do not affect the response
+        cacheable: Returns whether a response may be cached; all responses are by default
+
+    Returns:
+        The wrapped route handler, or a decorator if no handler is given
+    """
+    if endpoint is None:
+        return functools.partial(
+            cache_enhance_response,
+            normalized_fields=normalized_fields,
+            ignored_fields=ignored_fields,
+            cacheable=cacheable,
+        )
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        if kwargs.get("stream"):
+            return await endpoint(*args, **kwargs)
+
+        key = _enhance_cache_key(
+            endpoint.__name__,
+            kwargs["request"],
+            kwargs.get("current_user"),
+            normalized_fields,
+            ignored_fields,
+        )
+        cached = ENHANCE_RESPONSE_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+        # Attach to an identical request that is already running. There is no await between
+        # the lookup and the insert, so no lock is needed on the event loop.
+        task = _INFLIGHT_REQUESTS.get(key)
+        if task is None:
+            task = asyncio.ensure_future(endpoint(*args, **kwargs))
+            _INFLIGHT_REQUESTS[key] = task
+            task.add_done_callback(lambda done: _forget_inflight_request(key, done))
+
+        # Shield the shared call so a disconnecting client does not cancel it for the others
+        response = await asyncio.shield(task)
+        if cacheable is None or cacheable(response):
+            ENHANCE_RESPONSE_CACHE.set(key, response)
+        return response
+
+    return wrapper
+
+
+def format_json(obj: Any) -> str:
+    """
+    Format an object as indented JSON for embedding in a prompt.
+
+    Args:
+        obj: The JSON-compatible object to format
+
+    Returns:
+        The object serialized as JSON with two-space indentation
+    """
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+
+def format_bullet_list(items: Sequence[str]) -> str:
+    """
+    Format items as a dash-bulleted list for embedding in a prompt.
+
+    The separator carries the bullet marker, so the list is built in a single join
+    without formatting each item separately.
+
+    Args:
+        items: The items to list
+
+    Returns:
+        One "- item" line per item, or an empty string if there are no items
+    """
+    if not items:
+        return ""
+    return "- " + "\n- ".join(items)
+
+
+async def format_prompt_sections(*formatters: Callable[[], str]) -> List[str]:
+    """
+    Run independent prompt formatters concurrently in worker threads.
+
+    Large feature lists and data models can take a while to serialize; running them off
+    the event loop keeps other requests responsive while the prompt is built.
+
+    Args:
+        formatters: Zero-argument callables that each build one section of the prompt
+
+    Returns:
+        The formatted sections, in the same order as the formatters
+    """
+    return list(await asyncio.gather(*(asyncio.to_thread(formatter) for formatter in formatters)))
+
+
+def _extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Extract the first JSON object embedded in a piece of text.
+
+    The whole text is tried first, with orjson, since tool responses are usually valid JSON
+    already. Otherwise the text is scanned from each opening brace with ``raw_decode``, which stops
+    at the end of the object instead of backtracking over any trailing prose.
+
+    Args:
+        text: The text that may contain a JSON object
+
+    Returns:
+        The decoded JSON object, or None if no object could be decoded
+    """
+    try:
+        json_data = orjson.loads(text)
+        if isinstance(json_data, dict):
+            return json_data
+    except orjson.JSONDecodeError:
+        pass
+
+    start_idx = text.find("{")
+    while start_idx >= 0:
+        try:
+            json_data, _ = _JSON_DECODER.raw_decode(text, start_idx)
+            if isinstance(json_data, dict):
+                return json_data
+        except ValueError:
+            pass
+        start_idx = text.find("{", start_idx + 1)
+
+    return None
+
+
+def _from_data_field(response: Any, schema_class: Type[T], logger: logging.Logger) -> Optional[T]:
+    """Attempt 1: Standard extraction from "data" field."""
+    if isinstance(response, dict) and "data" in response:
+        try:
+            return schema_class.model_validate(response["data"])
+        except ValidationError as e:
+            logger.warning("Failed to parse standard 'data' field: %s", e)
+    return None
+
+
+def _from_whole_response(
+    response: Any, schema_class: Type[T], logger: logging.Logger
+) -> Optional[T]:
+    """
+    Attempt 2: Check if the entire response is the data structure.
+
+    Skipped when a "data" field is present: if Attempt 1 rejected it, validating the
+    wrapper would fail for the same reason and only cost another full validation pass.
+    """
+    if isinstance(response, dict) and "data" not in response and "error" not in response:
+        try:
+            return schema_class.model_validate(response)
+        except ValidationError as e:
+            logger.warning("Failed to parse entire response as data: %s", e)
+    return None
+
+
+def _from_content_json(response: Any, schema_class: Type[T], logger: logging.Logger) -> Optional[T]:
+    """Attempt 3: Check if there's a JSON string in the response content."""
+    if isinstance(response, dict) and isinstance(response.get("content"), str):
+        try:
+            json_data = _extract_json_object(response["content"])
+            if json_data is not None:
+                return schema_class.model_validate(json_data)
+        except ValidationError as e:
+            logger.warning("Failed to extract JSON from content: %s", e)
+    return None
+
+
+def _from_string_json(response: Any, schema_class: Type[T], logger: logging.Logger) -> Optional[T]:
+    """Attempt 4: Check if response contains raw text that could be parsed as JSON."""
+    if isinstance(response, str):
+        try:
+            json_data = _extract_json_object(response)
+            if json_data is not None:
+                return schema_class.model_validate(json_data)
+        except ValidationError as e:
+            logger.warning("Failed to extract JSON from string response: %s", e)
+    return None
+
+
+# Fallback strategies, tried in order until one produces a valid instance
+_EXTRACTION_STRATEGIES = (
+    _from_data_field,
+    _from_whole_response,
+    _from_content_json,
+    _from_string_json,
+)
+
+# Attempt 5: Schemas that may legitimately come back empty, with their empty default
+_EMPTY_DEFAULTS: Dict[type, Callable[[], Any]] = {
+    TestCasesData: lambda: TestCasesData(testCases=[]),
+}
 
 
 def extract_data_from_response(
@@ -31,71 +402,290 @@ def extract_data_from_response(
         HTTPException: If data cannot be extracted after all fallback attempts
     """
 
-    logger.info(f"Response: {response}")
-
-    # Attempt 1: Standard extraction from "data" field
-    if "data" in response:
-        try:
-            return schema_class(**response["data"])
-        except Exception as e:
-            logger.warning(f"Failed to parse standard 'data' field: {str(e)}")
+    # Lazy formatting: the response can be large and is only needed when debugging
+    logger.debug("Response: %s", response)
 
-    # Attempt 2: Check if the entire response is the data structure
-    if isinstance(response, dict) and not any(k in response for k in ["data", "error"]):
-        try:
-            return schema_class(**response)
-        except Exception as e:
-            logger.warning(f"Failed to parse entire response as data: {str(e)}")
-
-    # Attempt 3: Check if there's a JSON string in the response
-    if "content" in response and isinstance(response["content"], str):
-        try:
-            # Look for JSON objects in the content
-            content = response["content"]
-            json_match = re.search(r"\{.*\}", content, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                json_data = json.loads(json_str)
-                return schema_class(**json_data)
-        except Exception as e:
-            logger.warning(f"Failed to extract JSON from content: {str(e)}")
+    for strategy in _EXTRACTION_STRATEGIES:
+        result = strategy(response, schema_class, logger)
+        if result is not None:
+            return result
 
-    # Attempt 4: Check if response contains raw text that could be parsed as JSON
-    if isinstance(response, str):
-        try:
-            json_match = re.search(r"\{.*\}", response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                json_data = json.loads(json_str)
-                return schema_class(**json_data)
-        except Exception as e:
-            logger.warning(f"Failed to extract JSON from string response: {str(e)}")
-
-    # Attempt 5: For TestCasesData, provide empty default structure if response is empty
-    if schema_class.__name__ == "TestCasesData" and (
-        isinstance(response, dict)
-        and len(response) == 0
-        or isinstance(response, dict)
-        and "data" in response
-        and len(response["data"]) == 0
+    # Provide an empty default structure if the response is empty
+    empty_default = _EMPTY_DEFAULTS.get(schema_class)
+    if (
+        empty_default is not None
+        and isinstance(response, dict)
+        and (len(response) == 0 or ("data" in response and len(response["data"]) == 0))
     ):
         logger.warning(
-            "Empty response detected for TestCasesData. Creating default empty structure."
+            "Empty response detected for %s. Creating default empty structure.",
+            schema_class.__name__,
         )
         try:
-            return schema_class(testCases=[])
+            return empty_default()
         except Exception as e:
-            logger.warning(f"Failed to create default TestCasesData structure: {str(e)}")
+            logger.warning("Failed to create default %s structure: %s", schema_class.__name__, e)
 
     # If we've reached this point, log details about the response for debugging
     logger.error(
-        f"Failed to extract data after all fallback attempts. Response structure: {type(response)}"
+        "Failed to extract data after all fallback attempts. Response structure: %s",
+        type(response),
     )
     if isinstance(response, dict):
-        logger.error(f"Response keys: {list(response.keys())}")
+        logger.error("Response keys: %s", list(response.keys()))
 
     # All attempts failed, raise exception
     raise HTTPException(
         status_code=500,
         detail="Failed to extract valid data from AI response after multiple attempts",
     )
+
+
+def model_json_response(model: BaseModel) -> Response:
+    """
+    Return a response model as pre-serialized JSON.
+
+    Returning a ``Response`` skips FastAPI's response validation and serialization of the
+    model, which re-traverses the whole object tree. For large structured outputs such as
+    data models, API endpoints and test cases this is pure overhead since the model was
+    just validated by ``extract_data_from_response``.
+
+    Args:
+        model: The validated response model
+
+    Returns:
+        A JSON response with the serialized model
+    """
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+
+async def get_tool_use_data(
+    client: AIService,
+    system_message: str,
+    tools: List[Dict[str, Any]],
+    messages: List[Dict[str, Any]],
+    schema_class: Type[T],
+    logger: logging.Logger,
+    models: Sequence[str],
+    **kwargs: Any,
+) -> T:
+    """
+    Get validated tool use data, escalating through models until one succeeds.
+
+    Large structured outputs are drafted with the first (usually fastest) model. Only if
+    its output cannot be validated against ``schema_class`` is the request repeated with
+    the next model, so the slower model's latency is paid only when needed.
+
+    Args:
+        client: The AI service
+        system_message: The system prompt
+        tools: The tools to make available
+        messages: The conversation messages
+        schema_class: The Pydantic schema class the tool input must validate against
+        logger: Logger instance for logging escalations
+        models: The models to try, in order
+        **kwargs: Further arguments for AIService.get_tool_use_response
+
+    Returns:
+        An instance of schema_class with the extracted data
+
+    Raises:
+        InsufficientCreditsError: If the user does not have enough credits
+        HTTPException: 500 if no model produced valid data
+    """
+    error: Any = None
+    for model in models:
+        response = await client.get_tool_use_response(
+            system_message, tools, messages, model=model, **kwargs
+        )
+
+        error = response.get("error")
+        if error is None:
+            try:
+                return extract_data_from_response(response, schema_class, logger)
+            except HTTPException as e:
+                error = e.detail
+
+        logger.warning(
+            "Tool use with %s did not produce valid %s: %s", model, schema_class.__name__, error
+        )
+
+    raise HTTPException(status_code=500, detail=f"Failed to generate valid data: {error}")
+
+
+def _ndjson_line(payload: Dict[str, Any]) -> str:
+    """Serialize a payload as a single newline-delimited JSON line."""
+    return orjson.dumps(payload).decode() + "\n"
+
+
+async def streaming_tool_use_response(
+    events: AsyncGenerator[Dict[str, Any], None],
+    schema_class: Type[T],
+    item_keys: Sequence[str],
+    logger: logging.Logger,
+) -> StreamingResponse:
+    """
+    Turn a stream of tool use events into a newline-delimited JSON response.
+
+    While the model is still generating, every completed element of the arrays named in
+    ``item_keys`` (under the tool input's ``data`` field) is sent as an ``item`` line. An
+    array element is considered complete once the next element has started. The last line
+    is either a ``result`` with the fully validated data or an ``error``.
+
+    The first event is awaited before the response starts, so errors that happen before
+    any output (e.g. insufficient credits) are still returned as regular HTTP errors.
+
+    Args:
+        events: The events from AIService.stream_tool_use_response
+        schema_class: The Pydantic schema class used to validate the final data
+        item_keys: Names of the arrays whose elements should be streamed as they complete
+        logger: Logger instance for logging errors
+
+    Returns:
+        A StreamingResponse emitting ``application/x-ndjson`` lines
+
+    Raises:
+        HTTPException: If the tool use call fails before producing any output
+    """
+    first_event = await anext(events, None)
+
+    if first_event is None:
+        logger.error("AI tool use stream ended without a result")
+        raise HTTPException(status_code=500, detail="Failed to generate response: no result")
+
+    if first_event["type"] == "result" and "error" in first_event["data"]:
+        # Releases the request slot held by the stream right away
+        await events.aclose()
+        error = first_event["data"]["error"]
+        logger.error(f"Error in AI tool use: {error}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate response: {error}")
+
+    async def generate_lines():
+        emitted = {key: 0 for key in item_keys}
+
+        async def iterate_events():
+            yield first_event
+            async for event in events:
+                yield event
+
+        try:
+            async for event in iterate_events():
+                if event["type"] == "input_json":
+                    snapshot = event.get("snapshot")
+                    data = snapshot.get("data") if isinstance(snapshot, dict) else None
+                    if not isinstance(data, dict):
+                        continue
+
+                    for key in item_keys:
+                        items = data.get(key)
+                        if not isinstance(items, list):
+                            continue
+                        # The last element may still be partial until the next one starts
+                        while emitted[key] < len(items) - 1:
+                            yield _ndjson_line(
+                                {"type": "item", "key": key, "item": items[emitted[key]]}
+                            )
+                            emitted[key] += 1
+
+                elif event["type"] == "result":
+                    response = event["data"]
+                    if "error" in response:
+                        logger.error(f"Error in AI tool use: {response['error']}")
+                        yield _ndjson_line({"type": "error", "detail": str(response["error"])})
+                        return
+
+                    try:
+                        result = extract_data_from_response(response, schema_class, logger)
+                    except HTTPException as e:
+                        yield _ndjson_line({"type": "error", "detail": e.detail})
+                        return
+
+                    yield _ndjson_line({"type": "result", "data": result.model_dump()})
+                    return
+        except Exception as e:
+            logger.error("Error streaming AI tool use: %s", e)
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            yield _ndjson_line({"type": "error", "detail": detail})
+            return
+        finally:
+            # Stops generation and frees the request slot right away, also if the client
+            # disconnected mid-stream
+            await events.aclose()
+
+        logger.error("AI tool use stream ended without a result")
+        yield _ndjson_line({"type": "error", "detail": "Failed to generate response: no result"})
+
+    return StreamingResponse(generate_lines(), media_type="application/x-ndjson")
+
+
+def _sse_event(payload: Dict[str, Any]) -> str:
+    """Serialize a payload as a server-sent event."""
+    return f"data: {orjson.dumps(payload).decode()}\n\n"
+
+
+async def streaming_text_response(
+    chunks: AsyncGenerator[str, None],
+    finalize: Callable[[str], Dict[str, Any]],
+    logger: logging.Logger,
+    chunk_events: Optional[Callable[[str], Iterable[Dict[str, Any]]]] = None,
+) -> StreamingResponse:
+    """
+    Turn a stream of generated text into a server-sent events response.
+
+    Every text chunk is sent as a ``{"chunk": ...}`` event as soon as it arrives. Once the
+    model is done, a final ``{"done": true, ...}`` event carries the same fields as the
+    non-streaming response, built from the full text by ``finalize``. Failures after the
+    stream has started are sent as an ``{"error": ...}`` event. Events ``chunk_events``
+    derives from a chunk, such as a section of the text that is now complete, are sent
+    right after it.
+
+    The first chunk is awaited before the response starts, so errors that happen before
+    any output (e.g. insufficient credits) are still returned as regular HTTP errors.
+
+    Args:
+        chunks: The text chunks from AIService.stream_response
+        finalize: Builds the response fields from the full generated text
+        logger: Logger instance for logging errors
+        chunk_events: Optional callable returning further events for each chunk
+
+    Returns:
+        A StreamingResponse emitting ``text/event-stream`` events
+
+    Raises:
+        HTTPException: If the AI call fails before producing any output
+    """
+    first_chunk = await anext(chunks, "")
+
+    if first_chunk.startswith("Error:"):
+        # Releases the request slot held by the stream right away
+        await chunks.aclose()
+        logger.error("Error in AI response: %s", first_chunk)
+        raise HTTPException(status_code=500, detail=f"Failed to generate response: {first_chunk}")
+
+    async def generate_events():
+        parts = []
+
+        async def iterate_chunks():
+            if first_chunk:
+                yield first_chunk
+            async for chunk in chunks:
+                yield chunk
+
+        try:
+            async for chunk in iterate_chunks():
+                parts.append(chunk)
+                yield _sse_event({"chunk": chunk})
+                if chunk_events:
+                    for event in chunk_events(chunk):
+                        yield _sse_event(event)
+        except Exception as e:
+            logger.error("Error streaming AI response: %s", e)
+            yield _sse_event({"error": str(e)})
+            return
+        finally:
+            # Stops generation right away if the client disconnected mid-stream
+            await chunks.aclose()
+
+        yield _sse_event({"done": True, **finalize("".join(parts))})
+
+    return StreamingResponse(generate_events(), media_type="text/event-stream")
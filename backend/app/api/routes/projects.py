@@ -3,6 +3,7 @@
 This module provides API routes for managing projects.
 """
 
+import asyncio
 from fastapi import APIRouter, HTTPException, Depends, Query
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import Dict, Any, List
@@ -220,14 +221,19 @@ async def delete_project(
         "test_cases_specs",
         "project_structure_specs",
         "deployment_specs",
-        "documentation_specs" "implementation_prompts_specs",
+        "documentation_specs",
+        "implementation_prompts_specs",
     ]
 
-    # Delete all specs associated with the project
-    for collection_name in spec_collections:
-        if hasattr(database, collection_name):
-            collection = getattr(database, collection_name)
-            await collection.delete_many({"project_id": id})
+    # Delete all specs associated with the project; the collections are independent, so
+    # the deletes are sent to the database concurrently
+    await asyncio.gather(
+        *(
+            getattr(database, collection_name).delete_many({"project_id": id})
+            for collection_name in spec_collections
+            if hasattr(database, collection_name)
+        )
+    )
 
     # Delete the project itself
     await database.projects.delete_one({"id": id, "user_id": user_id})
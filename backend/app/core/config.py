@@ -48,6 +48,7 @@ class LLMSettings(BaseSettings):
 
     preferred_provider: str = Field("anthropic", env="LLM_PREFERRED_PROVIDER")
     enable_failover: bool = Field(True, env="LLM_ENABLE_FAILOVER")
+    max_concurrent_requests: int = Field(32, env="LLM_MAX_CONCURRENT_REQUESTS")
 
     model_config = {"env_prefix": "LLM_"}
 
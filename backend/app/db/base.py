@@ -29,6 +29,14 @@ class Database:
             self.client = None
             raise
 
+    async def create_indexes(self):
+        """Create the indexes used by frequent lookups; existing indexes are left as they are."""
+        database = self.get_db()
+        if database is None:
+            return
+        await database.projects.create_index("id")
+        logger.info("MongoDB indexes ensured")
+
     async def close_mongodb_connection(self):
         """Close MongoDB connection."""
         if self.client:
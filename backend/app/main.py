@@ -25,6 +25,7 @@ for logger_name in ["app.seed.templates"]:
 # Import configuration and database
 from .core.config import settings
 from .db.base import db
+from .services.ai_service import get_ai_service
 
 # Import API router and seed data modules
 from .api.api import api_router
@@ -43,7 +44,7 @@ async def lifespan(app: FastAPI):
     This handles setup and teardown for the application.
 
     During startup, it:
-    1. Connects to MongoDB
+    1. Connects to MongoDB and creates the indexes used by frequent lookups
     2. Seeds the tech stack to the database (creates or updates)
        - The tech stack is the central source of truth for all technology names
        - See /app/seed/README.md for more information
@@ -54,6 +55,7 @@ async def lifespan(app: FastAPI):
 
     During shutdown, it:
     1. Closes MongoDB connection
+    2. Discards the shared AI service
     """
     # Setup
     try:
@@ -62,6 +64,7 @@ async def lifespan(app: FastAPI):
         try:
             await db.connect_to_mongodb()
             logger.info("MongoDB connection established")
+            await db.create_indexes()
 
             # Seed database with sample data if needed
             database = db.get_db()
@@ -93,6 +96,9 @@ async def lifespan(app: FastAPI):
         logger.info("Closing MongoDB connection...")
         await db.close_mongodb_connection()
         logger.info("MongoDB connection closed")
+
+        # Drop the shared AI service since its usage tracker holds the closed database
+        get_ai_service.cache_clear()
     except Exception as e:
         logger.error(f"Error during shutdown: {str(e)}")
 
@@ -154,7 +160,7 @@ async def health() -> Dict[str, str]:
 @app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: Exception):
     """Handle generic exceptions."""
-    logger.error(f"Unhandled exception: {exc}")
+    logger.exception(f"Unhandled exception on {request.method} {request.url.path}: {exc}")
     return JSONResponse(
         status_code=500, content={"detail": f"An unexpected error occurred: {str(exc)}"}
     )
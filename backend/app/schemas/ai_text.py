@@ -3,13 +3,23 @@ Schemas for AI text generation.
 """
 
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import Annotated, List, Literal, Optional, Dict, Any, Union
 from enum import Enum
 
 from .shared_schemas import ImplementationPromptType
 
 
-class DescriptionEnhanceRequest(BaseModel):
+class AITextRequest(BaseModel):
+    """Base model for AI text requests about a project."""
+
+    project_id: Optional[str] = Field(
+        None,
+        title="Project ID",
+        description="The ID of the project the request is for, used for logging and usage tracking",
+    )
+
+
+class DescriptionEnhanceRequest(AITextRequest):
     """Request model for enhancing project descriptions."""
 
     user_description: str = Field(
@@ -36,7 +46,7 @@ class DescriptionEnhanceResponse(BaseModel):
     )
 
 
-class BusinessGoalsEnhanceRequest(BaseModel):
+class BusinessGoalsEnhanceRequest(AITextRequest):
     """Request model for enhancing business goals."""
 
     project_description: str = Field(
@@ -70,7 +80,7 @@ class BusinessGoalsEnhanceResponse(BaseModel):
     )
 
 
-class TargetUsersEnhanceRequest(BaseModel):
+class TargetUsersEnhanceRequest(AITextRequest):
     """Request model for enhancing target users description."""
 
     project_description: str = Field(
@@ -104,7 +114,7 @@ class TargetUsersEnhanceResponse(BaseModel):
     )
 
 
-class RequirementsEnhanceRequest(BaseModel):
+class RequirementsEnhanceRequest(AITextRequest):
     """Request model for enhancing project requirements."""
 
     project_description: str = Field(
@@ -145,7 +155,73 @@ class RequirementsEnhanceResponse(BaseModel):
     )
 
 
-class FeaturesEnhanceRequest(BaseModel):
+class ProjectBundleEnhanceRequest(AITextRequest):
+    """Request model for enhancing the project description, goals, target users and requirements in one call."""
+
+    project_description: str = Field(
+        ...,
+        title="Project Description",
+        description="The original project description provided by the user",
+        examples=["An app for tracking my daily workouts"],
+    )
+
+    user_goals: List[str] = Field(
+        default_factory=list,
+        title="User Goals",
+        description="The original business goals provided by the user",
+        examples=[["Track workouts", "Monitor progress", "Share with friends"]],
+    )
+
+    target_users: str = Field(
+        "",
+        title="Target Users",
+        description="The original target users description provided by the user",
+        examples=["People who want to track their workouts"],
+    )
+
+    user_requirements: List[str] = Field(
+        default_factory=list,
+        title="User Requirements",
+        description="The original requirements provided by the user",
+        examples=[["Track workouts", "Monitor progress", "Share with friends"]],
+    )
+
+    additional_user_instruction: Optional[str] = Field(
+        None,
+        title="Additional User Instruction",
+        description="Custom instructions for the AI when enhancing the project bundle",
+    )
+
+
+class ProjectBundleEnhanceResponse(BaseModel):
+    """Response model for the enhanced project description, goals, target users and requirements."""
+
+    enhanced_description: str = Field(
+        ...,
+        title="Enhanced Description",
+        description="The AI-enhanced project description",
+    )
+
+    enhanced_goals: List[str] = Field(
+        ...,
+        title="Enhanced Goals",
+        description="The AI-enhanced business goals",
+    )
+
+    enhanced_target_users: str = Field(
+        ...,
+        title="Enhanced Target Users",
+        description="The AI-enhanced target users description",
+    )
+
+    enhanced_requirements: List[str] = Field(
+        ...,
+        title="Enhanced Requirements",
+        description="The AI-enhanced project requirements",
+    )
+
+
+class FeaturesEnhanceRequest(AITextRequest):
     """Request model for enhancing project features."""
 
     project_description: str = Field(
@@ -272,7 +348,7 @@ class PagesData(BaseModel):
     )
 
 
-class PagesEnhanceRequest(BaseModel):
+class PagesEnhanceRequest(AITextRequest):
     """Request model for enhancing application pages."""
 
     project_description: str = Field(
@@ -356,7 +432,7 @@ class UIDesignData(BaseModel):
     )
 
 
-class UIDesignEnhanceRequest(BaseModel):
+class UIDesignEnhanceRequest(AITextRequest):
     """Request model for enhancing UI design."""
 
     project_description: str = Field(
@@ -400,7 +476,7 @@ class UIDesignEnhanceResponse(BaseModel):
     )
 
 
-class DataModelEnhanceRequest(BaseModel):
+class DataModelEnhanceRequest(AITextRequest):
     """Request model for enhancing the data model."""
 
     project_description: str = Field(
@@ -579,7 +655,7 @@ class ApiData(BaseModel):
     )
 
 
-class ApiEndpointsEnhanceRequest(BaseModel):
+class ApiEndpointsEnhanceRequest(AITextRequest):
     """Request model for enhancing API endpoints."""
 
     project_description: str = Field(
@@ -629,7 +705,7 @@ class ApiEndpointsEnhanceResponse(BaseModel):
     )
 
 
-class TechStackEnhanceRequest(BaseModel):
+class TechStackEnhanceRequest(AITextRequest):
     """Request model for enhancing technology stack recommendations."""
 
     project_description: str = Field(
@@ -761,7 +837,7 @@ class TestCasesData(BaseModel):
     )
 
 
-class TestCasesEnhanceRequest(BaseModel):
+class TestCasesEnhanceRequest(AITextRequest):
     """Request model for enhancing test cases."""
 
     project_description: str = Field(
@@ -805,7 +881,137 @@ class TestCasesEnhanceResponse(BaseModel):
     )
 
 
-class ImplementationPromptGenerateRequest(BaseModel):
+class SpecBundleEnhanceRequest(AITextRequest):
+    """Request model for generating the data model, API endpoints and test cases at once."""
+
+    project_description: str = Field(
+        ...,
+        title="Project Description",
+        description="The description of the project",
+        examples=["A web application for tracking daily fitness workouts and nutrition"],
+    )
+
+    business_goals: List[str] = Field(
+        default_factory=list,
+        title="Business Goals",
+        description="The business goals of the project",
+    )
+
+    features: List[Dict[str, Any]] = Field(
+        ...,
+        title="Features",
+        description="The features of the project",
+    )
+
+    requirements: List[str] = Field(
+        ...,
+        title="Requirements",
+        description="The project requirements",
+        examples=[["Users must be able to login", "Users should be able to track workouts"]],
+    )
+
+    existing_data_model: Optional[Dict[str, Any]] = Field(
+        None,
+        title="Existing Data Model",
+        description="The existing data model, also used as input for the API endpoints",
+    )
+
+    additional_user_instruction: Optional[str] = Field(
+        None,
+        title="Additional User Instruction",
+        description="Custom instructions for the AI applied to every section",
+    )
+
+
+class SpecBundleEnhanceResponse(BaseModel):
+    """Response model for the data model, API endpoints and test cases generated at once.
+
+    A section is None if generating it failed; the reason is listed under ``errors``.
+    """
+
+    data_model: Optional[DataModel] = Field(
+        None, title="Data Model", description="The generated data model"
+    )
+
+    api_endpoints: Optional[ApiData] = Field(
+        None, title="API Endpoints", description="The generated API endpoints"
+    )
+
+    test_cases: Optional[TestCasesData] = Field(
+        None, title="Test Cases", description="The generated test cases"
+    )
+
+    errors: Dict[str, str] = Field(
+        default_factory=dict,
+        title="Errors",
+        description="Error messages of the sections that could not be generated, by section",
+    )
+
+
+class DesignBundleEnhanceRequest(AITextRequest):
+    """Request model for generating the tech stack and UI design at once."""
+
+    project_description: str = Field(
+        ...,
+        title="Project Description",
+        description="The description of the project",
+        examples=["A web application for tracking daily fitness workouts and nutrition"],
+    )
+
+    requirements: List[str] = Field(
+        ...,
+        title="Requirements",
+        description="The project requirements",
+        examples=[["User authentication", "Data persistence", "Real-time updates"]],
+    )
+
+    features: List[Dict[str, Any]] = Field(
+        default_factory=list,
+        title="Features",
+        description="The project features that need UI representation",
+    )
+
+    user_preferences: Dict[str, Any] = Field(
+        default_factory=dict,
+        title="User Preferences",
+        description="The user's existing technology preferences",
+    )
+
+    existing_ui_design: Optional[UIDesignData] = Field(
+        default=None,
+        title="Existing UI Design",
+        description="The existing UI design that may need enhancement",
+    )
+
+    additional_user_instruction: Optional[str] = Field(
+        None,
+        title="Additional User Instruction",
+        description="Custom instructions for the AI applied to every section",
+    )
+
+
+class DesignBundleEnhanceResponse(BaseModel):
+    """Response model for the tech stack and UI design generated at once.
+
+    A section is None if generating it failed; the reason is listed under ``errors``.
+    """
+
+    tech_stack: Optional[TechStackRecommendation] = Field(
+        None, title="Tech Stack", description="The generated tech stack recommendations"
+    )
+
+    ui_design: Optional[UIDesignData] = Field(
+        None, title="UI Design", description="The generated UI design"
+    )
+
+    errors: Dict[str, str] = Field(
+        default_factory=dict,
+        title="Errors",
+        description="Error messages of the sections that could not be generated, by section",
+    )
+
+
+class ImplementationPromptGenerateRequest(AITextRequest):
     """Request for generating implementation prompts."""
 
     category: str = Field(..., description="The category to generate prompts for")
@@ -833,7 +1039,7 @@ class ImplementationPromptsGenerateResponse(BaseModel):
     prompts: List[ImplementationPromptResponse]
 
 
-class EnhanceReadmeRequest(BaseModel):
+class EnhanceReadmeRequest(AITextRequest):
     """Request model for enhancing project README."""
 
     project_name: str = Field(
@@ -907,3 +1113,72 @@ class CreateAIRulesResponse(BaseModel):
         title="AI Rules",
         description="The created AI rules",
     )
+
+
+class DescriptionBatchItem(BaseModel):
+    """A project description to enhance as part of a batch."""
+
+    type: Literal["description"] = Field("description", title="Type")
+    request: DescriptionEnhanceRequest = Field(
+        ..., title="Request", description="The description enhancement request"
+    )
+
+
+class ReadmeBatchItem(BaseModel):
+    """A project README to enhance as part of a batch."""
+
+    type: Literal["readme"] = Field("readme", title="Type")
+    request: EnhanceReadmeRequest = Field(
+        ..., title="Request", description="The README enhancement request"
+    )
+
+
+class FeaturesBatchItem(BaseModel):
+    """A project feature set to enhance as part of a batch."""
+
+    type: Literal["features"] = Field("features", title="Type")
+    request: FeaturesEnhanceRequest = Field(
+        ..., title="Request", description="The features enhancement request"
+    )
+
+
+BatchEnhanceItem = Annotated[
+    Union[DescriptionBatchItem, ReadmeBatchItem, FeaturesBatchItem], Field(discriminator="type")
+]
+
+
+class BatchEnhanceRequest(BaseModel):
+    """Request model for enhancing descriptions, READMEs and features of many projects at once."""
+
+    items: List[BatchEnhanceItem] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        title="Items",
+        description="The enhancement requests, each tagged with its type",
+    )
+
+
+class BatchEnhanceItemResult(BaseModel):
+    """Result of one item of a batch enhancement request.
+
+    ``result`` is None if the item failed; the reason is given in ``error``.
+    """
+
+    type: str = Field(..., title="Type", description="The type of the item")
+
+    result: Optional[
+        Union[DescriptionEnhanceResponse, EnhanceReadmeResponse, FeaturesEnhanceResponse]
+    ] = Field(None, title="Result", description="The response of the matching enhance endpoint")
+
+    error: Optional[str] = Field(
+        None, title="Error", description="Error message if the item could not be enhanced"
+    )
+
+
+class BatchEnhanceResponse(BaseModel):
+    """Response model for a batch enhancement request."""
+
+    results: List[BatchEnhanceItemResult] = Field(
+        ..., title="Results", description="The results, in the order of the request items"
+    )
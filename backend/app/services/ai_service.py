@@ -5,12 +5,32 @@ methods for generating responses, streaming responses, and processing
 specifications.
 """
 
+import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional, AsyncGenerator
+from contextlib import aclosing, nullcontext
+from functools import lru_cache
+from typing import (
+    List,
+    Dict,
+    Any,
+    Optional,
+    AsyncContextManager,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+)
+
+import orjson
+from fastapi import HTTPException
 
 from .llm_client_factory import LLMClientFactory
 from .usage_tracker_interface import UsageTracker
-from ..utils.llm_logging import LLMLogger
+from .db_usage_tracker import DatabaseUsageTracker
+from .model_request_limiter import ModelRequestLimiter
+from ..utils.llm_logging import LLMLogger, DefaultLLMLogger
+from ..db.base import db
+from ..core.config import settings
 
 # Set up logger at module level
 logger = logging.getLogger(__name__)
@@ -20,6 +40,58 @@ INTELLIGENT_MODEL = "claude-3-7-sonnet-20250219"
 BACKUP_MODEL = "claude-3-5-sonnet-20241022"
 FAST_MODEL = "claude-3-5-haiku-20241022"
 
+# Prefixes of generate_response results that report a failure instead of generated text
+_INSUFFICIENT_CREDITS_PREFIX = "Insufficient credits"
+_ERROR_RESPONSE_PREFIXES = (_INSUFFICIENT_CREDITS_PREFIX, "Error:")
+
+
+class InsufficientCreditsError(HTTPException):
+    """Raised when the user does not have enough AI credits for a request.
+
+    Being an HTTPException, it reaches API clients as a 402 response without any
+    handling in the routes.
+    """
+
+    def __init__(self, detail: str) -> None:
+        super().__init__(status_code=402, detail=detail)
+
+
+def _raise_if_insufficient_credits(response: Any) -> None:
+    """Raise InsufficientCreditsError if an LLM client result reports insufficient credits."""
+    if isinstance(response, dict):
+        response = response.get("error")
+    if isinstance(response, str) and response.startswith(_INSUFFICIENT_CREDITS_PREFIX):
+        raise InsufficientCreditsError(response)
+
+
+def _is_successful_text(response: Any) -> bool:
+    """Whether a generate_response result is generated text rather than a failure."""
+    return isinstance(response, str) and not response.startswith(_ERROR_RESPONSE_PREFIXES)
+
+
+def _is_successful_tool_use(response: Any) -> bool:
+    """Whether a get_tool_use_response result is tool input rather than a failure."""
+    return isinstance(response, dict) and "error" not in response
+
+
+def _prompt_key(
+    log_metadata: Optional[Dict[str, Any]],
+    response_type: Optional[str],
+    model: Optional[str],
+    system: Optional[str],
+    messages: List[Dict[str, Any]],
+    tools: Optional[List[Dict[str, Any]]] = None,
+) -> str:
+    """Build the key identifying a user's prompt, namespaced by response type.
+
+    The key includes the user the call is billed to, so calls of different users are
+    never shared. The text and tools are used as given, so only exactly identical
+    prompts share a key.
+    """
+    user_id = log_metadata.get("user_id") if log_metadata else None
+    prompt = [user_id, response_type, model, system, messages, tools]
+    return hashlib.blake2b(orjson.dumps(prompt, option=orjson.OPT_NON_STR_KEYS)).hexdigest()
+
 
 class AIService:
     """Service for interacting with AI models.
@@ -30,18 +102,74 @@ class AIService:
 
     Attributes:
         llm_client: The LLM client to use for interacting with AI models.
+        request_limiter: Optional limiter bounding concurrent requests per model.
     """
 
     def __init__(
-        self, llm_logger: Optional[LLMLogger] = None, usage_tracker: Optional[UsageTracker] = None
+        self,
+        llm_logger: Optional[LLMLogger] = None,
+        usage_tracker: Optional[UsageTracker] = None,
+        request_limiter: Optional[ModelRequestLimiter] = None,
     ) -> None:
-        """Initialize the AI service with optional logger and usage tracker."""
+        """Initialize the AI service with its optional logger, tracker and limiter."""
         self.llm_logger = llm_logger
         self.usage_tracker = usage_tracker
+        self.request_limiter = request_limiter
+
+        # Calls currently running, keyed by prompt, so identical concurrent requests share one
+        self._inflight_calls: Dict[str, "asyncio.Future[Any]"] = {}
 
         # Get the appropriate LLM client from the factory
         self.llm_client = LLMClientFactory.create_client(llm_logger, usage_tracker)
 
+    def _request_slot(self, model: Optional[str]) -> AsyncContextManager[Any]:
+        """Hold one of the model's request slots if a request limiter is configured."""
+        if self.request_limiter is None:
+            return nullcontext()
+        return self.request_limiter.slot(model)
+
+    async def _call_once(
+        self,
+        key: str,
+        call: Callable[[], Awaitable[Any]],
+        is_successful: Callable[[Any], bool],
+    ) -> Any:
+        """Run an AI call, joining an identical call that is already running.
+
+        Identical prompts a user sends at the same time (e.g. a double-clicked button)
+        then cost a single AI request. Calls are only shared within a user, since only the
+        caller that starts the call is credit-checked and billed. If the shared call
+        fails, joined callers make their own call instead.
+
+        Args:
+            key: The prompt key of the call, including the user it is billed to.
+            call: Starts the AI call.
+            is_successful: Whether a result of the call can be shared.
+
+        Returns:
+            The result of the call.
+        """
+        task = self._inflight_calls.get(key)
+        if task is not None:
+            try:
+                response = await asyncio.shield(task)
+            except Exception:
+                response = None
+            if is_successful(response):
+                return response
+            return await call()
+
+        task = asyncio.ensure_future(call())
+        self._inflight_calls[key] = task
+        task.add_done_callback(lambda done: self._forget_inflight_call(key, done))
+        # Shield the shared call so a cancelled caller does not cancel it for the others
+        return await asyncio.shield(task)
+
+    def _forget_inflight_call(self, key: str, task: "asyncio.Future[Any]") -> None:
+        """Remove a finished call from the in-flight map."""
+        if self._inflight_calls.get(key) is task:
+            del self._inflight_calls[key]
+
     async def generate_response(
         self,
         messages: List[Dict[str, str]],
@@ -63,20 +191,31 @@ class AIService:
             log_metadata: Optional metadata to include in the logs.
             response_type: Optional type of response for logging purposes.
             check_credits: Whether to check if the user has sufficient credits.
-            use_token_api_for_estimation: Whether to use the token API for credit estimation.
+            use_token_api_for_estimation: Whether to confirm credit estimates close to the user's balance with the token API.
 
         Returns:
             The generated response from the AI model.
+
+        Raises:
+            InsufficientCreditsError: If the user does not have enough credits.
         """
-        return await self.llm_client.generate_response(
-            messages=messages,
-            system=system,
-            model=model,
-            log_metadata=log_metadata,
-            response_type=response_type,
-            check_credits=check_credits,
-            use_token_api_for_estimation=use_token_api_for_estimation,
-        )
+        prompt_key = _prompt_key(log_metadata, response_type, model, system, messages)
+
+        async def call() -> str:
+            async with self._request_slot(model):
+                return await self.llm_client.generate_response(
+                    messages=messages,
+                    system=system,
+                    model=model,
+                    log_metadata=log_metadata,
+                    response_type=response_type,
+                    check_credits=check_credits,
+                    use_token_api_for_estimation=use_token_api_for_estimation,
+                )
+
+        response = await self._call_once(prompt_key, call, _is_successful_text)
+        _raise_if_insufficient_credits(response)
+        return response
 
     async def stream_response(
         self,
@@ -97,12 +236,17 @@ class AIService:
             log_metadata: Optional metadata to include in the logs.
             response_type: The type of response for logging purposes.
             check_credits: Whether to check if the user has sufficient credits.
-            use_token_api_for_estimation: Whether to use the token API for credit estimation.
+            use_token_api_for_estimation: Whether to confirm credit estimates close to the user's balance with the token API.
 
         Yields:
             Chunks of the generated response from the AI model.
+
+        Raises:
+            InsufficientCreditsError: If the user does not have enough credits.
         """
-        async for chunk in self.llm_client.stream_response(
+        # The client stream is closed as soon as this one is, so a partial response is
+        # logged and billed right away
+        chunks = self.llm_client.stream_response(
             messages=messages,
             system=system,
             model=model,
@@ -110,8 +254,16 @@ class AIService:
             response_type=response_type,
             check_credits=check_credits,
             use_token_api_for_estimation=use_token_api_for_estimation,
-        ):
-            yield chunk
+        )
+        async with self._request_slot(model), aclosing(chunks):
+            first_chunk = True
+            async for chunk in chunks:
+                # Credits are checked before the model is called, so only the first chunk
+                # can report them
+                if first_chunk:
+                    _raise_if_insufficient_credits(chunk)
+                    first_chunk = False
+                yield chunk
 
     async def get_tool_use_response(
         self,
@@ -136,23 +288,129 @@ class AIService:
             log_metadata: Optional metadata to include in the logs.
             response_type: Optional type of response for logging purposes.
             check_credits: Whether to check if the user has sufficient credits.
-            use_token_api_for_estimation: Whether to use the token API for credit estimation.
+            use_token_api_for_estimation: Whether to confirm credit estimates close to the user's balance with the token API.
 
         Returns:
             The tool input if found, or a dictionary with an error message if not.
+
+        Raises:
+            InsufficientCreditsError: If the user does not have enough credits.
         """
-        return await self.llm_client.get_tool_use_response(
-            system_prompt=system_prompt,
-            tools=tools,
-            messages=messages,
-            model=model,
-            log_metadata=log_metadata,
-            response_type=response_type,
+        prompt_key = _prompt_key(log_metadata, response_type, model, system_prompt, messages, tools)
+
+        async def call() -> Dict[str, Any]:
+            async with self._request_slot(model):
+                return await self.llm_client.get_tool_use_response(
+                    system_prompt=system_prompt,
+                    tools=tools,
+                    messages=messages,
+                    model=model,
+                    log_metadata=log_metadata,
+                    response_type=response_type,
+                    check_credits=check_credits,
+                    use_token_api_for_estimation=use_token_api_for_estimation,
+                )
+
+        response = await self._call_once(prompt_key, call, _is_successful_tool_use)
+        _raise_if_insufficient_credits(response)
+        return response
+
+    async def stream_tool_use_response(
+        self,
+        system_prompt: str,
+        tools: List[Dict[str, Any]],
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        log_metadata: Optional[Dict[str, Any]] = None,
+        response_type: Optional[str] = "stream_tool_use_response",
+        check_credits: bool = True,
+        use_token_api_for_estimation: bool = True,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream a tool use response from the AI model.
+
+        Args:
+            system_prompt: The system prompt to provide context.
+            tools: The tools to make available.
+            messages: A list of messages in the conversation history.
+            model: Optional model to use for generating responses.
+            log_metadata: Optional metadata to include in the logs.
+            response_type: Optional type of response for logging purposes.
+            check_credits: Whether to check if the user has sufficient credits.
+            use_token_api_for_estimation: Whether to confirm credit estimates close to the user's balance with the token API.
+
+        Yields:
+            ``input_json`` events with the partial JSON and the partially parsed tool input
+            so far, followed by a final ``result`` event with the same payload
+            get_tool_use_response would return.
+
+        Raises:
+            InsufficientCreditsError: If the user does not have enough credits.
+        """
+        async with self._request_slot(model):
+            async for event in self.llm_client.stream_tool_use_response(
+                system_prompt=system_prompt,
+                tools=tools,
+                messages=messages,
+                model=model,
+                log_metadata=log_metadata,
+                response_type=response_type,
+                check_credits=check_credits,
+                use_token_api_for_estimation=use_token_api_for_estimation,
+            ):
+                if event["type"] == "result":
+                    _raise_if_insufficient_credits(event["data"])
+                yield event
+
+    async def generate_batch_responses(
+        self,
+        requests: List[Dict[str, Any]],
+        check_credits: bool = True,
+        use_token_api_for_estimation: bool = True,
+    ) -> Dict[str, Any]:
+        """Generate responses for several independent requests at once.
+
+        With Anthropic the requests are sent as one message batch at half the regular
+        token price, which takes longer than individual calls; other providers run them
+        concurrently.
+
+        Args:
+            requests: The requests, each a dict with a ``custom_id`` and ``messages``,
+                and optionally a ``system`` prompt, ``tools``, ``model``, ``log_metadata``
+                and ``response_type``. Requests with tools get a tool use response.
+            check_credits: Whether to check if the user has sufficient credits.
+            use_token_api_for_estimation: Whether to confirm credit estimates close to the user's balance with the token API.
+
+        Returns:
+            The responses keyed by ``custom_id``. A request that failed maps to the
+            exception describing the failure instead of raising it, so one failed request
+            does not fail the others: InsufficientCreditsError if the user was out of
+            credits for it, a plain Exception otherwise.
+        """
+        responses = await self.llm_client.generate_batch_responses(
+            requests,
             check_credits=check_credits,
             use_token_api_for_estimation=use_token_api_for_estimation,
         )
 
-    def count_tokens(
+        results: Dict[str, Any] = {}
+        for request in requests:
+            response = responses.get(request["custom_id"], "Error: No response in batch")
+            if request.get("tools"):
+                succeeded = _is_successful_tool_use(response)
+                error = response.get("error") if isinstance(response, dict) else response
+            else:
+                succeeded = _is_successful_text(response)
+                error = response
+
+            if succeeded:
+                results[request["custom_id"]] = response
+            elif str(error).startswith(_INSUFFICIENT_CREDITS_PREFIX):
+                results[request["custom_id"]] = InsufficientCreditsError(error)
+            else:
+                results[request["custom_id"]] = Exception(error)
+        return results
+
+    async def count_tokens(
         self,
         messages: List[Dict[str, str]],
         system: Optional[str] = None,
@@ -171,7 +429,7 @@ class AIService:
         Returns:
             A dictionary containing the token count information.
         """
-        return self.llm_client.count_tokens(
+        return await self.llm_client.count_tokens(
             messages=messages, system=system, model=model, tools=tools
         )
 
@@ -185,3 +443,25 @@ class AIService:
             The processed specification data with AI-generated enhancements.
         """
         return await self.llm_client.process_specification(spec_data)
+
+
+@lru_cache(maxsize=1)
+def get_ai_service() -> AIService:
+    """Get the shared AI service, injected into the API routes with Depends.
+
+    The service (and the underlying SDK client with its HTTP connection pool) is
+    created on first use and reused for every request afterwards, so keep-alive
+    connections and TLS sessions are shared across all endpoints. It must first be
+    called after the database connection is established during application startup.
+
+    Concurrent requests per model are capped by LLM_MAX_CONCURRENT_REQUESTS; requests
+    beyond the cap wait for a slot instead of competing for the provider's rate limits.
+
+    Returns:
+        The process-wide AIService instance.
+    """
+    return AIService(
+        DefaultLLMLogger(),
+        DatabaseUsageTracker(db.get_db()),
+        request_limiter=ModelRequestLimiter(settings.llm.max_concurrent_requests),
+    )
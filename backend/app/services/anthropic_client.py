@@ -3,11 +3,12 @@
 This module provides a client for interacting with Anthropic Claude API directly.
 """
 
+import asyncio
 import json
 import logging
-from typing import List, Dict, Any, Optional, Generator, AsyncGenerator
-from anthropic import Anthropic
-from anthropic.types import ContentBlockDeltaEvent
+from typing import List, Dict, Any, Optional, AsyncGenerator, Tuple
+import httpx
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
 
 from .base_llm_client import BaseLLMClient
 from .usage_tracker_interface import UsageTracker
@@ -22,6 +23,28 @@ INTELLIGENT_MODEL = "claude-3-7-sonnet-20250219"
 BACKUP_MODEL = "claude-3-5-sonnet-20241022"
 FAST_MODEL = "claude-3-5-haiku-20241022"
 
+# Message batches are billed at half the regular token price
+BATCH_PRICE_MULTIPLIER = 0.5
+# Seconds between checks whether a message batch has finished processing
+BATCH_POLL_INTERVAL = 5.0
+
+# Connection pool of the shared HTTP client. HTTP/2 multiplexes concurrent requests over
+# few connections, so many AI calls can be in flight without a handshake each
+HTTP_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=100)
+# Fail fast on connecting, but leave long generations the SDK's default of 10 minutes
+HTTP_TIMEOUT = httpx.Timeout(600.0, connect=5.0)
+
+
+def _cacheable_system(system: str) -> List[Dict[str, Any]]:
+    """Wrap a system prompt in a text block marked for prompt caching.
+
+    The cache prefix covers the tools and the system prompt, which are the same for every
+    request of an endpoint, so later requests read them from the cache at a fraction of
+    the input token price. Prefixes below the model's minimum cacheable length are
+    simply not cached.
+    """
+    return [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+
 
 class AnthropicDirectClient(BaseLLMClient):
     """Client for interacting with Anthropic Claude API directly.
@@ -50,7 +73,12 @@ class AnthropicDirectClient(BaseLLMClient):
         )
 
         try:
-            self.client = Anthropic(api_key=settings.anthropic.api_key)
+            self.client = AsyncAnthropic(
+                api_key=settings.anthropic.api_key,
+                http_client=DefaultAsyncHttpxClient(
+                    http2=True, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT
+                ),
+            )
             logger.info("Anthropic client initialized successfully")
         except Exception as e:
             # Log the error but don't crash
@@ -58,7 +86,7 @@ class AnthropicDirectClient(BaseLLMClient):
             # Set client to None to indicate it's not available
             self.client = None
 
-    def count_tokens(
+    async def count_tokens(
         self,
         messages: List[Dict[str, str]],
         system: Optional[str] = None,
@@ -89,7 +117,7 @@ class AnthropicDirectClient(BaseLLMClient):
             if tools:
                 params["tools"] = tools
 
-            response = self.client.messages.count_tokens(**params)
+            response = await self.client.messages.count_tokens(**params)
 
             # Convert to dict if it's a structured object
             if hasattr(response, "model_dump"):
@@ -160,9 +188,9 @@ class AnthropicDirectClient(BaseLLMClient):
             }
 
             if system:
-                params["system"] = system
+                params["system"] = _cacheable_system(system)
 
-            response = self.client.messages.create(**params)
+            response = await self.client.messages.create(**params)
             result = ""
             # Extract text from response
             if (
@@ -238,34 +266,30 @@ class AnthropicDirectClient(BaseLLMClient):
                 "max_tokens": 8192 if model_to_use != INTELLIGENT_MODEL else self.max_tokens,
                 "temperature": self.temperature,
                 "messages": messages,
-                "stream": True,
             }
 
             if system:
-                params["system"] = system
-
-            # Collect the full response for logging
-            full_response = ""
-            response_obj = None
+                params["system"] = _cacheable_system(system)
 
-            with self.client.messages.stream(**params) as stream:
-                # Get the response object to extract metadata later
-                response_obj = stream.response
-
-                for chunk in stream:
-                    if isinstance(chunk, ContentBlockDeltaEvent) and chunk.delta.text:
-                        chunk_text = chunk.delta.text
-                        full_response += chunk_text
+            async with self.client.messages.stream(**params) as stream:
+                streamed = False
+                try:
+                    async for chunk_text in stream.text_stream:
+                        streamed = True
                         yield chunk_text
+                except (GeneratorExit, asyncio.CancelledError):
+                    # The client went away mid-stream; the tokens generated so far are
+                    # still logged and billed
+                    if streamed:
+                        self._process_response(
+                            stream.current_message_snapshot, response_type, metadata
+                        )
+                    raise
 
-            # Process the complete response after streaming is done
-            if response_obj:
-                # Create a complete response object for logging
-                response_with_content = response_obj
-                # Add the full content for logging
-                if hasattr(response_with_content, "content"):
-                    response_with_content.content = [{"type": "text", "text": full_response}]
-                self._process_response(response_with_content, response_type, metadata)
+                # The final message carries the full content and usage for logging
+                response_obj = await stream.get_final_message()
+
+            self._process_response(response_obj, response_type, metadata)
 
         except Exception as e:
             # Log the error
@@ -362,21 +386,23 @@ class AnthropicDirectClient(BaseLLMClient):
                 "model": model_to_use,
                 "max_tokens": 8192 if model_to_use != INTELLIGENT_MODEL else self.max_tokens,
                 "temperature": self.temperature,
-                "system": system_prompt,
                 "tools": tools,
                 "messages": messages,
             }
 
+            if system_prompt:
+                params["system"] = _cacheable_system(system_prompt)
+
             if model_to_use == INTELLIGENT_MODEL:
                 params["betas"] = ["token-efficient-tools-2025-02-19"]
                 logger.info(
                     f"Params using Claude 3.7 and token-efficient-tools-2025-02-19: {params}"
                 )
 
-                response = self.client.beta.messages.create(**params)
+                response = await self.client.beta.messages.create(**params)
             else:
                 logger.info(f"Params: {params}")
-                response = self.client.messages.create(**params)
+                response = await self.client.messages.create(**params)
 
             # Extract tool use or process text content
             result = self._extract_tool_use_or_json(response)
@@ -392,3 +418,247 @@ class AnthropicDirectClient(BaseLLMClient):
                 error=e, response_type=response_type or "tool_use_response", metadata=metadata
             )
             return {"error": f"Error with Anthropic API: {str(e)}"}
+
+    async def generate_batch_responses(
+        self,
+        requests: List[Dict[str, Any]],
+        check_credits: bool = True,
+        use_token_api_for_estimation: bool = True,
+    ) -> Dict[str, Any]:
+        """Generate responses for several independent requests with one message batch.
+
+        The requests are sent through the Message Batches API, which is billed at half
+        the regular token price, and the batch is polled until every request is done.
+        Requests the user has no credits for are not sent. If the caller is cancelled
+        while waiting, the batch is cancelled too.
+
+        Args:
+            requests: The requests, each a dict with a ``custom_id`` and ``messages``,
+                and optionally a ``system`` prompt, ``tools``, ``model``, ``log_metadata``
+                and ``response_type``.
+            check_credits: Whether to check if the user has sufficient credits.
+            use_token_api_for_estimation: Whether to confirm credit estimates close to the
+                user's balance with the token API.
+
+        Returns:
+            The responses keyed by ``custom_id``: the text for requests without tools, the
+            tool input for requests with tools, or the error as the single request would
+            report it.
+        """
+        if not self.client:
+            return {
+                request["custom_id"]: self._batch_error_result(
+                    request, "Error: Anthropic client not available"
+                )
+                for request in requests
+            }
+
+        results: Dict[str, Any] = {}
+        batch_requests = []
+        pending: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        for request in requests:
+            custom_id = request["custom_id"]
+            system = request.get("system")
+            tools = request.get("tools")
+            messages = request["messages"]
+            model_to_use = request.get("model") or self.model
+            if tools:
+                metadata = self._prepare_tool_log_metadata(
+                    messages, system, tools, model_to_use, request.get("log_metadata")
+                )
+            else:
+                metadata = self._prepare_log_metadata(
+                    messages, system, model_to_use, request.get("log_metadata")
+                )
+
+            # Check credits before sending the request if requested
+            if check_credits and self.usage_tracker and metadata.get("user_id"):
+                credit_check = await self._check_sufficient_credits(
+                    metadata["user_id"],
+                    messages,
+                    system,
+                    model_to_use,
+                    tools,
+                    use_token_api=use_token_api_for_estimation,
+                )
+                if not credit_check["has_sufficient_credits"]:
+                    results[custom_id] = self._batch_error_result(
+                        request,
+                        f"Insufficient credits. You have {credit_check['remaining_credits']} credits remaining.",
+                    )
+                    continue
+
+            params: Dict[str, Any] = {
+                "model": model_to_use,
+                "max_tokens": 8192 if model_to_use != INTELLIGENT_MODEL else self.max_tokens,
+                "temperature": self.temperature,
+                "messages": messages,
+            }
+            if system:
+                params["system"] = _cacheable_system(system)
+            if tools:
+                params["tools"] = tools
+
+            batch_requests.append({"custom_id": custom_id, "params": params})
+            pending[custom_id] = (request, metadata)
+
+        if not batch_requests:
+            return results
+
+        try:
+            batch = await self.client.messages.batches.create(requests=batch_requests)
+            try:
+                while batch.processing_status != "ended":
+                    await asyncio.sleep(BATCH_POLL_INTERVAL)
+                    batch = await self.client.messages.batches.retrieve(batch.id)
+            except asyncio.CancelledError:
+                # Nobody is waiting for the results anymore, so don't pay for them
+                await self.client.messages.batches.cancel(batch.id)
+                raise
+
+            async for entry in await self.client.messages.batches.results(batch.id):
+                request, metadata = pending.pop(entry.custom_id)
+                response_type = request.get("response_type") or "batch_response"
+                if entry.result.type != "succeeded":
+                    error = Exception(f"Batch request {entry.result.type}")
+                    self._log_error(error, response_type, metadata)
+                    results[entry.custom_id] = self._batch_error_result(
+                        request, f"Error: {str(error)}"
+                    )
+                    continue
+
+                message = entry.result.message
+                if request.get("tools"):
+                    results[entry.custom_id] = self._extract_tool_use_or_json(message)
+                else:
+                    results[entry.custom_id] = (
+                        str(message.content[0].text)
+                        if message.content and hasattr(message.content[0], "text")
+                        else ""
+                    )
+
+                # Log the response and track usage at the batch price
+                self._process_response(
+                    message, response_type, metadata, price_multiplier=BATCH_PRICE_MULTIPLIER
+                )
+
+        except Exception as e:
+            logger.error(f"Error running Anthropic message batch: {str(e)}")
+            for request, metadata in pending.values():
+                self._log_error(e, request.get("response_type") or "batch_response", metadata)
+                results[request["custom_id"]] = self._batch_error_result(
+                    request, f"Error: Error with Anthropic message batch: {str(e)}"
+                )
+
+        return results
+
+    async def stream_tool_use_response(
+        self,
+        system_prompt: str,
+        tools: List[Dict[str, Any]],
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        log_metadata: Optional[Dict[str, Any]] = None,
+        response_type: Optional[str] = "stream_tool_use_response",
+        check_credits: bool = True,
+        use_token_api_for_estimation: bool = True,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream a tool use response from Claude.
+
+        The tool input is streamed as ``input_json_delta`` events. The SDK parses the
+        accumulated partial JSON on every delta, so callers can act on completed parts
+        of the tool input (e.g. each finished entity) while the rest is still generating.
+
+        Args:
+            system_prompt: The system prompt to provide context to Claude.
+            tools: The tools to make available to Claude.
+            messages: A list of messages in the conversation history.
+            model: Optional model to use for generating responses.
+
+        Yields:
+            ``{"type": "input_json", "partial_json": ..., "snapshot": ...}`` events, then a
+            final ``{"type": "result", "data": ...}`` event with the tool input or an error.
+        """
+        # Prepare metadata
+        metadata = self._prepare_tool_log_metadata(
+            messages, system_prompt, tools, model, log_metadata
+        )
+        model_to_use = model if model else self.model
+
+        # Check credits before making the call if requested
+        if check_credits and self.usage_tracker and "user_id" in metadata and metadata["user_id"]:
+            credit_check = await self._check_sufficient_credits(
+                metadata["user_id"],
+                messages,
+                system_prompt,
+                model_to_use,
+                tools,
+                use_token_api=use_token_api_for_estimation,
+            )
+            if not credit_check["has_sufficient_credits"]:
+                yield {
+                    "type": "result",
+                    "data": {
+                        "error": f"Insufficient credits. You have {credit_check['remaining_credits']} credits remaining."
+                    },
+                }
+                return
+
+        try:
+            params = {
+                "model": model_to_use,
+                "max_tokens": 8192 if model_to_use != INTELLIGENT_MODEL else self.max_tokens,
+                "temperature": self.temperature,
+                "tools": tools,
+                "messages": messages,
+            }
+
+            if system_prompt:
+                params["system"] = _cacheable_system(system_prompt)
+
+            if model_to_use == INTELLIGENT_MODEL:
+                params["betas"] = ["token-efficient-tools-2025-02-19"]
+                stream_manager = self.client.beta.messages.stream(**params)
+            else:
+                stream_manager = self.client.messages.stream(**params)
+
+            async with stream_manager as stream:
+                streamed = False
+                try:
+                    async for event in stream:
+                        if event.type == "input_json":
+                            streamed = True
+                            yield {
+                                "type": "input_json",
+                                "partial_json": event.partial_json,
+                                "snapshot": event.snapshot,
+                            }
+                except (GeneratorExit, asyncio.CancelledError):
+                    # The client went away mid-stream; the tokens generated so far are
+                    # still logged and billed
+                    if streamed:
+                        self._process_response(
+                            stream.current_message_snapshot,
+                            response_type or "stream_tool_use_response",
+                            metadata,
+                        )
+                    raise
+
+                response = await stream.get_final_message()
+
+            # Extract tool use or process text content
+            result = self._extract_tool_use_or_json(response)
+
+            # Log the response and track usage
+            self._process_response(response, response_type or "stream_tool_use_response", metadata)
+
+        except Exception as e:
+            # Log the error
+            self._log_error(
+                error=e,
+                response_type=response_type or "stream_tool_use_response",
+                metadata=metadata,
+            )
+            result = {"error": f"Error with Anthropic API: {str(e)}"}
+
+        yield {"type": "result", "data": result}
@@ -4,27 +4,33 @@ This module provides a base implementation for LLM clients that handles
 common functionality such as logging, usage tracking, and error handling.
 """
 
+import hashlib
 import json
 import logging
 from typing import List, Dict, Any, Optional, Generator, AsyncGenerator
 import asyncio
 
+import orjson
+
 from .llm_client_interface import LLMClientInterface
 from .usage_tracker_interface import UsageTracker
 from ..utils.llm_logging import LLMLogger
+from ..utils.cache import TTLCache
 
 # Set up logger at module level
 logger = logging.getLogger(__name__)
 
 
-class SetEncoder(json.JSONEncoder):
-    """JSON encoder that can handle sets."""
+def _set_default(obj: Any) -> Any:
+    """Convert sets to lists for JSON serialization."""
+    if isinstance(obj, set):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
 
-    def default(self, obj: Any) -> Any:
-        """Convert sets to lists for JSON serialization."""
-        if isinstance(obj, set):
-            return list(obj)
-        return json.JSONEncoder.default(self, obj)
+def _format_json(obj: Any) -> str:
+    """Format an object (which may contain sets) as indented JSON for a prompt."""
+    return orjson.dumps(obj, default=_set_default, option=orjson.OPT_INDENT_2).decode()
 
 
 class BaseLLMClient(LLMClientInterface):
@@ -42,6 +48,10 @@ class BaseLLMClient(LLMClientInterface):
         provider_name: The name of the LLM provider.
     """
 
+    # Fraction of the remaining credits within which an estimated cost is confirmed with
+    # the token counting API
+    TOKEN_API_CREDIT_MARGIN = 0.05
+
     def __init__(
         self,
         llm_logger: Optional[LLMLogger] = None,
@@ -60,20 +70,64 @@ class BaseLLMClient(LLMClientInterface):
         self.client = None
         self.provider_name = provider_name
 
+        # Token counts of recent prompts, so repeated credit checks skip the counting API
+        self._token_count_cache = TTLCache(maxsize=1024, ttl=3600)
+
+    async def _count_tokens_cached(
+        self,
+        messages: List[Dict[str, str]],
+        system: Optional[str] = None,
+        model: Optional[str] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """Count tokens for a prompt, reusing the result for an identical earlier prompt."""
+        key = hashlib.blake2b(orjson.dumps([model, system, messages, tools])).hexdigest()
+        cached = self._token_count_cache.get(key)
+        if cached is not None:
+            return cached
+
+        token_count = await self.count_tokens(
+            messages=messages, system=system, model=model, tools=tools
+        )
+        if token_count.get("input_tokens") and "error" not in token_count:
+            self._token_count_cache.set(key, token_count)
+        return token_count
+
     def _process_response(
-        self, response: Any, response_type: str, metadata: Dict[str, Any]
+        self,
+        response: Any,
+        response_type: str,
+        metadata: Dict[str, Any],
+        price_multiplier: float = 1.0,
     ) -> None:
-        """Log response and track usage for successful API calls."""
+        """Log response and track usage for successful API calls.
+
+        ``price_multiplier`` scales the tracked tokens for discounted calls, such as
+        requests sent in a message batch.
+        """
         # Extract usage statistics from response
         input_tokens = 0
         output_tokens = 0
+        billed_input_tokens = 0
         if hasattr(response, "usage"):
             input_tokens = getattr(response.usage, "input_tokens", 0)
             output_tokens = getattr(response.usage, "output_tokens", 0)
+            # Prompt cache writes and reads are reported apart from input_tokens and are
+            # priced at 1.25x and 0.1x the input token rate
+            cache_creation_tokens = getattr(response.usage, "cache_creation_input_tokens", 0) or 0
+            cache_read_tokens = getattr(response.usage, "cache_read_input_tokens", 0) or 0
+            billed_input_tokens = input_tokens + round(
+                cache_creation_tokens * 1.25 + cache_read_tokens * 0.1
+            )
             metadata["usage"] = {
                 "input_tokens": input_tokens,
                 "output_tokens": output_tokens,
-                "total_tokens": input_tokens + output_tokens,
+                "cache_creation_input_tokens": cache_creation_tokens,
+                "cache_read_input_tokens": cache_read_tokens,
+                "total_tokens": input_tokens
+                + cache_creation_tokens
+                + cache_read_tokens
+                + output_tokens,
             }
 
         # Add provider information to metadata
@@ -99,14 +153,14 @@ class BaseLLMClient(LLMClientInterface):
             self.usage_tracker
             and "user_id" in metadata
             and metadata["user_id"]
-            and input_tokens > 0
+            and billed_input_tokens > 0
         ):
 
             self.usage_tracker.track_usage(
                 user_id=metadata["user_id"],
                 model=metadata.get("model", self.model),
-                input_tokens=input_tokens,
-                output_tokens=output_tokens,
+                input_tokens=round(billed_input_tokens * price_multiplier),
+                output_tokens=round(output_tokens * price_multiplier),
                 operation_type=response_type,
                 metadata={
                     "project_id": metadata.get("project_id", "unknown"),
@@ -115,79 +169,53 @@ class BaseLLMClient(LLMClientInterface):
                 },
             )
 
-    async def _check_sufficient_credits(
-        self,
-        user_id: str,
+    @staticmethod
+    def _estimate_input_tokens(
         messages: List[Dict[str, str]],
         system: Optional[str] = None,
-        model: Optional[str] = None,
         tools: Optional[List[Dict[str, Any]]] = None,
-        use_token_api: bool = True,
-    ) -> Dict[str, Any]:
-        """Check if a user has sufficient credits for an operation."""
-        if not self.usage_tracker:
-            return {"has_sufficient_credits": True}
-
-        # Estimate input tokens (approximate calculation)
+    ) -> int:
+        """Estimate input tokens locally, at approximately 4 characters per token."""
         estimated_input_tokens = 0
-        model_to_use = model if model else self.model
-
-        if use_token_api and self.client:
-            # Use the accurate token counting API
-            try:
-                token_count = self.count_tokens(
-                    messages=messages, system=system, model=model_to_use, tools=tools
-                )
-                estimated_input_tokens = token_count.get("input_tokens", 0)
 
-                logger.info(f"Token count from API: {estimated_input_tokens} for user {user_id}")
+        # Estimate message tokens
+        for msg in messages:
+            content = msg.get("content", "")
+            # Handle content as string or as a list of blocks
+            if isinstance(content, str):
+                estimated_input_tokens += len(content) // 4
+            elif isinstance(content, list):
+                # Handle content blocks (text, image, etc.)
+                for block in content:
+                    if isinstance(block, dict):
+                        block_type = block.get("type", "")
+                        if block_type == "text":
+                            estimated_input_tokens += len(block.get("text", "")) // 4
+                        elif block_type == "image":
+                            # Images typically use more tokens
+                            estimated_input_tokens += 1000  # Rough estimate for image
+
+        # Add system prompt tokens
+        if system:
+            estimated_input_tokens += len(system) // 4
+
+        # Add tokens for tools (rough estimate)
+        if tools:
+            tool_json = orjson.dumps(tools)
+            estimated_input_tokens += len(tool_json) // 4
+            # Add buffer for tool processing
+            estimated_input_tokens += 200  # Additional overhead
 
-                # If there was an error with token counting, fall back to estimation
-                if estimated_input_tokens == 0 and "error" in token_count:
-                    logger.warning(
-                        f"Token count API error: {token_count['error']}. Falling back to estimation."
-                    )
-                    use_token_api = False
-            except Exception as e:
-                logger.warning(
-                    f"Error using token count API: {str(e)}. Falling back to estimation."
-                )
-                use_token_api = False
-
-        if not use_token_api or estimated_input_tokens == 0:
-            # Fallback to estimation method
-            estimated_input_tokens = 0
-
-            # Estimate message tokens (approximately 4 chars per token)
-            for msg in messages:
-                content = msg.get("content", "")
-                # Handle content as string or as a list of blocks
-                if isinstance(content, str):
-                    estimated_input_tokens += len(content) // 4
-                elif isinstance(content, list):
-                    # Handle content blocks (text, image, etc.)
-                    for block in content:
-                        if isinstance(block, dict):
-                            block_type = block.get("type", "")
-                            if block_type == "text":
-                                estimated_input_tokens += len(block.get("text", "")) // 4
-                            elif block_type == "image":
-                                # Images typically use more tokens
-                                estimated_input_tokens += 1000  # Rough estimate for image
-
-            # Add system prompt tokens
-            if system:
-                estimated_input_tokens += len(system) // 4
-
-            # Add tokens for tools (rough estimate)
-            if tools:
-                tool_json = json.dumps(tools)
-                estimated_input_tokens += len(tool_json) // 4
-                # Add buffer for tool processing
-                estimated_input_tokens += 200  # Additional overhead
-
-            logger.info(f"Estimated token count: {estimated_input_tokens} for user {user_id}")
+        return estimated_input_tokens
 
+    async def _check_credits_for_tokens(
+        self,
+        user_id: str,
+        estimated_input_tokens: int,
+        model: str,
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """Check a user's credits against an estimated number of input tokens."""
         # Estimate output tokens (typical response might be 1/4 to 1/2 of input)
         # For tools, use a smaller ratio since tool outputs are often more concise
         if tools:
@@ -195,12 +223,66 @@ class BaseLLMClient(LLMClientInterface):
         else:
             estimated_output_tokens = min(estimated_input_tokens // 2, self.max_tokens)
 
-        # Check if user has sufficient credits
         return await self.usage_tracker.check_credits(
             user_id=user_id,
             estimated_input_tokens=estimated_input_tokens,
             estimated_output_tokens=estimated_output_tokens,
-            model=model_to_use,
+            model=model,
+        )
+
+    async def _check_sufficient_credits(
+        self,
+        user_id: str,
+        messages: List[Dict[str, str]],
+        system: Optional[str] = None,
+        model: Optional[str] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        use_token_api: bool = True,
+    ) -> Dict[str, Any]:
+        """Check if a user has sufficient credits for an operation.
+
+        The check uses a local token estimate. The token counting API costs a network round
+        trip, so it is only asked for an exact count when ``use_token_api`` is set and the
+        estimated cost comes within ``TOKEN_API_CREDIT_MARGIN`` of the remaining credits.
+        """
+        if not self.usage_tracker:
+            return {"has_sufficient_credits": True}
+
+        model_to_use = model if model else self.model
+        estimated_input_tokens = self._estimate_input_tokens(messages, system, tools)
+        logger.info(f"Estimated token count: {estimated_input_tokens} for user {user_id}")
+
+        credit_check = await self._check_credits_for_tokens(
+            user_id, estimated_input_tokens, model_to_use, tools
+        )
+        if not use_token_api or not self.client or "error" in credit_check:
+            return credit_check
+
+        remaining_credits = credit_check.get("remaining_credits", 0)
+        if credit_check.get("estimated_cost", 0) < remaining_credits * (
+            1 - self.TOKEN_API_CREDIT_MARGIN
+        ):
+            return credit_check
+
+        # The estimate is close to the user's balance, so get the exact count
+        try:
+            token_count = await self._count_tokens_cached(
+                messages=messages, system=system, model=model_to_use, tools=tools
+            )
+        except Exception as e:
+            logger.warning(f"Error using token count API: {str(e)}. Keeping the estimate.")
+            return credit_check
+
+        counted_input_tokens = token_count.get("input_tokens", 0)
+        if counted_input_tokens == 0:
+            logger.warning(
+                f"Token count API error: {token_count.get('error')}. Keeping the estimate."
+            )
+            return credit_check
+
+        logger.info(f"Token count from API: {counted_input_tokens} for user {user_id}")
+        return await self._check_credits_for_tokens(
+            user_id, counted_input_tokens, model_to_use, tools
         )
 
     def _prepare_log_metadata(
@@ -277,13 +359,13 @@ class BaseLLMClient(LLMClientInterface):
         Project Type: {spec_data.get('requirements', {}).get('project_type', 'Web Application')}
 
         Functional Requirements:
-        {json.dumps(spec_data.get('requirements', {}).get('functional', []), indent=2, cls=SetEncoder)}
+        {_format_json(spec_data.get('requirements', {}).get('functional', []))}
 
         Non-Functional Requirements:
-        {json.dumps(spec_data.get('requirements', {}).get('non_functional', []), indent=2, cls=SetEncoder)}
+        {_format_json(spec_data.get('requirements', {}).get('non_functional', []))}
 
         Tech Stack:
-        {json.dumps(spec_data.get('requirements', {}).get('tech_stack', {}), indent=2, cls=SetEncoder)}
+        {_format_json(spec_data.get('requirements', {}).get('tech_stack', {}))}
 
         Please generate:
 
@@ -349,7 +431,7 @@ class BaseLLMClient(LLMClientInterface):
             return original_spec
 
     # Abstract method implementations (to be overridden by concrete classes)
-    def count_tokens(
+    async def count_tokens(
         self,
         messages: List[Dict[str, str]],
         system: Optional[str] = None,
@@ -399,6 +481,87 @@ class BaseLLMClient(LLMClientInterface):
         """Get a tool use response from the LLM."""
         raise NotImplementedError("Subclass must implement abstract method")
 
+    async def stream_tool_use_response(
+        self,
+        system_prompt: str,
+        tools: List[Dict[str, Any]],
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        log_metadata: Optional[Dict[str, Any]] = None,
+        response_type: Optional[str] = "stream_tool_use_response",
+        check_credits: bool = True,
+        use_token_api_for_estimation: bool = True,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream a tool use response from the LLM.
+
+        Providers without incremental tool input fall back to a single ``result`` event
+        carrying the complete tool use response.
+        """
+        result = await self.get_tool_use_response(
+            system_prompt,
+            tools,
+            messages,
+            model=model,
+            log_metadata=log_metadata,
+            response_type=response_type,
+            check_credits=check_credits,
+            use_token_api_for_estimation=use_token_api_for_estimation,
+        )
+        yield {"type": "result", "data": result}
+
+    @staticmethod
+    def _batch_error_result(request: Dict[str, Any], message: str) -> Any:
+        """Shape an error for a batch request like its single request would report it."""
+        return {"error": message} if request.get("tools") else message
+
+    async def generate_batch_responses(
+        self,
+        requests: List[Dict[str, Any]],
+        check_credits: bool = True,
+        use_token_api_for_estimation: bool = True,
+    ) -> Dict[str, Any]:
+        """Generate responses for several independent requests.
+
+        Each request is a dict with a ``custom_id`` and ``messages``, and optionally a
+        ``system`` prompt, ``tools``, ``model``, ``log_metadata`` and ``response_type``.
+        Requests with tools get a tool use response, the others a text response.
+
+        Providers without a batch API fall back to running the requests concurrently.
+
+        Returns:
+            The responses keyed by ``custom_id``. A failed text request maps to an error
+            string and a failed tool use request to a dict with an ``error`` key, as
+            generate_response and get_tool_use_response report them.
+        """
+
+        async def run(request: Dict[str, Any]) -> Any:
+            try:
+                if request.get("tools"):
+                    return await self.get_tool_use_response(
+                        request.get("system", ""),
+                        request["tools"],
+                        request["messages"],
+                        model=request.get("model"),
+                        log_metadata=request.get("log_metadata"),
+                        response_type=request.get("response_type", "tool_use_response"),
+                        check_credits=check_credits,
+                        use_token_api_for_estimation=use_token_api_for_estimation,
+                    )
+                return await self.generate_response(
+                    request["messages"],
+                    request.get("system"),
+                    request.get("model"),
+                    log_metadata=request.get("log_metadata"),
+                    response_type=request.get("response_type"),
+                    check_credits=check_credits,
+                    use_token_api_for_estimation=use_token_api_for_estimation,
+                )
+            except Exception as e:
+                return self._batch_error_result(request, f"Error: {str(e)}")
+
+        results = await asyncio.gather(*(run(request) for request in requests))
+        return {request["custom_id"]: result for request, result in zip(requests, results)}
+
     async def process_specification(self, spec_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process a specification using the LLM."""
         if not self.client:
@@ -1,17 +1,39 @@
+import asyncio
+import functools
 from datetime import datetime, timedelta
 import json
 import logging
 from typing import Dict, Any, Optional
 
 from .usage_tracker_interface import UsageTracker
+from ..utils.cache import TTLCache
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
 
+def _log_failed_write(description: str, write: "asyncio.Future[Any]") -> None:
+    """Log the error of a background database write, if it failed."""
+    if not write.cancelled() and write.exception() is not None:
+        logger.error(f"Error {description}: {write.exception()}")
+
+
+def _in_background(write: Any, description: str) -> None:
+    """Let a database write run without awaiting it, logging the error if it fails.
+
+    Usage records are bookkeeping the response does not wait for. Motor schedules the
+    write and returns a future; without a callback, nothing would retrieve its error.
+    """
+    if asyncio.isfuture(write):
+        write.add_done_callback(functools.partial(_log_failed_write, description))
+
+
 class DatabaseUsageTracker(UsageTracker):
     def __init__(self, db_client):
         self.db = db_client
+        # Short-lived cache of users' credit fields, so bursts of requests skip the DB read.
+        # Entries are kept in step with local usage and dropped when credits run out or change.
+        self._credit_cache = TTLCache(maxsize=10000, ttl=3)
         # Define token costs per model (these would come from configuration)
         self.model_pricing = {
             "claude-3-7-sonnet-20250219": {
@@ -59,11 +81,22 @@ class DatabaseUsageTracker(UsageTracker):
                 "metadata": metadata or {},
             }
 
-            # Insert usage record
-            self.db.llm_usage.insert_one(usage_record)
+            # Insert usage record; the writes run in the background
+            _in_background(
+                self.db.llm_usage.insert_one(usage_record),
+                f"recording usage for user {user_id}",
+            )
 
             # Increment user's credit usage by 1
-            self.db.users.update_one({"firebase_uid": user_id}, {"$inc": {"ai_credits_used": 1}})
+            _in_background(
+                self.db.users.update_one(
+                    {"firebase_uid": user_id}, {"$inc": {"ai_credits_used": 1}}
+                ),
+                f"updating credits used by user {user_id}",
+            )
+            cached_user = self._credit_cache.get(user_id)
+            if cached_user is not None:
+                cached_user["ai_credits_used"] = cached_user.get("ai_credits_used", 0) + 1
 
             # Update aggregated usage stats
             self._update_aggregated_stats(user_id, model, input_tokens, output_tokens, total_cost)
@@ -130,15 +163,19 @@ class DatabaseUsageTracker(UsageTracker):
         """Check if a user has sufficient credits for an operation."""
         try:
             # Get user's credit information using firebase_uid
-            user = await self.db.users.find_one(
-                {"firebase_uid": user_id}, {"ai_credits": 1, "ai_credits_used": 1, "plan": 1}
-            )
+            user = self._credit_cache.get(user_id)
+            if user is None:
+                user = await self.db.users.find_one(
+                    {"firebase_uid": user_id}, {"ai_credits": 1, "ai_credits_used": 1, "plan": 1}
+                )
 
-            logger.info(f"Checking credits for user {user_id}: {user}")
+                logger.info(f"Checking credits for user {user_id}: {user}")
 
-            if user is None:
-                logger.warning(f"User {user_id} not found.")
-                return {"has_sufficient_credits": False, "error": "User not found"}
+                if user is None:
+                    logger.warning(f"User {user_id} not found.")
+                    return {"has_sufficient_credits": False, "error": "User not found"}
+
+                self._credit_cache.set(user_id, user)
 
             # Calculate estimated cost of operation
             estimated_cost = 0
@@ -151,8 +188,13 @@ class DatabaseUsageTracker(UsageTracker):
             remaining_credits = user.get("ai_credits", 0) - user.get("ai_credits_used", 0)
             total_credits = user.get("ai_credits", 0)
 
+            has_sufficient_credits = remaining_credits >= estimated_cost
+            if not has_sufficient_credits:
+                # Re-read the balance next time, e.g. after the user buys more credits
+                self._credit_cache.pop(user_id)
+
             return {
-                "has_sufficient_credits": remaining_credits >= estimated_cost,
+                "has_sufficient_credits": has_sufficient_credits,
                 "remaining_credits": remaining_credits,
                 "total_credits": total_credits,
                 "estimated_cost": estimated_cost,
@@ -185,6 +227,7 @@ class DatabaseUsageTracker(UsageTracker):
             }
 
             self.db.credit_transactions.insert_one(transaction)
+            self._credit_cache.pop(user_id)
 
             # Update user's credit balance
             result = self.db.users.update_one(
@@ -250,7 +293,7 @@ class DatabaseUsageTracker(UsageTracker):
         year_month = f"{timestamp.year}-{timestamp.month:02d}"
 
         # Update monthly aggregates
-        self.db.monthly_usage.update_one(
+        write = self.db.monthly_usage.update_one(
             {"user_id": user_id, "year_month": year_month},
             {
                 "$inc": {
@@ -273,3 +316,4 @@ class DatabaseUsageTracker(UsageTracker):
             },
             upsert=True,
         )
+        _in_background(write, f"updating monthly usage of user {user_id}")
@@ -14,7 +14,7 @@ class LLMClientInterface(abc.ABC):
     """
 
     @abc.abstractmethod
-    def count_tokens(
+    async def count_tokens(
         self,
         messages: List[Dict[str, str]],
         system: Optional[str] = None,
@@ -67,6 +67,31 @@ class LLMClientInterface(abc.ABC):
         """Get a tool use response from the LLM."""
         pass
 
+    @abc.abstractmethod
+    async def stream_tool_use_response(
+        self,
+        system_prompt: str,
+        tools: List[Dict[str, Any]],
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        log_metadata: Optional[Dict[str, Any]] = None,
+        response_type: Optional[str] = "stream_tool_use_response",
+        check_credits: bool = True,
+        use_token_api_for_estimation: bool = True,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream a tool use response from the LLM as partial input events."""
+        pass
+
+    @abc.abstractmethod
+    async def generate_batch_responses(
+        self,
+        requests: List[Dict[str, Any]],
+        check_credits: bool = True,
+        use_token_api_for_estimation: bool = True,
+    ) -> Dict[str, Any]:
+        """Generate responses for several independent requests, keyed by their custom_id."""
+        pass
+
     @abc.abstractmethod
     async def process_specification(self, spec_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process the specification data using the LLM."""
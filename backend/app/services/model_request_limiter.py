@@ -0,0 +1,41 @@
+"""Concurrency limiting for AI model requests.
+
+This module provides a limiter that bounds the number of in-flight requests per
+model, so bursts of traffic queue locally instead of all hitting the provider's
+rate limits at once.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+
+class ModelRequestLimiter:
+    """Bound the number of concurrent requests sent to each model.
+
+    Requests beyond the limit wait for a free slot, which applies back-pressure to
+    callers and keeps retries and backoff from piling up at the provider.
+
+    Attributes:
+        max_concurrent_requests: Maximum number of in-flight requests per model.
+    """
+
+    def __init__(self, max_concurrent_requests: int) -> None:
+        """Initialize the limiter with the per-model concurrency limit."""
+        self.max_concurrent_requests = max_concurrent_requests
+        self._semaphores: Dict[Optional[str], asyncio.Semaphore] = {}
+
+    @asynccontextmanager
+    async def slot(self, model: Optional[str]) -> AsyncIterator[None]:
+        """Hold one of the model's request slots for the duration of the block.
+
+        Args:
+            model: The model the request is sent to, or None for the default model.
+        """
+        semaphore = self._semaphores.get(model)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+            self._semaphores[model] = semaphore
+
+        async with semaphore:
+            yield
@@ -7,7 +7,8 @@ using the OpenAI SDK for compatibility.
 import json
 import logging
 from typing import List, Dict, Any, Optional, AsyncGenerator
-from openai import OpenAI
+import orjson
+from openai import AsyncOpenAI
 
 from .base_llm_client import BaseLLMClient
 from .usage_tracker_interface import UsageTracker
@@ -57,7 +58,7 @@ class OpenRouterClient(BaseLLMClient):
         )
 
         try:
-            self.client = OpenAI(
+            self.client = AsyncOpenAI(
                 base_url="https://openrouter.ai/api/v1",
                 api_key=settings.openrouter.api_key,
             )
@@ -81,7 +82,7 @@ class OpenRouterClient(BaseLLMClient):
             "X-Title": self.title,
         }
 
-    def count_tokens(
+    async def count_tokens(
         self,
         messages: List[Dict[str, str]],
         system: Optional[str] = None,
@@ -119,7 +120,7 @@ class OpenRouterClient(BaseLLMClient):
                 request_body["tools"] = tools
 
             # Call the tokenizer endpoint
-            response = self.client.chat.completions.create(**request_body, stream=False)
+            response = await self.client.chat.completions.create(**request_body, stream=False)
 
             # Extract token info from the usage field
             if hasattr(response, "usage") and response.usage:
@@ -171,7 +172,7 @@ class OpenRouterClient(BaseLLMClient):
 
         # Add tokens for tools (rough estimate)
         if tools:
-            tools_json = json.dumps(tools)
+            tools_json = orjson.dumps(tools)
             estimated_tokens += len(tools_json) // 4
             # Add overhead for tool processing
             estimated_tokens += 200
@@ -246,7 +247,7 @@ class OpenRouterClient(BaseLLMClient):
             params["extra_headers"] = self._get_extra_headers()
 
             # Make the API call
-            response = self.client.chat.completions.create(**params)
+            response = await self.client.chat.completions.create(**params)
             result = ""
 
             # Extract text from response
@@ -454,7 +455,7 @@ class OpenRouterClient(BaseLLMClient):
             params["extra_headers"] = self._get_extra_headers()
 
             # Make the API call
-            response = self.client.chat.completions.create(**params)
+            response = await self.client.chat.completions.create(**params)
 
             result = {}
             # Check for a tool call in the response
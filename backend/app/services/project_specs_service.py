@@ -6,7 +6,7 @@ import logging
 from typing import Dict, List, Optional, Any, Union, Type
 from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from datetime import timezone
 
 from ..schemas.templates import UIDesign
@@ -64,10 +64,71 @@ from ..schemas.shared_schemas import (
 
 logger = logging.getLogger(__name__)
 
+# Specs loaded together with their project by get_project_with_specs, by name. Each spec
+# is stored in the collection named after it with a "_specs" suffix
+PROJECT_SPEC_MODELS: Dict[str, Type[ProjectSpec]] = {
+    "tech_stack": TechStackSpec,
+    "requirements": RequirementsSpec,
+    "features": FeaturesSpec,
+    "ui_design": UIDesignSpec,
+    "pages": PagesSpec,
+    "data_model": DataModelSpec,
+    "api": ApiSpec,
+    "test_cases": TestCasesSpec,
+}
+
 
 class ProjectSpecsService:
     """Service for managing project specs."""
 
+    @staticmethod
+    async def get_project_with_specs(
+        project_id: str, database: AsyncIOMotorDatabase
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the description of a project and its specs in a single database round trip.
+
+        The specs are joined to the project document with one aggregation instead of a
+        find_one per collection.
+
+        Returns:
+            A dict with the ``project`` document (its description only) and each spec of
+            PROJECT_SPEC_MODELS under its name, or None if the project does not exist.
+            Specs the project does not have, or that fail to validate, are None.
+        """
+        pipeline = [
+            {"$match": {"id": project_id}},
+            {"$limit": 1},
+            {"$project": {"_id": 0, "id": 1, "description": 1}},
+            *(
+                {
+                    "$lookup": {
+                        "from": f"{name}_specs",
+                        "localField": "id",
+                        "foreignField": "project_id",
+                        "as": name,
+                    }
+                }
+                for name in PROJECT_SPEC_MODELS
+            ),
+        ]
+        docs = await database.projects.aggregate(pipeline).to_list(length=1)
+        if not docs:
+            return None
+
+        project_doc = docs[0]
+        result = {"project": {"description": project_doc.get("description", "")}}
+        for name, spec_model in PROJECT_SPEC_MODELS.items():
+            spec_docs = project_doc.get(name)
+            result[name] = None
+            if not spec_docs:
+                continue
+            try:
+                result[name] = spec_model(**spec_docs[0])
+            except ValidationError as e:
+                logger.warning(f"Invalid {name} spec for project {project_id}: {e}")
+        return result
+
     @staticmethod
     async def get_timeline_spec(
         project_id: str, database: AsyncIOMotorDatabase
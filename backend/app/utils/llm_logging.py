@@ -5,11 +5,19 @@ This module provides functions for logging LLM responses to both file and databa
 for future retrieval and analysis.
 """
 
+import asyncio
+import atexit
+import functools
 import os
-import json
 import logging
+import queue
+import zlib
 from datetime import datetime
-from typing import Dict, Any, Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Any, Optional, Tuple
+
+import orjson
+
 from app.db.base import db
 from abc import ABC, abstractmethod
 
@@ -36,21 +44,49 @@ llm_logger.setLevel(logging.INFO)
 os.makedirs("logs/llm_responses", exist_ok=True)
 file_handler = logging.FileHandler("logs/llm_responses/llm_responses.log")
 file_handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
-llm_logger.addHandler(file_handler)
 
+# Responses are logged from request handlers on the event loop, so the file is written
+# from a background thread: the handler only puts the record on a queue.
+log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+llm_logger.addHandler(QueueHandler(log_queue))
+log_listener = QueueListener(log_queue, file_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+
+# Log entry fields stored uncompressed in the database so entries can still be queried
+_INDEXED_LOG_FIELDS = ("timestamp", "project_id", "type", "category")
+
+
+# Options for serializing log entries; metadata may contain dicts with non-string keys
+_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS
 
-# Custom encoder to handle non-serializable objects
-class CustomEncoder(json.JSONEncoder):
-    def default(self, obj):
-        # Handle any objects that need custom serialization
-        if hasattr(obj, "model_dump"):
-            # For Pydantic models
-            return obj.model_dump()
-        elif hasattr(obj, "__dict__"):
-            # For regular Python classes
-            return obj.__dict__
-        # Let the base class handle the rest or fail
-        return super().default(obj)
+
+def _json_default(obj: Any) -> Any:
+    """Convert objects orjson does not serialize natively into JSON-compatible values."""
+    if hasattr(obj, "model_dump"):
+        # For Pydantic models
+        return obj.model_dump()
+    elif hasattr(obj, "__dict__"):
+        # For regular Python classes
+        return obj.__dict__
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def decode_log_entry(document: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Restore the full log entry from a document stored in the llm_responses collection.
+
+    Args:
+        document: The stored document, with the entry compressed under ``entry_zlib``
+
+    Returns:
+        The log entry as it was written to the log file
+    """
+    if "entry_zlib" not in document:
+        # Written before entries were compressed
+        return document
+    return orjson.loads(zlib.decompress(document["entry_zlib"]))
 
 
 class DefaultLLMLogger(LLMLogger):
@@ -62,12 +98,45 @@ class DefaultLLMLogger(LLMLogger):
         category: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
     ) -> None:
-        """Log LLM response to both file and database."""
-        timestamp = datetime.now().isoformat()
+        """Log LLM response to both file and database.
+
+        Metadata often embeds whole features lists and data models, so serializing and
+        compressing the entry is done in a worker thread when called from the event loop.
+        The entry is stored once it is ready.
+        """
+        build_entry = functools.partial(
+            self._build_log_entry,
+            datetime.now().isoformat(),
+            response_type,
+            raw_response,
+            project_id,
+            category,
+            metadata,
+        )
 
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._store_log_entry(*build_entry())
+            return
+
+        loop.run_in_executor(None, build_entry).add_done_callback(self._store_built_log_entry)
+
+    def _build_log_entry(
+        self,
+        timestamp: str,
+        response_type: str,
+        raw_response: Any,
+        project_id: Optional[str],
+        category: Optional[str],
+        metadata: Optional[Dict[str, Any]],
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Serialize a log entry into a log file line and a compressed database document."""
         # Ensure raw_response is a string
         if not isinstance(raw_response, str):
-            raw_response = json.dumps(raw_response, cls=CustomEncoder)
+            raw_response = orjson.dumps(
+                raw_response, default=_json_default, option=_JSON_OPTIONS
+            ).decode()
 
         # Create the log entry
         log_entry = {
@@ -96,7 +165,9 @@ class DefaultLLMLogger(LLMLogger):
                 elif not isinstance(value, (str, int, float, bool, list, dict, type(None))):
                     try:
                         # Try to convert to dictionary if possible
-                        processed_metadata[key] = json.loads(json.dumps(value, cls=CustomEncoder))
+                        processed_metadata[key] = orjson.loads(
+                            orjson.dumps(value, default=_json_default, option=_JSON_OPTIONS)
+                        )
                     except:
                         # If conversion fails, store as string representation
                         processed_metadata[key] = str(value)
@@ -105,14 +176,32 @@ class DefaultLLMLogger(LLMLogger):
 
             log_entry["metadata"] = processed_metadata
 
+        entry = orjson.dumps(log_entry, default=_json_default, option=_JSON_OPTIONS)
+
+        # The database keeps the fields used for lookups and the full entry compressed,
+        # see decode_log_entry
+        document = {key: log_entry[key] for key in _INDEXED_LOG_FIELDS if key in log_entry}
+        document["entry_zlib"] = zlib.compress(entry)
+
+        return entry.decode(), document
+
+    def _store_built_log_entry(self, future: "asyncio.Future[Tuple[str, Dict[str, Any]]]") -> None:
+        """Store a log entry built in a worker thread."""
+        try:
+            self._store_log_entry(*future.result())
+        except Exception as e:
+            llm_logger.error(f"Error building LLM response log entry: {str(e)}")
+
+    def _store_log_entry(self, line: str, document: Dict[str, Any]) -> None:
+        """Write a serialized log entry to the log file and the database."""
         # Log to file
-        llm_logger.info(json.dumps(log_entry, cls=CustomEncoder))
+        llm_logger.info(line)
 
         # Log to database if available
         try:
             database = db.get_db()
             if database is not None:
                 # Store in a collection for LLM responses
-                database.llm_responses.insert_one(log_entry)
+                database.llm_responses.insert_one(document)
         except Exception as e:
             llm_logger.error(f"Error logging LLM response to database: {str(e)}")
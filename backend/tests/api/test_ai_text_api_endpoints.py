@@ -3,13 +3,9 @@ Tests for the API endpoints enhancement functionality.
 """
 
 import pytest
-from unittest.mock import patch, MagicMock
-from fastapi.testclient import TestClient
-from app.main import app
+from unittest.mock import AsyncMock
 from app.schemas.ai_text import ApiData, ApiEndpoint
 
-client = TestClient(app)
-
 # Mock data for testing
 MOCK_PROJECT_DESCRIPTION = "A task management application"
 MOCK_FEATURES = [
@@ -105,24 +101,13 @@ MOCK_API_ENDPOINTS = {
 
 
 @pytest.fixture
-def mock_get_current_user():
-    """Mock the get_current_user dependency."""
-    with patch("app.api.routes.ai_text.get_current_user") as mock:
-        mock.return_value = {"uid": "test-user-id", "email": "test@example.com"}
-        yield mock
-
-
-@pytest.fixture
-def mock_anthropic_client():
+def mock_ai_service(mock_ai_service):
     """Mock the AIService."""
-    with patch("app.api.routes.ai_text.AIService") as mock:
-        mock_instance = MagicMock()
-        mock_instance.get_tool_use_response.return_value = {"data": MOCK_API_ENDPOINTS}
-        mock.return_value = mock_instance
-        yield mock_instance
+    mock_ai_service.get_tool_use_response = AsyncMock(return_value={"data": MOCK_API_ENDPOINTS})
+    return mock_ai_service
 
 
-def test_enhance_api_endpoints_success(mock_get_current_user, mock_anthropic_client):
+def test_enhance_api_endpoints_success(client, mock_ai_service):
     """Test successful API endpoints enhancement."""
     # Prepare the request data
     request_data = {
@@ -141,7 +126,7 @@ def test_enhance_api_endpoints_success(mock_get_current_user, mock_anthropic_cli
     assert "endpoints" in response.json()["data"]
 
     # Verify that the AIService was called with the correct parameters
-    mock_anthropic_client.get_tool_use_response.assert_called_once()
+    mock_ai_service.get_tool_use_response.assert_called_once()
 
     # Verify the response data
     endpoints = response.json()["data"]["endpoints"]
@@ -154,9 +139,7 @@ def test_enhance_api_endpoints_success(mock_get_current_user, mock_anthropic_cli
     assert endpoints[0]["auth"] == MOCK_API_ENDPOINTS["endpoints"][0]["auth"]
 
 
-def test_enhance_api_endpoints_with_existing_endpoints(
-    mock_get_current_user, mock_anthropic_client
-):
+def test_enhance_api_endpoints_with_existing_endpoints(client, mock_ai_service):
     """Test API endpoints enhancement with existing endpoints."""
     # Prepare the request data with existing endpoints
     request_data = {
@@ -176,13 +159,13 @@ def test_enhance_api_endpoints_with_existing_endpoints(
     assert "endpoints" in response.json()["data"]
 
     # Verify that the AIService was called with the correct parameters
-    mock_anthropic_client.get_tool_use_response.assert_called_once()
+    mock_ai_service.get_tool_use_response.assert_called_once()
 
 
-def test_enhance_api_endpoints_error_handling(mock_get_current_user, mock_anthropic_client):
+def test_enhance_api_endpoints_error_handling(client, mock_ai_service):
     """Test error handling in API endpoints enhancement."""
     # Configure the mock to return an error
-    mock_anthropic_client.get_tool_use_response.return_value = {"error": "AI service error"}
+    mock_ai_service.get_tool_use_response.return_value = {"error": "AI service error"}
 
     # Prepare the request data
     request_data = {
@@ -198,4 +181,23 @@ def test_enhance_api_endpoints_error_handling(mock_get_current_user, mock_anthro
     # Verify the response
     assert response.status_code == 500
     assert "detail" in response.json()
-    assert "Failed to generate API endpoints" in response.json()["detail"]
+    assert "Failed to generate valid data" in response.json()["detail"]
+
+
+def test_enhance_api_endpoints_uses_async_ai_service(client, mock_ai_service):
+    """The route awaits the injected AIService with usage tracking metadata."""
+    request_data = {
+        "project_description": MOCK_PROJECT_DESCRIPTION,
+        "features": MOCK_FEATURES,
+        "data_models": MOCK_DATA_MODELS,
+        "requirements": MOCK_REQUIREMENTS,
+    }
+
+    response = client.post("/api/ai-text/enhance-api-endpoints", json=request_data)
+
+    assert response.status_code == 200
+    mock_ai_service.get_tool_use_response.assert_awaited_once()
+    _, kwargs = mock_ai_service.get_tool_use_response.call_args
+    assert kwargs["response_type"] == "enhance_api_endpoints"
+    assert kwargs["check_credits"] is True
+    assert kwargs["log_metadata"]["user_id"] == "test-user"
@@ -0,0 +1,130 @@
+"""
+Tests for the batch enhancement endpoint.
+"""
+
+from unittest.mock import AsyncMock
+
+from app.services.ai_service import InsufficientCreditsError
+
+MOCK_FEATURES = {
+    "coreModules": [
+        {
+            "name": "Workout logging",
+            "description": "Log workouts",
+            "enabled": True,
+            "optional": False,
+            "features": [],
+        }
+    ]
+}
+
+BODY = {
+    "items": [
+        {"type": "description", "request": {"user_description": "An app for my workouts"}},
+        {
+            "type": "features",
+            "request": {
+                "project_description": "An app for tracking my workouts",
+                "business_goals": ["Grow engagement"],
+                "requirements": ["Users can log workouts"],
+            },
+        },
+        {"type": "description", "request": {"user_description": "A recipe sharing site"}},
+    ]
+}
+
+
+def test_enhance_batch_sends_one_batch(client, mock_ai_service):
+    """All items go out in one batch and come back in request order with their errors."""
+    mock_ai_service.generate_batch_responses = AsyncMock(
+        return_value={
+            "0": "A workout tracking app",
+            "1": {"data": MOCK_FEATURES},
+            "2": InsufficientCreditsError("Insufficient credits. You have 0 credits remaining."),
+        }
+    )
+
+    response = client.post("/api/ai-text/batch", json=BODY)
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0] == {
+        "type": "description",
+        "result": {"enhanced_description": "A workout tracking app"},
+        "error": None,
+    }
+    assert results[1]["result"]["data"]["coreModules"][0]["name"] == "Workout logging"
+    assert results[2] == {
+        "type": "description",
+        "result": None,
+        "error": "Insufficient credits. You have 0 credits remaining.",
+    }
+
+    mock_ai_service.generate_batch_responses.assert_awaited_once()
+    requests = mock_ai_service.generate_batch_responses.call_args.args[0]
+    assert [request["custom_id"] for request in requests] == ["0", "1", "2"]
+    assert [request["response_type"] for request in requests] == [
+        "enhance_description",
+        "enhance_features",
+        "enhance_description",
+    ]
+    assert requests[1]["tools"][0]["name"] == "print_features"
+    assert requests[0]["messages"] == [
+        {"role": "user", "content": "Original description: An app for my workouts"}
+    ]
+
+
+def test_enhance_batch_rejects_unknown_type(client, mock_ai_service):
+    """Items must name one of the supported enhance endpoints."""
+    response = client.post("/api/ai-text/batch", json={"items": [{"type": "pages", "request": {}}]})
+
+    assert response.status_code == 422
+
+
+def test_enhance_batch_rejects_invalid_items_before_sending(client, mock_ai_service):
+    """Items the enhance endpoints would reject are reported and left out of the batch."""
+    mock_ai_service.generate_batch_responses = AsyncMock(
+        return_value={"1": "A workout tracking app"}
+    )
+
+    response = client.post(
+        "/api/ai-text/batch",
+        json={
+            "items": [
+                {"type": "description", "request": {"user_description": "ab"}},
+                {"type": "description", "request": {"user_description": "An app for my workouts"}},
+                {
+                    "type": "features",
+                    "request": {
+                        "project_description": " ",
+                        "business_goals": [],
+                        "requirements": [],
+                    },
+                },
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["error"] == "Description too short to enhance"
+    assert results[1]["result"] == {"enhanced_description": "A workout tracking app"}
+    assert results[2]["error"] == (
+        "A project description, business goals or requirements are needed to enhance features"
+    )
+    requests = mock_ai_service.generate_batch_responses.call_args.args[0]
+    assert [request["custom_id"] for request in requests] == ["1"]
+
+
+def test_enhance_batch_without_valid_items_makes_no_ai_call(client, mock_ai_service):
+    """A batch of only rejected items is answered without calling the AI."""
+    mock_ai_service.generate_batch_responses = AsyncMock()
+
+    response = client.post(
+        "/api/ai-text/batch",
+        json={"items": [{"type": "description", "request": {"user_description": "ab"}}]},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["error"] == "Description too short to enhance"
+    mock_ai_service.generate_batch_responses.assert_not_called()
@@ -0,0 +1,138 @@
+"""
+Tests for the design bundle endpoint.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+from app.schemas.ai_text import TechStackRecommendation
+from app.services.ai_service import InsufficientCreditsError
+
+MOCK_TECH_STACK = TechStackRecommendation(
+    frontend={"framework": "React"},
+    backend={"framework": "FastAPI"},
+    overallJustification="Popular and well supported",
+).model_dump()
+MOCK_UI_DESIGN = {
+    "colors": {"primary": "#2563eb"},
+    "typography": {"fontFamily": "Inter"},
+    "spacing": {"unit": "4px"},
+    "borderRadius": {"small": "2px"},
+    "shadows": {"small": "0 1px 2px rgba(0,0,0,0.05)"},
+    "layout": {"maxWidth": "1280px"},
+    "components": {"buttonStyle": "rounded"},
+    "darkMode": {"enabled": True},
+    "animations": {"durations": {"short": "150ms"}},
+}
+
+MOCK_RESPONSES = {
+    "print_tech_stack": {"data": MOCK_TECH_STACK},
+    "print_ui_design": {"data": MOCK_UI_DESIGN},
+}
+
+BODY = {
+    "project_description": "An app for tracking my workouts",
+    "features": [{"name": "Workout logging"}],
+    "requirements": ["Users can log workouts"],
+}
+
+
+def test_enhance_design_bundle_runs_sections_concurrently(client, mock_ai_service):
+    """Both sections are requested before either of them completes."""
+    started = []
+    all_started = asyncio.Event()
+
+    async def get_tool_use_response(system_message, tools, messages, **kwargs):
+        started.append(tools[0]["name"])
+        if len(started) == len(MOCK_RESPONSES):
+            all_started.set()
+        await asyncio.wait_for(all_started.wait(), timeout=1)
+        return MOCK_RESPONSES[tools[0]["name"]]
+
+    mock_ai_service.get_tool_use_response = AsyncMock(side_effect=get_tool_use_response)
+
+    response = client.post("/api/ai-text/enhance-design-bundle", json=BODY)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "tech_stack": MOCK_TECH_STACK,
+        "ui_design": MOCK_UI_DESIGN,
+        "errors": {},
+    }
+    assert sorted(started) == sorted(MOCK_RESPONSES)
+
+
+def test_enhance_design_bundle_partial_failure(client, mock_ai_service):
+    """A failing section is reported in errors while the other is returned."""
+
+    async def get_tool_use_response(system_message, tools, messages, **kwargs):
+        if tools[0]["name"] == "print_ui_design":
+            raise RuntimeError("upstream timeout")
+        return MOCK_RESPONSES[tools[0]["name"]]
+
+    mock_ai_service.get_tool_use_response = AsyncMock(side_effect=get_tool_use_response)
+
+    response = client.post("/api/ai-text/enhance-design-bundle", json=BODY)
+
+    assert response.status_code == 200
+    assert response.json()["ui_design"] is None
+    assert response.json()["errors"] == {"ui_design": "upstream timeout"}
+    assert response.json()["tech_stack"] == MOCK_TECH_STACK
+
+
+def test_enhance_design_bundle_keeps_sections_when_credits_run_out(client, mock_ai_service):
+    """A section generated before the credits ran out is returned, not discarded."""
+
+    async def get_tool_use_response(system_message, tools, messages, **kwargs):
+        if tools[0]["name"] == "print_tech_stack":
+            raise InsufficientCreditsError("Insufficient credits. You have 0 credits remaining.")
+        return MOCK_RESPONSES[tools[0]["name"]]
+
+    mock_ai_service.get_tool_use_response = AsyncMock(side_effect=get_tool_use_response)
+
+    response = client.post("/api/ai-text/enhance-design-bundle", json=BODY)
+
+    assert response.status_code == 200
+    assert response.json()["ui_design"] == MOCK_UI_DESIGN
+    assert response.json()["errors"] == {
+        "tech_stack": "Insufficient credits. You have 0 credits remaining."
+    }
+
+
+def test_enhance_design_bundle_retries_after_partial_failure(client, mock_ai_service):
+    """A response with a failed section is not cached, so a retry calls the AI again."""
+    out_of_credits = True
+
+    async def get_tool_use_response(system_message, tools, messages, **kwargs):
+        if tools[0]["name"] == "print_tech_stack" and out_of_credits:
+            raise InsufficientCreditsError("Insufficient credits. You have 0 credits remaining.")
+        return MOCK_RESPONSES[tools[0]["name"]]
+
+    mock_ai_service.get_tool_use_response = AsyncMock(side_effect=get_tool_use_response)
+
+    first = client.post("/api/ai-text/enhance-design-bundle", json=BODY)
+    out_of_credits = False
+    # Differs only in normalized text, so it would share a cached entry with the first call
+    second = client.post(
+        "/api/ai-text/enhance-design-bundle",
+        json={**BODY, "project_description": "an app for tracking my workouts."},
+    )
+
+    assert first.json()["errors"] == {
+        "tech_stack": "Insufficient credits. You have 0 credits remaining."
+    }
+    assert second.status_code == 200
+    assert second.json()["tech_stack"] == MOCK_TECH_STACK
+    assert second.json()["errors"] == {}
+    assert mock_ai_service.get_tool_use_response.await_count == 4
+
+
+def test_enhance_design_bundle_insufficient_credits(client, mock_ai_service):
+    """Credit errors fail the whole request with 402 when no section succeeded."""
+    mock_ai_service.get_tool_use_response = AsyncMock(
+        side_effect=InsufficientCreditsError("Insufficient credits. You have 0 credits remaining.")
+    )
+
+    response = client.post("/api/ai-text/enhance-design-bundle", json=BODY)
+
+    assert response.status_code == 402
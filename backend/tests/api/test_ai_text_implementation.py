@@ -0,0 +1,248 @@
+"""
+Tests for the implementation prompt generation endpoint.
+"""
+
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.ai.prompts.implementation_prompts import prepare_implementation_prompt
+from app.api.routes.ai_text_implementation import (
+    _serialize_spec_data,
+    extract_prompts_from_response,
+)
+from app.schemas.project_specs import FeaturesSpec, MetadataSpec, RequirementsSpec
+
+SPEC_METHODS = [
+    "get_tech_stack_spec",
+    "get_requirements_spec",
+    "get_features_spec",
+    "get_ui_design_spec",
+    "get_pages_spec",
+    "get_data_model_spec",
+    "get_api_spec",
+    "get_test_cases_spec",
+]
+
+
+@pytest.fixture
+def mock_ai_service(mock_ai_service):
+    """Mock the AIService injected into the implementation prompt route."""
+    mock_ai_service.generate_response = AsyncMock(return_value="<MAIN>Set up the project</MAIN>")
+    return mock_ai_service
+
+
+@pytest.fixture
+def mock_database():
+    """Mock the database and the project spec lookups."""
+    database = MagicMock()
+    database.projects.find_one = AsyncMock(return_value={"description": "A todo app"})
+    # The single-aggregation lookup fails, so the specs are loaded one by one
+    database.projects.aggregate.return_value.to_list = AsyncMock(
+        side_effect=RuntimeError("$lookup not supported")
+    )
+    specs = {name: AsyncMock(return_value=None) for name in SPEC_METHODS}
+    specs["get_features_spec"].return_value = FeaturesSpec(
+        project_id="project-1", data={"core_modules": [{"name": "Tasks"}]}
+    )
+
+    with (
+        patch("app.api.routes.ai_text_implementation.db.get_db", return_value=database),
+        patch.multiple("app.api.routes.ai_text_implementation.ProjectSpecsService", **specs),
+    ):
+        yield specs | {"database": database}
+
+
+def test_failed_spec_lookup_is_left_out(client, mock_ai_service, mock_database):
+    """A spec that fails to load does not fail the request."""
+    mock_database["get_api_spec"].side_effect = RuntimeError("connection reset")
+
+    response = client.post(
+        "/api/ai-text/generate-implementation-prompt",
+        json={"category": "01_project_setup", "project_id": "project-1"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["prompts"] == [{"type": "main", "content": "Set up the project"}]
+    for name in SPEC_METHODS:
+        mock_database[name].assert_awaited_once()
+
+    content = mock_ai_service.generate_response.call_args.kwargs["messages"][0]["content"]
+    assert "A todo app" in content[0]["text"]
+
+
+def test_specs_are_sent_as_a_cached_prefix(client, mock_ai_service, mock_database):
+    """The filled-in template is a cacheable block ahead of the user's instruction."""
+    for instruction in ["Use Poetry", "Use uv"]:
+        response = client.post(
+            "/api/ai-text/generate-implementation-prompt",
+            json={
+                "category": "01_project_setup",
+                "project_id": "project-1",
+                "additional_user_instruction": instruction,
+            },
+        )
+        assert response.status_code == 200
+
+    first, second = (
+        call.kwargs["messages"][0]["content"]
+        for call in mock_ai_service.generate_response.call_args_list
+    )
+    assert first[0] == second[0]
+    assert first[0]["cache_control"] == {"type": "ephemeral"}
+    assert "A todo app" in first[0]["text"]
+    assert "Use Poetry" not in first[0]["text"]
+    assert "Use Poetry" in first[1]["text"]
+    assert "Use uv" in second[1]["text"]
+
+
+def test_serialized_spec_data_is_reused_per_revision():
+    """A spec revision is serialized once; a new revision is serialized again."""
+    spec = FeaturesSpec(project_id="project-1", data={"core_modules": [{"name": "Tasks"}]})
+
+    first = _serialize_spec_data(spec)
+    assert _serialize_spec_data(spec) is first
+
+    spec.data = {"core_modules": [{"name": "Notes"}]}
+    spec.version += 1
+    assert "Notes" in _serialize_spec_data(spec)
+    assert _serialize_spec_data(None) == ""
+
+
+def test_serialized_spec_data_handles_dict_specs():
+    """Dict-based spec data is serialized as plain JSON."""
+    spec = MetadataSpec(project_id="project-1", data={"owner": "team-a", "tags": ["web"]})
+
+    assert json.loads(_serialize_spec_data(spec)) == {"owner": "team-a", "tags": ["web"]}
+
+
+def test_project_without_specs_is_rejected(client, mock_ai_service, mock_database):
+    """Prompts are not generated for a project without a description or specs."""
+    mock_database["get_features_spec"].return_value = None
+    mock_database["database"].projects.find_one.return_value = {"description": ""}
+
+    response = client.post(
+        "/api/ai-text/generate-implementation-prompt",
+        json={"category": "01_project_setup", "project_id": "project-1"},
+    )
+
+    assert response.status_code == 400
+    mock_ai_service.generate_response.assert_not_called()
+
+
+def test_missing_project_is_rejected(client, mock_ai_service, mock_database):
+    """Prompts are not generated for a project that does not exist."""
+    mock_database["database"].projects.aggregate.return_value.to_list = AsyncMock(return_value=[])
+
+    response = client.post(
+        "/api/ai-text/generate-implementation-prompt",
+        json={"category": "01_project_setup", "project_id": "project-1"},
+    )
+
+    assert response.status_code == 404
+    for name in SPEC_METHODS:
+        mock_database[name].assert_not_called()
+    mock_ai_service.generate_response.assert_not_called()
+
+
+def test_oversized_prompt_is_rejected(client, mock_ai_service, mock_database):
+    """Prompts too large for the model are rejected without calling the AI."""
+    mock_database["get_requirements_spec"].return_value = RequirementsSpec(
+        project_id="project-1", non_functional=["Pages load quickly. " * 50_000]
+    )
+
+    response = client.post(
+        "/api/ai-text/generate-implementation-prompt",
+        json={"category": "01_project_setup", "project_id": "project-1"},
+    )
+
+    assert response.status_code == 413
+    mock_ai_service.generate_response.assert_not_called()
+
+
+def test_extract_prompts_from_response():
+    """Tagged prompts are extracted in any order; untagged text becomes the main prompt."""
+    text = "<FOLLOWUP2> Finish </FOLLOWUP2>\n<MAIN>\nSet up\n</MAIN><FOLLOWUP1>Continue</FOLLOWUP1>"
+
+    assert extract_prompts_from_response(text) == {
+        "main": "Set up",
+        "followup_1": "Continue",
+        "followup_2": "Finish",
+    }
+    assert extract_prompts_from_response(" Just do it ") == {"main": "Just do it"}
+    assert extract_prompts_from_response("<MAIN>Unclosed") == {"main": "<MAIN>Unclosed"}
+
+
+def test_project_and_specs_loaded_in_one_aggregation(client, mock_ai_service, mock_database):
+    """Specs joined to the project by the aggregation are not looked up one by one."""
+    aggregated_project = [
+        {
+            "description": "A notes app",
+            "features": [
+                {
+                    "project_id": "project-1",
+                    "data": {"coreModules": [{"name": "Notes", "description": "Write notes"}]},
+                }
+            ],
+            "api": [{"project_id": "project-1", "data": "not an API spec"}],
+        }
+    ]
+    mock_database["database"].projects.aggregate.return_value.to_list = AsyncMock(
+        return_value=aggregated_project
+    )
+
+    response = client.post(
+        "/api/ai-text/generate-implementation-prompt",
+        json={"category": "05_feature_implementation", "project_id": "project-1"},
+    )
+
+    assert response.status_code == 200
+    for name in SPEC_METHODS:
+        mock_database[name].assert_not_called()
+    log_metadata = mock_ai_service.generate_response.call_args.kwargs["log_metadata"]
+    assert log_metadata["project_description"] == "A notes app"
+    assert "Write notes" in log_metadata["features"]
+    assert log_metadata["api_endpoints"] == ""
+
+
+def test_streamed_prompts_sent_as_they_complete(client, mock_ai_service, mock_database):
+    """With stream=true, each prompt is sent once its closing tag has been generated."""
+
+    async def chunks():
+        for chunk in ["<MAIN>Set ", "up</MA", "IN>\n<FOLLOWUP1>Con", "tinue</FOLLOWUP1>"]:
+            yield chunk
+
+    mock_ai_service.stream_response = MagicMock(return_value=chunks())
+
+    response = client.post(
+        "/api/ai-text/generate-implementation-prompt?stream=true",
+        json={"category": "01_project_setup", "project_id": "project-1"},
+    )
+
+    events = [json.loads(event[len("data: ") :]) for event in response.text.split("\n\n") if event]
+    assert [event for event in events if "chunk" not in event] == [
+        {"prompt": {"type": "main", "content": "Set up"}},
+        {"prompt": {"type": "followup_1", "content": "Continue"}},
+        {
+            "done": True,
+            "prompts": [
+                {"type": "main", "content": "Set up"},
+                {"type": "followup_1", "content": "Continue"},
+            ],
+        },
+    ]
+    # The main prompt is sent right after the chunk that completes it
+    assert events.index({"prompt": {"type": "main", "content": "Set up"}}) == 3
+    mock_ai_service.generate_response.assert_not_called()
+
+
+def test_prepare_implementation_prompt_fills_placeholders_once():
+    """Placeholders in filled-in values are kept as text; unknown categories yield None."""
+    prompt = prepare_implementation_prompt(
+        "01_project_setup", project_description="Uses {tech_stack} literally", tech_stack="React"
+    )
+
+    assert "Uses {tech_stack} literally" in prompt
+    assert "React" in prompt
+    assert "{project_description}" not in prompt
+    assert prepare_implementation_prompt("99_unknown") is None
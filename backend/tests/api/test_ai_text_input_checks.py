@@ -0,0 +1,28 @@
+"""
+Tests for enhance requests rejected before any AI call is made.
+"""
+
+import pytest
+
+
+@pytest.mark.parametrize("description", ["", "   ", "todo app"])
+def test_short_description_is_rejected(client, mock_ai_service, description):
+    """Descriptions too short to enhance are rejected without calling the AI."""
+    response = client.post(
+        "/api/ai-text/enhance-description", json={"user_description": description}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Description too short to enhance"
+    mock_ai_service.generate_response.assert_not_called()
+
+
+def test_features_without_project_information_are_rejected(client, mock_ai_service):
+    """Features are not enhanced without a description, goals or requirements."""
+    response = client.post(
+        "/api/ai-text/enhance-features",
+        json={"project_description": " ", "business_goals": [], "requirements": []},
+    )
+
+    assert response.status_code == 400
+    mock_ai_service.get_tool_use_response.assert_not_called()
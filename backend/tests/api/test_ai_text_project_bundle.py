@@ -0,0 +1,69 @@
+"""
+Tests for the project bundle enhancement endpoint.
+"""
+
+import pytest
+from unittest.mock import AsyncMock
+
+from app.services.ai_service import InsufficientCreditsError
+
+MOCK_BUNDLE = {
+    "enhanced_description": "A workout tracking application with exercise logging.",
+    "enhanced_goals": ["Reach 10,000 monthly active users within six months"],
+    "enhanced_target_users": "Fitness enthusiasts who want to track their progress.",
+    "enhanced_requirements": ["[Functional] The system shall allow users to log workouts."],
+}
+
+
+@pytest.fixture
+def mock_ai_service(mock_ai_service):
+    """Mock the AIService injected into the project bundle route."""
+    mock_ai_service.get_tool_use_response = AsyncMock(return_value={"data": MOCK_BUNDLE})
+    return mock_ai_service
+
+
+def test_enhance_project_bundle_single_call(client, mock_ai_service):
+    """All four sections are produced by a single tool use call."""
+    response = client.post(
+        "/api/ai-text/enhance-project-bundle",
+        json={
+            "project_description": "An app for tracking my workouts",
+            "user_goals": ["Get users"],
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json() == MOCK_BUNDLE
+    mock_ai_service.get_tool_use_response.assert_awaited_once()
+
+    args, _ = mock_ai_service.get_tool_use_response.call_args
+    system_message, tools, messages = args
+    assert tools[0]["name"] == "print_project_bundle"
+    assert "Original business goals:\n- Get users" in messages[0]["content"]
+    assert "Original target users: None provided" in messages[0]["content"]
+    assert "Create a clear description of the target users" in system_message
+
+
+def test_enhance_project_bundle_insufficient_credits(client, mock_ai_service):
+    """Credit errors from the tool use call surface as 402."""
+    mock_ai_service.get_tool_use_response.side_effect = InsufficientCreditsError(
+        "Insufficient credits. You have 0 credits remaining."
+    )
+
+    response = client.post(
+        "/api/ai-text/enhance-project-bundle",
+        json={"project_description": "An app for tracking my workouts"},
+    )
+
+    assert response.status_code == 402
+
+
+def test_enhance_project_bundle_cached(client, mock_ai_service):
+    """Identical requests are served from the response cache."""
+    body = {"project_description": "An app for tracking my workouts"}
+
+    first = client.post("/api/ai-text/enhance-project-bundle", json=body)
+    second = client.post("/api/ai-text/enhance-project-bundle", json=body)
+
+    assert first.json() == second.json() == MOCK_BUNDLE
+    mock_ai_service.get_tool_use_response.assert_awaited_once()
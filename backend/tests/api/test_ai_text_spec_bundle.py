@@ -0,0 +1,132 @@
+"""
+Tests for the spec bundle endpoint.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+from app.services.ai_service import InsufficientCreditsError
+
+MOCK_DATA_MODEL = {"entities": [], "relationships": []}
+MOCK_API_DATA = {
+    "endpoints": [
+        {
+            "path": "/api/workouts",
+            "description": "List workouts",
+            "methods": ["GET"],
+            "auth": True,
+            "roles": None,
+        }
+    ]
+}
+MOCK_TEST_CASES = {"testCases": []}
+
+MOCK_RESPONSES = {
+    "print_data_model": {"data": MOCK_DATA_MODEL},
+    "print_api_endpoints": {"data": MOCK_API_DATA},
+    "print_test_cases": {"data": MOCK_TEST_CASES},
+}
+
+BODY = {
+    "project_description": "An app for tracking my workouts",
+    "features": [{"name": "Workout logging"}],
+    "requirements": ["Users can log workouts"],
+}
+
+
+def test_enhance_spec_bundle_runs_sections_concurrently(client, mock_ai_service):
+    """All three sections are requested before any of them completes."""
+    started = []
+    all_started = asyncio.Event()
+
+    async def get_tool_use_response(system_message, tools, messages, **kwargs):
+        started.append(tools[0]["name"])
+        if len(started) == len(MOCK_RESPONSES):
+            all_started.set()
+        await asyncio.wait_for(all_started.wait(), timeout=1)
+        return MOCK_RESPONSES[tools[0]["name"]]
+
+    mock_ai_service.get_tool_use_response = AsyncMock(side_effect=get_tool_use_response)
+
+    response = client.post("/api/ai-text/enhance-spec-bundle", json=BODY)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "data_model": MOCK_DATA_MODEL,
+        "api_endpoints": MOCK_API_DATA,
+        "test_cases": MOCK_TEST_CASES,
+        "errors": {},
+    }
+    assert sorted(started) == sorted(MOCK_RESPONSES)
+
+
+def test_enhance_spec_bundle_partial_failure(client, mock_ai_service):
+    """A failing section is reported in errors while the others are returned."""
+
+    async def get_tool_use_response(system_message, tools, messages, **kwargs):
+        if tools[0]["name"] == "print_test_cases":
+            raise RuntimeError("upstream timeout")
+        return MOCK_RESPONSES[tools[0]["name"]]
+
+    mock_ai_service.get_tool_use_response = AsyncMock(side_effect=get_tool_use_response)
+
+    response = client.post("/api/ai-text/enhance-spec-bundle", json=BODY)
+
+    assert response.status_code == 200
+    assert response.json()["test_cases"] is None
+    assert response.json()["errors"] == {"test_cases": "upstream timeout"}
+    assert response.json()["data_model"] == MOCK_DATA_MODEL
+
+
+def test_enhance_spec_bundle_keeps_sections_when_credits_run_out(client, mock_ai_service):
+    """Sections generated before the credits ran out are returned, not discarded."""
+
+    async def get_tool_use_response(system_message, tools, messages, **kwargs):
+        if tools[0]["name"] == "print_test_cases":
+            raise InsufficientCreditsError("Insufficient credits. You have 0 credits remaining.")
+        return MOCK_RESPONSES[tools[0]["name"]]
+
+    mock_ai_service.get_tool_use_response = AsyncMock(side_effect=get_tool_use_response)
+
+    response = client.post("/api/ai-text/enhance-spec-bundle", json=BODY)
+
+    assert response.status_code == 200
+    assert response.json()["data_model"] == MOCK_DATA_MODEL
+    assert response.json()["errors"] == {
+        "test_cases": "Insufficient credits. You have 0 credits remaining."
+    }
+
+
+def test_enhance_spec_bundle_retries_after_partial_failure(client, mock_ai_service):
+    """A response with failed sections is not cached, so a retry calls the AI again."""
+    out_of_credits = True
+
+    async def get_tool_use_response(system_message, tools, messages, **kwargs):
+        if tools[0]["name"] == "print_test_cases" and out_of_credits:
+            raise InsufficientCreditsError("Insufficient credits. You have 0 credits remaining.")
+        return MOCK_RESPONSES[tools[0]["name"]]
+
+    mock_ai_service.get_tool_use_response = AsyncMock(side_effect=get_tool_use_response)
+
+    first = client.post("/api/ai-text/enhance-spec-bundle", json=BODY)
+    out_of_credits = False
+    second = client.post("/api/ai-text/enhance-spec-bundle", json=BODY)
+
+    assert first.json()["errors"] == {
+        "test_cases": "Insufficient credits. You have 0 credits remaining."
+    }
+    assert second.status_code == 200
+    assert second.json()["test_cases"] == MOCK_TEST_CASES
+    assert second.json()["errors"] == {}
+    assert mock_ai_service.get_tool_use_response.await_count == 6
+
+
+def test_enhance_spec_bundle_insufficient_credits(client, mock_ai_service):
+    """Credit errors fail the whole request with 402 when no section succeeded."""
+    mock_ai_service.get_tool_use_response = AsyncMock(
+        side_effect=InsufficientCreditsError("Insufficient credits. You have 0 credits remaining.")
+    )
+
+    response = client.post("/api/ai-text/enhance-spec-bundle", json=BODY)
+
+    assert response.status_code == 402
@@ -0,0 +1,100 @@
+"""Tests for caching and deduplication of enhance responses."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+from app.api.routes.ai_text_utils import cache_enhance_response
+from app.schemas.ai_text import DescriptionEnhanceRequest, DescriptionEnhanceResponse
+
+USER = {"firebase_uid": "test-user"}
+
+
+def _counting_endpoint():
+    calls = []
+
+    @cache_enhance_response
+    async def enhance_description(request, current_user):
+        calls.append(request)
+        await asyncio.sleep(0.01)
+        return DescriptionEnhanceResponse(enhanced_description=request.user_description.upper())
+
+    return enhance_description, calls
+
+
+async def test_concurrent_identical_requests_share_one_call():
+    """Identical requests in flight at the same time are served by a single call."""
+    endpoint, calls = _counting_endpoint()
+    request = DescriptionEnhanceRequest(user_description="a workout tracker")
+
+    results = await asyncio.gather(
+        *(endpoint(request=request, current_user=USER) for _ in range(3))
+    )
+
+    assert len(calls) == 1
+    assert {r.enhanced_description for r in results} == {"A WORKOUT TRACKER"}
+
+
+async def test_requests_are_scoped_per_user():
+    """The same body from different users is not shared."""
+    endpoint, calls = _counting_endpoint()
+    request = DescriptionEnhanceRequest(user_description="a workout tracker")
+
+    await endpoint(request=request, current_user=USER)
+    await endpoint(request=request, current_user={"firebase_uid": "other-user"})
+    await endpoint(request=request, current_user=USER)
+
+    assert len(calls) == 2
+
+
+async def test_normalized_fields_ignore_case_spacing_and_punctuation():
+    """Near-identical text in normalized fields shares an entry; other changes do not."""
+    calls = []
+
+    @cache_enhance_response(normalized_fields=["user_description"])
+    async def enhance_description(request, current_user):
+        calls.append(request)
+        return DescriptionEnhanceResponse(enhanced_description="A workout tracker.")
+
+    for description in ["A workout tracker.", "a  workout tracker", "A workout tracker!"]:
+        await enhance_description(
+            request=DescriptionEnhanceRequest(user_description=description), current_user=USER
+        )
+    assert len(calls) == 1
+
+    await enhance_description(
+        request=DescriptionEnhanceRequest(user_description="A running tracker"), current_user=USER
+    )
+    assert len(calls) == 2
+
+
+def test_generate_test_cases_repeats_are_served_from_cache(client, mock_ai_service):
+    """Re-submitting the same test case generation does not call the AI again."""
+    mock_ai_service.get_tool_use_response = AsyncMock(return_value={"data": {"testCases": []}})
+    body = {
+        "project_description": "A task tracker",
+        "requirements": ["Users can log in"],
+        "features": [{"name": "Login"}],
+    }
+
+    first = client.post("/api/ai-text/generate-test-cases", json=body)
+    second = client.post(
+        "/api/ai-text/generate-test-cases", json={**body, "requirements": ["users can log in."]}
+    )
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert mock_ai_service.get_tool_use_response.await_count == 1
+
+
+def test_enhance_test_cases_ignores_fields_left_out_of_the_prompt(client, mock_ai_service):
+    """Requests that differ only in the unused project description share an entry."""
+    mock_ai_service.get_tool_use_response = AsyncMock(return_value={"data": {"testCases": []}})
+    body = {"requirements": ["Users can log in"], "features": [{"name": "Login"}]}
+
+    for description in ["A task tracker", "A to-do list for teams"]:
+        response = client.post(
+            "/api/ai-text/enhance-test-cases", json={**body, "project_description": description}
+        )
+        assert response.status_code == 200
+
+    assert mock_ai_service.get_tool_use_response.await_count == 1
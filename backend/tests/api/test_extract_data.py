@@ -3,6 +3,7 @@
 import json
 import logging
 import pytest
+from unittest.mock import patch
 from fastapi import HTTPException
 from pydantic import BaseModel, Field
 from typing import List, Optional
@@ -54,6 +55,25 @@ class TestExtractDataFromResponse:
         assert result.name == "test"
         assert result.value == 123
 
+    def test_extract_ignores_trailing_braces(self, test_logger):
+        """Test extraction when prose after the JSON object contains braces."""
+        response = {
+            "content": 'Result: {"name": "test", "value": 123} and a note about {placeholders}.'
+        }
+        result = extract_data_from_response(response, SimpleTestModel, test_logger)
+        assert result.name == "test"
+        assert result.value == 123
+
+    def test_invalid_data_field_skips_whole_response(self, test_logger):
+        """Test that an invalid 'data' field is not re-validated as the whole response."""
+        response = {"data": {"name": "test"}, "content": '{"name": "test", "value": 123}'}
+        with patch.object(
+            SimpleTestModel, "model_validate", wraps=SimpleTestModel.model_validate
+        ) as model_validate:
+            result = extract_data_from_response(response, SimpleTestModel, test_logger)
+        assert result.value == 123
+        assert model_validate.call_count == 2
+
     def test_extract_with_test_cases_data(self, test_logger):
         """Test extraction with the TestCasesData schema."""
         # Create a valid TestCasesData structure
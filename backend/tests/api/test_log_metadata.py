@@ -0,0 +1,26 @@
+"""Tests for the logging metadata of AI text requests."""
+
+from app.api.routes.ai_text_utils import build_log_metadata
+from app.schemas.ai_text import DescriptionEnhanceRequest
+
+
+def test_attributes_request_to_user_and_project():
+    """The user and project IDs come first, followed by the given fields."""
+    request = DescriptionEnhanceRequest(project_id="project-1", user_description="A todo app")
+
+    metadata = build_log_metadata(
+        request, {"firebase_uid": "test-user"}, original_description=request.user_description
+    )
+
+    assert metadata == {
+        "user_id": "test-user",
+        "project_id": "project-1",
+        "original_description": "A todo app",
+    }
+
+
+def test_defaults_without_project_or_user():
+    """Requests without a project ID are logged as unknown, and anonymous ones without a user."""
+    request = DescriptionEnhanceRequest(user_description="A todo app")
+
+    assert build_log_metadata(request, None) == {"user_id": None, "project_id": "unknown"}
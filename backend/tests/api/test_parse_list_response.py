@@ -0,0 +1,51 @@
+"""Tests for list parsing and formatting of AI text prompts and responses."""
+
+from app.api.routes.ai_text_utils import format_bullet_list, parse_list_response
+
+
+def test_returns_bulleted_and_numbered_items():
+    """Bullet and number markers are stripped and intro text is skipped."""
+    text = "Here are the goals:\n\n- Grow revenue\n• Reduce churn\n* Ship faster\n2. Hire well\n"
+    assert parse_list_response(text) == ["Grow revenue", "Reduce churn", "Ship faster", "Hire well"]
+
+
+def test_falls_back_to_last_paragraph():
+    """Without list markers, the lines of the last paragraph are used."""
+    text = "Sure, here you go.\n\nGrow revenue\nReduce churn\n\n"
+    assert parse_list_response(text) == ["Grow revenue", "Reduce churn"]
+
+
+def test_keep_plain_lines():
+    """All non-empty lines are kept, with markers stripped where present."""
+    text = "[Functional] Users can log in\n- [Non-Functional] Pages load quickly\n\n"
+    assert parse_list_response(text, keep_plain_lines=True) == [
+        "[Functional] Users can log in",
+        "[Non-Functional] Pages load quickly",
+    ]
+
+
+def test_keep_plain_lines_skips_bare_markers():
+    """Lines holding only a marker are skipped; markers without a following space are text."""
+    text = "-\r\n  1. Users can sign up  \r\n• \n**Bold** requirement\n1.5 seconds per page\n"
+    assert parse_list_response(text, keep_plain_lines=True) == [
+        "Users can sign up",
+        "**Bold** requirement",
+        "1.5 seconds per page",
+    ]
+
+
+def test_falls_back_to_whole_text():
+    """A response made only of markers is returned whole rather than dropped."""
+    assert parse_list_response("\n\n-\n") == ["-"]
+    assert parse_list_response("- \n- ") == ["- \n-"]
+
+
+def test_empty_response():
+    """An empty response yields no items."""
+    assert parse_list_response("  \n") == []
+
+
+def test_format_bullet_list():
+    """Items are rendered one per line with a dash marker."""
+    assert format_bullet_list(["Grow revenue", "Reduce churn"]) == "- Grow revenue\n- Reduce churn"
+    assert format_bullet_list([]) == ""
@@ -0,0 +1,78 @@
+"""Tests for streaming text responses in AI text routes."""
+
+import json
+import logging
+import pytest
+from fastapi import HTTPException
+
+from app.api.routes.ai_text_utils import parse_list_response, streaming_text_response
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def _read_events(response):
+    body = ""
+    async for chunk in response.body_iterator:
+        body += chunk
+    return [json.loads(event[len("data: ") :]) for event in body.split("\n\n") if event]
+
+
+@pytest.fixture
+def test_logger():
+    return logging.getLogger("test_logger")
+
+
+async def test_streams_chunks_then_done(test_logger):
+    """Text chunks are sent as they arrive, followed by the parsed result."""
+    response = await streaming_text_response(
+        _chunks("- Grow ", "revenue\n- Reduce churn"),
+        lambda text: {"enhanced_goals": parse_list_response(text)},
+        test_logger,
+    )
+    events = await _read_events(response)
+
+    assert response.media_type == "text/event-stream"
+    assert events[:2] == [{"chunk": "- Grow "}, {"chunk": "revenue\n- Reduce churn"}]
+    assert events[-1] == {"done": True, "enhanced_goals": ["Grow revenue", "Reduce churn"]}
+
+
+async def test_error_before_output(test_logger):
+    """Errors yielded as the first chunk are raised as HTTP errors once the stream is closed."""
+    closed = []
+
+    async def chunks():
+        try:
+            yield "Error: upstream timeout"
+        finally:
+            closed.append(True)
+
+    with pytest.raises(HTTPException) as excinfo:
+        await streaming_text_response(
+            chunks(), lambda text: {"enhanced_description": text}, test_logger
+        )
+    assert excinfo.value.status_code == 500
+    assert closed == [True]
+
+
+async def test_chunks_closed_when_client_disconnects(test_logger):
+    """The text stream is closed when the response stops being read."""
+    closed = []
+
+    async def chunks():
+        try:
+            yield "# Todo"
+            yield " app"
+        finally:
+            closed.append(True)
+
+    response = await streaming_text_response(
+        chunks(), lambda text: {"enhanced_readme": text}, test_logger
+    )
+    body_iterator = response.body_iterator
+    await anext(body_iterator)
+    await body_iterator.aclose()
+
+    assert closed == [True]
@@ -0,0 +1,123 @@
+"""Tests for streaming tool use responses in AI text routes."""
+
+import json
+import logging
+import pytest
+from fastapi import HTTPException
+
+from app.api.routes.ai_text_utils import streaming_tool_use_response
+from app.schemas.ai_text import ApiData
+
+ENDPOINT_1 = {"path": "/api/tasks", "description": "List tasks", "methods": ["GET"], "auth": True}
+ENDPOINT_2 = {"path": "/api/tasks", "description": "Create task", "methods": ["POST"], "auth": True}
+
+
+async def _events(*events):
+    for event in events:
+        yield event
+
+
+async def _read_lines(response):
+    body = ""
+    async for chunk in response.body_iterator:
+        body += chunk
+    return [json.loads(line) for line in body.splitlines()]
+
+
+@pytest.fixture
+def test_logger():
+    return logging.getLogger("test_logger")
+
+
+async def test_streams_completed_items_then_result(test_logger):
+    """Completed array elements are sent before the validated result."""
+    events = _events(
+        {"type": "input_json", "partial_json": "", "snapshot": {"data": {"endpoints": [{}]}}},
+        {
+            "type": "input_json",
+            "partial_json": "",
+            "snapshot": {"data": {"endpoints": [ENDPOINT_1, {"path": "/api"}]}},
+        },
+        {"type": "result", "data": {"data": {"endpoints": [ENDPOINT_1, ENDPOINT_2]}}},
+    )
+
+    response = await streaming_tool_use_response(events, ApiData, ["endpoints"], test_logger)
+    lines = await _read_lines(response)
+
+    assert lines[0] == {"type": "item", "key": "endpoints", "item": ENDPOINT_1}
+    assert lines[-1]["type"] == "result"
+    assert len(lines[-1]["data"]["endpoints"]) == 2
+
+
+async def test_error_before_output(test_logger):
+    """Errors before any output are raised as HTTP errors."""
+    events = _events({"type": "result", "data": {"error": "No tool use found in response"}})
+
+    with pytest.raises(HTTPException) as excinfo:
+        await streaming_tool_use_response(events, ApiData, ["endpoints"], test_logger)
+    assert excinfo.value.status_code == 500
+
+
+async def test_error_mid_stream_is_sent_and_stream_closed(test_logger):
+    """An exception after output has started ends the stream with an error line."""
+    closed = []
+
+    async def events():
+        try:
+            yield {
+                "type": "input_json",
+                "partial_json": "",
+                "snapshot": {"data": {"endpoints": [ENDPOINT_1, {}]}},
+            }
+            raise RuntimeError("connection reset")
+        finally:
+            closed.append(True)
+
+    response = await streaming_tool_use_response(events(), ApiData, ["endpoints"], test_logger)
+    lines = await _read_lines(response)
+
+    assert lines[0]["type"] == "item"
+    assert lines[-1] == {"type": "error", "detail": "connection reset"}
+    assert closed == [True]
+
+
+async def test_empty_stream(test_logger):
+    """A stream without any event is reported as an HTTP error."""
+    with pytest.raises(HTTPException) as excinfo:
+        await streaming_tool_use_response(_events(), ApiData, ["endpoints"], test_logger)
+    assert excinfo.value.status_code == 500
+
+
+def test_enhance_test_cases_streams_test_cases(client, mock_ai_service):
+    """The test cases route streams completed test cases and closes the AI stream."""
+    test_case = {"feature": "Login", "title": "Valid login", "scenarios": []}
+    closed = []
+
+    async def stream_tool_use_response(*args, **kwargs):
+        try:
+            yield {
+                "type": "input_json",
+                "partial_json": "",
+                "snapshot": {"data": {"testCases": [test_case, {"feature": "Lo"}]}},
+            }
+            yield {"type": "result", "data": {"data": {"testCases": [test_case, test_case]}}}
+        finally:
+            # Where the AI client bills the output of a stream that is closed early
+            closed.append(True)
+
+    mock_ai_service.stream_tool_use_response = stream_tool_use_response
+
+    response = client.post(
+        "/api/ai-text/enhance-test-cases?stream=true",
+        json={
+            "project_description": "A task tracker",
+            "requirements": ["Users can log in"],
+            "features": [{"name": "Login"}],
+        },
+    )
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == {"type": "item", "key": "testCases", "item": test_case}
+    assert lines[-1]["type"] == "result"
+    assert len(lines[-1]["data"]["testCases"]) == 2
+    assert closed == [True]
@@ -0,0 +1,64 @@
+"""Tests for model escalation of tool use requests."""
+
+import logging
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import HTTPException
+
+from app.api.routes.ai_text_utils import get_tool_use_data
+from app.schemas.ai_text import ApiData
+from app.services.ai_service import InsufficientCreditsError
+
+ENDPOINT = {"path": "/api/tasks", "description": "List tasks", "methods": ["GET"], "auth": True}
+
+
+@pytest.fixture
+def test_logger():
+    return logging.getLogger("test_logger")
+
+
+def _client(*responses):
+    client = MagicMock()
+    client.get_tool_use_response = AsyncMock(side_effect=list(responses))
+    return client
+
+
+async def test_valid_draft_is_used(test_logger):
+    """The slower model is not called when the draft validates."""
+    client = _client({"data": {"endpoints": [ENDPOINT]}})
+
+    result = await get_tool_use_data(
+        client, "System", [], [], ApiData, test_logger, models=("fast", "intelligent")
+    )
+
+    assert result.endpoints[0].path == "/api/tasks"
+    assert client.get_tool_use_response.await_count == 1
+
+
+async def test_invalid_draft_escalates(test_logger):
+    """An invalid draft is repeated with the next model."""
+    client = _client(
+        {"data": {"endpoints": [{"path": "/api"}]}}, {"data": {"endpoints": [ENDPOINT]}}
+    )
+
+    result = await get_tool_use_data(
+        client, "System", [], [], ApiData, test_logger, models=("fast", "intelligent")
+    )
+
+    assert len(result.endpoints) == 1
+    assert client.get_tool_use_response.call_args.kwargs["model"] == "intelligent"
+
+
+async def test_insufficient_credits_does_not_escalate(test_logger):
+    """Credit errors are raised immediately as 402."""
+    client = _client(
+        InsufficientCreditsError("Insufficient credits. You have 0 credits remaining.")
+    )
+
+    with pytest.raises(HTTPException) as excinfo:
+        await get_tool_use_data(
+            client, "System", [], [], ApiData, test_logger, models=("fast", "intelligent")
+        )
+
+    assert excinfo.value.status_code == 402
+    assert client.get_tool_use_response.await_count == 1
@@ -5,3 +5,37 @@ from pathlib import Path
 # Add the parent directory to sys.path so that 'app' can be imported
 root_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(root_dir))
+
+import pytest
+from unittest.mock import MagicMock
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.firebase_auth import get_current_user
+from app.api.routes.ai_text_utils import ENHANCE_RESPONSE_CACHE
+from app.services.ai_service import get_ai_service
+
+
+@pytest.fixture(autouse=True)
+def clear_enhance_response_cache():
+    """Keep cached AI responses from leaking between tests."""
+    ENHANCE_RESPONSE_CACHE.clear()
+    yield
+    ENHANCE_RESPONSE_CACHE.clear()
+
+
+@pytest.fixture
+def client():
+    """Test client with authentication overridden."""
+    app.dependency_overrides[get_current_user] = lambda: {"firebase_uid": "test-user"}
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.fixture
+def mock_ai_service():
+    """Mock the AIService injected into the AI text routes."""
+    mock_instance = MagicMock()
+    app.dependency_overrides[get_ai_service] = lambda: mock_instance
+    yield mock_instance
+    app.dependency_overrides.pop(get_ai_service, None)
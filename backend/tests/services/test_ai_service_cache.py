@@ -0,0 +1,107 @@
+"""Tests for sharing identical AI calls in AIService."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services.ai_service import AIService, InsufficientCreditsError
+
+TOOLS = [{"name": "print_features", "input_schema": {}}]
+
+
+def _service():
+    with patch("app.services.ai_service.LLMClientFactory.create_client") as create_client:
+        create_client.return_value.generate_response = AsyncMock(return_value="Enhanced")
+        create_client.return_value.get_tool_use_response = AsyncMock(
+            return_value={"data": {"features": []}}
+        )
+        service = AIService()
+    return service
+
+
+async def test_sequential_prompts_are_not_cached():
+    """Each call once the previous one has finished is sent and billed on its own."""
+    service = _service()
+    messages = [{"role": "user", "content": "Features: []"}]
+
+    await service.get_tool_use_response("System", TOOLS, messages)
+    await service.get_tool_use_response("System", TOOLS, messages)
+
+    assert service.llm_client.get_tool_use_response.await_count == 2
+
+
+async def test_concurrent_identical_prompts_share_one_call():
+    """Identical prompts in flight at the same time are sent once."""
+    service = _service()
+
+    async def slow_response(**kwargs):
+        await asyncio.sleep(0.01)
+        return "Enhanced"
+
+    service.llm_client.generate_response = AsyncMock(side_effect=slow_response)
+    messages = [{"role": "user", "content": "Original description: a todo app"}]
+
+    results = await asyncio.gather(
+        *(service.generate_response(messages, system="Improve it.") for _ in range(3))
+    )
+
+    assert results == ["Enhanced"] * 3
+    service.llm_client.generate_response.assert_awaited_once()
+
+
+async def test_identical_prompts_of_different_users_are_not_shared():
+    """Concurrent identical prompts of different users are each sent and billed."""
+    service = _service()
+
+    async def slow_response(**kwargs):
+        await asyncio.sleep(0.01)
+        return "Enhanced"
+
+    service.llm_client.generate_response = AsyncMock(side_effect=slow_response)
+    messages = [{"role": "user", "content": "Original description: a todo app"}]
+
+    await asyncio.gather(
+        *(
+            service.generate_response(
+                messages, system="Improve it.", log_metadata={"user_id": user_id}
+            )
+            for user_id in ("user-1", "user-2")
+        )
+    )
+
+    assert service.llm_client.generate_response.await_count == 2
+
+
+async def test_failed_shared_call_is_retried_by_joined_callers():
+    """A caller joining a failed call makes its own call."""
+    service = _service()
+    responses = iter(["Insufficient credits. You have 0 credits remaining.", "Enhanced"])
+
+    async def response(**kwargs):
+        await asyncio.sleep(0.01)
+        return next(responses)
+
+    service.llm_client.generate_response = AsyncMock(side_effect=response)
+    messages = [{"role": "user", "content": "Original description: a todo app"}]
+
+    first, second = await asyncio.gather(
+        service.generate_response(messages, system="Improve it."),
+        service.generate_response(messages, system="Improve it."),
+        return_exceptions=True,
+    )
+
+    assert isinstance(first, InsufficientCreditsError)
+    assert second == "Enhanced"
+
+
+async def test_insufficient_credits_raised_as_402():
+    """Credit errors reported by the LLM client are raised for the routes."""
+    service = _service()
+    service.llm_client.get_tool_use_response.return_value = {
+        "error": "Insufficient credits. You have 0 credits remaining."
+    }
+
+    with pytest.raises(InsufficientCreditsError) as excinfo:
+        await service.get_tool_use_response("System", TOOLS, [{"role": "user", "content": "x"}])
+
+    assert excinfo.value.status_code == 402
@@ -0,0 +1,87 @@
+"""Tests for streaming responses from the Anthropic client."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from app.services.anthropic_client import AnthropicDirectClient, FAST_MODEL
+
+
+class _FakeStream:
+    """Stands in for the SDK message stream, yielding a fixed set of text chunks."""
+
+    def __init__(self, *chunks):
+        self._chunks = chunks
+        self.current_message_snapshot = SimpleNamespace(
+            content=[SimpleNamespace(type="text", text="".join(chunks))],
+            usage=SimpleNamespace(input_tokens=10, output_tokens=len(chunks)),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    async def text_stream(self):
+        for chunk in self._chunks:
+            yield chunk
+
+    async def get_final_message(self):
+        return self.current_message_snapshot
+
+
+class _FakeToolStream(_FakeStream):
+    """Stands in for the SDK tool use stream, yielding input_json events."""
+
+    def __init__(self, *partial_jsons):
+        super().__init__()
+        self._events = [
+            SimpleNamespace(type="input_json", partial_json=partial_json, snapshot={})
+            for partial_json in partial_jsons
+        ]
+
+    def __aiter__(self):
+        return self._iterate_events()
+
+    async def _iterate_events(self):
+        for event in self._events:
+            yield event
+
+
+def _client(stream):
+    client = AnthropicDirectClient()
+    client.client = MagicMock()
+    client.client.messages.stream = MagicMock(return_value=stream)
+    client._process_response = MagicMock()
+    return client
+
+
+async def test_partial_stream_is_logged_when_closed():
+    """Closing the stream mid-response still logs and bills the tokens generated so far."""
+    stream = _FakeStream("# Todo", " app", "\n")
+    client = _client(stream)
+
+    chunks = client.stream_response(
+        [{"role": "user", "content": "Hi"}], model=FAST_MODEL, check_credits=False
+    )
+    assert await anext(chunks) == "# Todo"
+    await chunks.aclose()
+
+    client._process_response.assert_called_once()
+    assert client._process_response.call_args.args[0] is stream.current_message_snapshot
+
+
+async def test_partial_tool_use_stream_is_logged_when_closed():
+    """Closing a tool use stream mid-response still logs and bills the tokens so far."""
+    stream = _FakeToolStream('{"data": {"testCases": [{}', ", {}]}}")
+    client = _client(stream)
+
+    events = client.stream_tool_use_response(
+        "System", [], [{"role": "user", "content": "Hi"}], model=FAST_MODEL, check_credits=False
+    )
+    assert (await anext(events))["type"] == "input_json"
+    await events.aclose()
+
+    client._process_response.assert_called_once()
+    assert client._process_response.call_args.args[0] is stream.current_message_snapshot
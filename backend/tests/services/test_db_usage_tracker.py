@@ -0,0 +1,52 @@
+"""Tests for credit checks and usage writes in the database usage tracker."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.db_usage_tracker import DatabaseUsageTracker
+
+
+def _tracker(user):
+    db = MagicMock()
+    db.users.find_one = AsyncMock(return_value=user)
+    return DatabaseUsageTracker(db)
+
+
+async def test_credit_balance_is_cached_between_checks():
+    """A burst of credit checks reads the user's balance once."""
+    tracker = _tracker({"ai_credits": 10, "ai_credits_used": 2, "plan": "free"})
+
+    first = await tracker.check_credits("user-1")
+    tracker.track_usage("user-1", "claude-3-5-haiku-20241022", 100, 50, "enhance_description")
+    second = await tracker.check_credits("user-1")
+
+    assert first["remaining_credits"] == 8
+    assert second["remaining_credits"] == 7
+    tracker.db.users.find_one.assert_awaited_once()
+
+
+async def test_insufficient_credits_are_read_again():
+    """A user without credits is looked up again on the next check."""
+    tracker = _tracker({"ai_credits": 1, "ai_credits_used": 1, "plan": "free"})
+
+    await tracker.check_credits(
+        "user-1", estimated_input_tokens=1000, model="claude-3-5-haiku-20241022"
+    )
+    await tracker.check_credits(
+        "user-1", estimated_input_tokens=1000, model="claude-3-5-haiku-20241022"
+    )
+
+    assert tracker.db.users.find_one.await_count == 2
+
+
+async def test_failed_usage_write_is_logged(caplog):
+    """Usage writes are not awaited, but their failures are still logged."""
+    tracker = _tracker({"ai_credits": 10, "ai_credits_used": 2, "plan": "free"})
+    failed_write = asyncio.get_running_loop().create_future()
+    tracker.db.llm_usage.insert_one = MagicMock(return_value=failed_write)
+
+    tracker.track_usage("user-1", "claude-3-5-haiku-20241022", 100, 50, "enhance_description")
+    failed_write.set_exception(ConnectionError("connection reset"))
+    await asyncio.sleep(0)
+
+    assert "Error recording usage for user user-1: connection reset" in caplog.text
@@ -0,0 +1,85 @@
+"""Tests for Anthropic message batches."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services import anthropic_client
+from app.services.anthropic_client import AnthropicDirectClient, FAST_MODEL
+
+TOOLS = [{"name": "print_features", "input_schema": {}}]
+
+
+def _message(content):
+    return SimpleNamespace(
+        content=[content], usage=SimpleNamespace(input_tokens=100, output_tokens=40)
+    )
+
+
+async def _results(*entries):
+    for entry in entries:
+        yield entry
+
+
+async def test_batch_results_are_mapped_and_billed_at_batch_price(monkeypatch):
+    """Results are matched by custom_id, polled until done and tracked at half price."""
+    monkeypatch.setattr(anthropic_client, "BATCH_POLL_INTERVAL", 0)
+    client = AnthropicDirectClient()
+    client.usage_tracker = MagicMock()
+    client.usage_tracker.check_credits = AsyncMock(
+        return_value={"has_sufficient_credits": True, "remaining_credits": 100}
+    )
+    batches = MagicMock()
+    batches.create = AsyncMock(
+        return_value=SimpleNamespace(id="b1", processing_status="in_progress")
+    )
+    batches.retrieve = AsyncMock(return_value=SimpleNamespace(id="b1", processing_status="ended"))
+    batches.results = AsyncMock(
+        return_value=_results(
+            SimpleNamespace(
+                custom_id="features",
+                result=SimpleNamespace(
+                    type="succeeded",
+                    message=_message(
+                        SimpleNamespace(type="tool_use", input={"data": {"coreModules": []}})
+                    ),
+                ),
+            ),
+            SimpleNamespace(custom_id="readme", result=SimpleNamespace(type="expired")),
+        )
+    )
+    client.client = MagicMock()
+    client.client.messages.batches = batches
+
+    results = await client.generate_batch_responses(
+        [
+            {
+                "custom_id": "readme",
+                "system": "System",
+                "messages": [{"role": "user", "content": "Hi"}],
+                "model": FAST_MODEL,
+                "log_metadata": {"user_id": "test-user"},
+            },
+            {
+                "custom_id": "features",
+                "system": "System",
+                "tools": TOOLS,
+                "messages": [{"role": "user", "content": "Hi"}],
+                "model": FAST_MODEL,
+                "log_metadata": {"user_id": "test-user"},
+            },
+        ],
+        use_token_api_for_estimation=False,
+    )
+
+    assert results == {
+        "features": {"data": {"coreModules": []}},
+        "readme": "Error: Batch request expired",
+    }
+    requests = batches.create.call_args.kwargs["requests"]
+    assert [request["custom_id"] for request in requests] == ["readme", "features"]
+    assert requests[1]["params"]["tools"] == TOOLS
+    batches.retrieve.assert_awaited_once_with("b1")
+
+    kwargs = client.usage_tracker.track_usage.call_args.kwargs
+    assert kwargs["input_tokens"] == 50
+    assert kwargs["output_tokens"] == 20
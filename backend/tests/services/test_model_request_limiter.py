@@ -0,0 +1,37 @@
+"""Tests for the per-model request limiter."""
+
+import asyncio
+
+from app.services.model_request_limiter import ModelRequestLimiter
+
+
+async def test_limits_concurrent_requests_per_model():
+    """No more than the configured number of requests run at once for a model."""
+    limiter = ModelRequestLimiter(max_concurrent_requests=2)
+    running = 0
+    peak = 0
+
+    async def request(model):
+        nonlocal running, peak
+        async with limiter.slot(model):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(request("model-a") for _ in range(5)))
+
+    assert peak == 2
+
+
+async def test_models_have_separate_slots():
+    """A busy model does not block requests to another model."""
+    limiter = ModelRequestLimiter(max_concurrent_requests=1)
+
+    async with limiter.slot("model-a"):
+        await asyncio.wait_for(_enter(limiter, "model-b"), timeout=1)
+
+
+async def _enter(limiter, model):
+    async with limiter.slot(model):
+        pass
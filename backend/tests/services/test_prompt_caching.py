@@ -0,0 +1,48 @@
+"""Tests for Anthropic prompt caching."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.anthropic_client import AnthropicDirectClient, FAST_MODEL
+
+TOOLS = [{"name": "print_features", "input_schema": {}}]
+
+
+def _response(**usage):
+    return SimpleNamespace(
+        content=[SimpleNamespace(type="text", text="Enhanced")],
+        usage=SimpleNamespace(input_tokens=10, output_tokens=5, **usage),
+    )
+
+
+async def test_system_prompt_marked_for_caching():
+    """The system prompt is sent as a text block with an ephemeral cache breakpoint."""
+    client = AnthropicDirectClient()
+    client.client = MagicMock()
+    client.client.messages.create = AsyncMock(return_value=_response())
+
+    await client.get_tool_use_response(
+        "System", TOOLS, [{"role": "user", "content": "Hi"}], model=FAST_MODEL, check_credits=False
+    )
+
+    params = client.client.messages.create.call_args.kwargs
+    assert params["system"] == [
+        {"type": "text", "text": "System", "cache_control": {"type": "ephemeral"}}
+    ]
+    assert params["tools"] == TOOLS
+
+
+def test_cached_tokens_are_billed_at_cache_rates():
+    """Cache writes and reads are tracked at 1.25x and 0.1x the input token count."""
+    client = AnthropicDirectClient()
+    client.usage_tracker = MagicMock()
+
+    client._process_response(
+        _response(cache_creation_input_tokens=100, cache_read_input_tokens=1000),
+        "enhance_features",
+        {"user_id": "test-user"},
+    )
+
+    kwargs = client.usage_tracker.track_usage.call_args.kwargs
+    assert kwargs["input_tokens"] == 10 + 125 + 100
+    assert kwargs["output_tokens"] == 5
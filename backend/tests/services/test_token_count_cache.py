@@ -0,0 +1,68 @@
+"""Tests for token counting used by credit checks."""
+
+from unittest.mock import AsyncMock
+
+from app.services.anthropic_client import AnthropicDirectClient
+
+MESSAGES = [{"role": "user", "content": "Project description: a todo app"}]
+
+
+async def test_identical_prompts_are_counted_once():
+    """Repeated token counts for the same prompt reuse the first result."""
+    client = AnthropicDirectClient()
+    client.count_tokens = AsyncMock(return_value={"input_tokens": 42})
+
+    first = await client._count_tokens_cached(MESSAGES, system="System", model="model")
+    second = await client._count_tokens_cached(MESSAGES, system="System", model="model")
+
+    assert first == second == {"input_tokens": 42}
+    client.count_tokens.assert_awaited_once()
+
+
+async def test_failed_counts_are_not_cached():
+    """Counting errors are retried on the next credit check."""
+    client = AnthropicDirectClient()
+    client.count_tokens = AsyncMock(return_value={"input_tokens": 0, "error": "timeout"})
+
+    await client._count_tokens_cached(MESSAGES, system="System", model="model")
+    await client._count_tokens_cached(MESSAGES, system="System", model="model")
+
+    assert client.count_tokens.await_count == 2
+
+
+def _client_with_balance(remaining_credits):
+    client = AnthropicDirectClient()
+    client.client = object()
+    client.count_tokens = AsyncMock(return_value={"input_tokens": 42})
+    client.usage_tracker = AsyncMock()
+
+    async def check_credits(user_id, estimated_input_tokens, estimated_output_tokens, model):
+        cost = estimated_input_tokens * 0.01
+        return {
+            "has_sufficient_credits": remaining_credits >= cost,
+            "remaining_credits": remaining_credits,
+            "estimated_cost": cost,
+        }
+
+    client.usage_tracker.check_credits = AsyncMock(side_effect=check_credits)
+    return client
+
+
+async def test_credit_check_skips_token_api_with_ample_credits():
+    """A local estimate well below the balance needs no token counting request."""
+    client = _client_with_balance(remaining_credits=1000)
+
+    result = await client._check_sufficient_credits("user", MESSAGES, system="System")
+
+    assert result["has_sufficient_credits"]
+    client.count_tokens.assert_not_awaited()
+
+
+async def test_credit_check_confirms_estimate_near_balance():
+    """An estimate close to the balance is replaced by the exact token count."""
+    client = _client_with_balance(remaining_credits=0.05)
+
+    result = await client._check_sufficient_credits("user", MESSAGES, system="System")
+
+    client.count_tokens.assert_awaited_once()
+    assert result["estimated_cost"] == 42 * 0.01
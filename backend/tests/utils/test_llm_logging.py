@@ -0,0 +1,63 @@
+"""Tests for logging LLM responses."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+from app.schemas.ai_text import DescriptionEnhanceRequest, DescriptionEnhanceResponse
+from app.utils.llm_logging import DefaultLLMLogger, decode_log_entry
+
+METADATA = {"user_id": "test-user", "features": [{"name": "Workout logging"}] * 50}
+
+
+def _mock_database():
+    database = MagicMock()
+    return patch("app.utils.llm_logging.db.get_db", return_value=database), database
+
+
+def test_database_entry_is_compressed():
+    """The stored document keeps lookup fields and compresses the full entry."""
+    get_db, database = _mock_database()
+    with get_db:
+        DefaultLLMLogger().log_response(
+            "enhance_features", "response", project_id="project-1", metadata=METADATA
+        )
+
+    (document,), _ = database.llm_responses.insert_one.call_args
+    assert document["type"] == "enhance_features"
+    assert document["project_id"] == "project-1"
+    assert "metadata" not in document
+
+    entry = decode_log_entry(document)
+    assert entry["raw_response"] == "response"
+    assert entry["metadata"] == METADATA
+
+
+async def test_entry_is_built_off_the_event_loop():
+    """Inside the event loop, the entry is stored after it is built in a worker thread."""
+    get_db, database = _mock_database()
+    with get_db:
+        DefaultLLMLogger().log_response("enhance_features", "response", metadata=METADATA)
+        database.llm_responses.insert_one.assert_not_called()
+
+        for _ in range(100):
+            if database.llm_responses.insert_one.called:
+                break
+            await asyncio.sleep(0.01)
+
+    database.llm_responses.insert_one.assert_called_once()
+
+
+def test_models_in_response_and_metadata_are_serialized():
+    """Pydantic models and plain objects are logged as their fields."""
+    get_db, database = _mock_database()
+    with get_db:
+        DefaultLLMLogger().log_response(
+            "enhance_description",
+            {"result": DescriptionEnhanceResponse(enhanced_description="A todo app")},
+            metadata={"request": DescriptionEnhanceRequest(user_description="todo")},
+        )
+
+    (document,), _ = database.llm_responses.insert_one.call_args
+    entry = decode_log_entry(document)
+    assert entry["raw_response"] == '{"result":{"enhanced_description":"A todo app"}}'
+    assert entry["metadata"]["request"]["user_description"] == "todo"